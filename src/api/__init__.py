@@ -0,0 +1,8 @@
+"""
+REST API served by the Dash app's Flask server under /api/v1
+"""
+import flask
+
+api = flask.Blueprint('api', __name__, url_prefix='/api/v1')
+
+from src.api import assessment, fleet, jobs, profiles  # noqa: E402,F401 Registers the routes of the blueprint
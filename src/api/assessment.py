@@ -0,0 +1,103 @@
+import io
+import time
+
+import flask
+import pandas as pd
+from loguru import logger
+
+from src.api import api
+from src.api.responses import error_response, json_response, parse_json_body
+from src.utils.analysis.assessment import assess_defects, serialise_assessment
+from src.utils.analysis.audit_trail import write_audit_trail
+
+# Maximum number of defects assessed in a single request
+MAX_DEFECTS = 100_000
+RESULT_ORIENTS = ('records', 'split')
+# Full assessments include the allowable depth of each defect, quick checks only its acceptance
+ASSESSMENT_MODES = ('full', 'quick')
+AUDIT_OPTIONS = ('true', 'false')
+# Results are returned as JSON, or with their audit columns as Parquet
+RESULT_FORMATS = ('json', 'parquet')
+
+
+def parse_assessment_options() -> tuple[str, bool, bool]:
+    """
+    Validates the query parameters of an assessment request
+
+    Returns:
+        orient: Orientation of the results
+        quick: Whether only the acceptance of each defect is checked
+        audit: Whether the intermediate values of each assessment are appended
+    """
+    orient = flask.request.args.get('orient', 'records')
+    if orient not in RESULT_ORIENTS:
+        raise ValueError(f"orient must be one of {', '.join(RESULT_ORIENTS)}")
+    mode = flask.request.args.get('mode', 'full')
+    if mode not in ASSESSMENT_MODES:
+        raise ValueError(f"mode must be one of {', '.join(ASSESSMENT_MODES)}")
+    audit = flask.request.args.get('audit', 'false').lower()
+    if audit not in AUDIT_OPTIONS:
+        raise ValueError(f"audit must be one of {', '.join(AUDIT_OPTIONS)}")
+    return orient, mode == 'quick', audit == 'true'
+
+
+def parse_assessment_request(body: dict, max_defects: int = MAX_DEFECTS) -> tuple[dict, pd.DataFrame]:
+    """
+    Validates the body of an assessment request
+    Args:
+        body: {'pipe': Pipe config, 'environment': Environment config, 'loading': add_loading kwargs (optional),
+               'defects': defect records [{'length': ..., 'relative_depth': ...}] or columns {'length': [...], ...}}
+        max_defects: Maximum number of defects
+
+    Returns:
+        configs: Model configs
+        defects: One row per defect
+    """
+    missing = [key for key in ('pipe', 'environment', 'defects') if key not in body]
+    if missing:
+        raise ValueError(f"Missing request fields: {', '.join(missing)}")
+    configs = {key: body.get(key) for key in ('pipe', 'environment', 'loading')}
+    if not all(isinstance(value, dict) for value in configs.values() if value is not None):
+        raise ValueError('pipe, environment and loading must be objects')
+
+    defects = pd.DataFrame(body['defects'])
+    if defects.empty:
+        raise ValueError('At least one defect is required')
+    if len(defects) > max_defects:
+        raise ValueError(f"At most {max_defects} defects can be assessed per request")
+    return configs, defects
+
+
+@api.route('/assess', methods=['POST'])
+def assess():
+    """
+    Assesses an array of independent defects of a pipe.
+    Results are returned per defect in the order given, as records or, with ?orient=split, as columns and rows.
+    With ?mode=quick only the acceptance of each defect is checked, skipping the allowable depth.
+    With ?audit=true the intermediate values of each assessment are appended, and with ?format=parquet the results
+    are returned as a Parquet file instead, with their audit values as float32.
+    """
+    start_time = time.time()
+    try:
+        orient, quick, audit = parse_assessment_options()
+        result_format = flask.request.args.get('format', 'json')
+        if result_format not in RESULT_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(RESULT_FORMATS)}")
+        configs, defects = parse_assessment_request(parse_json_body())
+        result = assess_defects(configs, defects, quick=quick, audit=audit or result_format == 'parquet')
+    except (ValueError, KeyError, TypeError) as e:
+        logger.info(f"Rejected assessment request: {e}")
+        return error_response(str(e))
+
+    if result_format == 'parquet':
+        buffer = io.BytesIO()
+        write_audit_trail(result, buffer)
+        logger.info(f"Assessed {len(result)} defects via API | Processing time: {time.time() - start_time:.2f}s")
+        response = flask.Response(buffer.getvalue(), mimetype='application/vnd.apache.parquet')
+        response.headers['Content-Disposition'] = 'attachment; filename=assessment.parquet'
+        return response
+
+    body = serialise_assessment(result, orient)
+    logger.info(f"Assessed {len(result)} defects via API | Processing time: {time.time() - start_time:.2f}s")
+    return json_response(body)
+
@@ -0,0 +1,70 @@
+import json
+
+from loguru import logger
+
+from src.api import api
+from src.api.assessment import parse_assessment_request
+from src.api.jobs import job_links
+from src.api.responses import error_response, json_response, parse_json_body
+from src.utils.analysis.assessment import build_scenario
+from src.utils.jobs.job_runner import job_queue
+
+# Maximum number of pipelines and defects per pipeline of a fleet job
+MAX_PIPELINES = 100
+MAX_PIPELINE_DEFECTS = 1_000_000
+
+
+def parse_fleet_manifest(body: dict) -> dict:
+    """
+    Validates a fleet manifest
+    Args:
+        body: {'pipelines': [{'id', 'pipe', 'environment', 'loading' (optional), 'defects',
+               'corrosion_rate': depth growth in mm/year (optional)}]}, each pipeline as the body of /assess
+
+    Returns:
+        manifest: Inputs of the fleet job
+    """
+    pipelines = body.get('pipelines')
+    if not isinstance(pipelines, list) or not pipelines:
+        raise ValueError('At least one pipeline is required')
+    if len(pipelines) > MAX_PIPELINES:
+        raise ValueError(f"At most {MAX_PIPELINES} pipelines can be assessed per job")
+
+    manifest = {'pipelines': []}
+    for pipeline in pipelines:
+        if not isinstance(pipeline, dict) or pipeline.get('id') is None:
+            raise ValueError('Every pipeline requires an id')
+        try:
+            configs, defects = parse_assessment_request(pipeline, max_defects=MAX_PIPELINE_DEFECTS)
+            # Inputs the assessment would reject fail the request rather than every task of the job
+            build_scenario(configs, defects)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Pipeline {pipeline['id']}: {e}")
+        corrosion_rate = pipeline.get('corrosion_rate')
+        if corrosion_rate is not None and (not isinstance(corrosion_rate, (int, float)) or corrosion_rate < 0):
+            raise ValueError(f"Pipeline {pipeline['id']}: corrosion_rate must be a non-negative number")
+        manifest['pipelines'].append({'id': pipeline['id'], 'configs': configs, 'defects': pipeline['defects'],
+                                      'corrosion_rate': corrosion_rate})
+
+    ids = [pipeline['id'] for pipeline in manifest['pipelines']]
+    if len(set(ids)) != len(ids):
+        raise ValueError('Pipeline ids must be unique')
+    return manifest
+
+
+@api.route('/fleet', methods=['POST'])
+def submit_fleet_job():
+    """
+    Submits a fleet assessment job over many pipelines.
+    Responds with 202 and the job's record and links, its result holds a summary per pipeline.
+    """
+    try:
+        manifest = parse_fleet_manifest(parse_json_body())
+    except (ValueError, KeyError, TypeError) as e:
+        logger.info(f"Rejected fleet job: {e}")
+        return error_response(str(e))
+
+    record = job_queue.submit('fleet', manifest)
+    response = json_response(json.dumps(record | {'links': job_links(record['id'])}), status=202)
+    response.headers['Location'] = job_links(record['id'])['status']
+    return response
@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+
+import flask
+from loguru import logger
+
+from src.api import api
+from src.api.assessment import parse_assessment_options, parse_assessment_request
+from src.api.responses import error_response, json_response, parse_json_body
+from src.utils.analysis.assessment import build_scenario
+from src.utils.jobs.job_runner import job_queue
+from src.utils.jobs.job_store import COMPLETE, FINAL_STATUSES
+
+# Interval between checks of a job's progress by the event stream
+EVENT_POLL_INTERVAL = 0.5
+# Interval between comments keeping idle event streams open through proxies
+EVENT_HEARTBEAT_INTERVAL = 15
+# Seconds after which a client refused an event stream should retry
+EVENT_STREAM_RETRY_AFTER = 5
+
+
+class StreamLimit:
+    """
+    Bounds the number of open event streams. Each stream polls its job from a server thread for the job's whole
+    duration, and waitress serves with 4 threads by default, so unbounded streams would leave no thread for other
+    requests. Clients refused a stream can poll the job's status instead.
+    """
+    def __init__(self, maximum: int = 2):
+        self.maximum = maximum
+        self._open = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self._open >= self.maximum:
+                return False
+            self._open += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._open -= 1
+
+
+event_streams = StreamLimit()
+
+
+def job_links(job_id: str) -> dict:
+    return {
+        'status': flask.url_for('api.get_job', job_id=job_id),
+        'result': flask.url_for('api.get_job_result', job_id=job_id),
+        'events': flask.url_for('api.get_job_events', job_id=job_id)
+    }
+
+
+@api.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Submits an assessment as a job, accepting the same body, orient, mode and audit as /assess.
+    Responds with 202 and the job's record and links to its status, result and event stream.
+    """
+    try:
+        orient, quick, audit = parse_assessment_options()
+        body = parse_json_body()
+        configs, defects = parse_assessment_request(body)
+        # Reject inputs the assessment would reject before queueing the job
+        build_scenario(configs, defects)
+    except (ValueError, KeyError, TypeError) as e:
+        logger.info(f"Rejected job: {e}")
+        return error_response(str(e))
+
+    record = job_queue.submit('assessment', {'configs': configs, 'defects': body['defects'], 'orient': orient,
+                                             'quick': quick, 'audit': audit})
+    response = json_response(json.dumps(record | {'links': job_links(record['id'])}), status=202)
+    response.headers['Location'] = job_links(record['id'])['status']
+    return response
+
+
+@api.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id: str):
+    record = job_queue.store.get(job_id)
+    if record is None:
+        return error_response(f"Job {job_id} does not exist", status=404)
+    return json_response(json.dumps(record | {'links': job_links(job_id)}))
+
+
+@api.route('/jobs/<job_id>', methods=['DELETE'])
+def delete_job(job_id: str):
+    if job_queue.store.get(job_id) is None:
+        return error_response(f"Job {job_id} does not exist", status=404)
+    job_queue.store.delete(job_id)
+    return flask.Response(status=204)
+
+
+@api.route('/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id: str):
+    record = job_queue.store.get(job_id)
+    if record is None:
+        return error_response(f"Job {job_id} does not exist", status=404)
+    if record['status'] != COMPLETE:
+        return error_response(f"Job {job_id} is {record['status']}", status=409)
+    return json_response(job_queue.store.get_result(job_id))
+
+
+def format_event(event: str, data: str, event_id: int = None) -> str:
+    lines = [f'event: {event}']
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines += [f'data: {line}' for line in data.splitlines()]
+    return '\n'.join(lines) + '\n\n'
+
+
+def generate_job_events(job_id: str, next_partial: int = 0):
+    """
+    Streams the progress of a job as Server-Sent Events until it finishes:
+        progress: The job's record whenever it changes
+        partial: Each partial result, identified by its index so that a reconnecting client resumes after it
+        complete or failed: The job's final record
+    """
+    store = job_queue.store
+    previous = None
+    last_event_time = time.time()
+    while True:
+        record = store.get(job_id)
+        if record is None:
+            yield format_event('failed', json.dumps({'id': job_id, 'error': f"Job {job_id} does not exist"}))
+            return
+
+        while next_partial < record['partials']:
+            yield format_event('partial', store.get_partial(job_id, next_partial), event_id=next_partial)
+            next_partial += 1
+            last_event_time = time.time()
+
+        if record['status'] in FINAL_STATUSES:
+            yield format_event(record['status'], json.dumps(record))
+            return
+        if record != previous:
+            yield format_event('progress', json.dumps(record))
+            previous = record
+            last_event_time = time.time()
+        elif time.time() - last_event_time > EVENT_HEARTBEAT_INTERVAL:
+            yield ': heartbeat\n\n'
+            last_event_time = time.time()
+        time.sleep(EVENT_POLL_INTERVAL)
+
+
+@api.route('/jobs/<job_id>/events', methods=['GET'])
+def get_job_events(job_id: str):
+    """
+    Streams the job's events, see generate_job_events. At most event_streams.maximum streams are open at once, further
+    requests get a 503 with Retry-After and can poll the job's status instead.
+    """
+    if job_queue.store.get(job_id) is None:
+        return error_response(f"Job {job_id} does not exist", status=404)
+    if not event_streams.acquire():
+        response = error_response('Too many open event streams, poll the job status instead', status=503)
+        response.headers['Retry-After'] = str(EVENT_STREAM_RETRY_AFTER)
+        return response
+    last_event_id = flask.request.headers.get('Last-Event-ID')
+    next_partial = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    response = flask.Response(flask.stream_with_context(generate_job_events(job_id, next_partial)),
+                              mimetype='text/event-stream')
+    # Released when the stream ends or the client disconnects
+    response.call_on_close(event_streams.release)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'    # Disable buffering by reverse proxies
+    return response
@@ -0,0 +1,73 @@
+import json
+from functools import wraps
+
+import flask
+
+from src.api import api
+from src.api.responses import error_response, json_response
+from src.utils.monitoring.profiling import PROFILE_HEADER, callback_profiler
+
+
+def profile_links(profile_id: int) -> dict:
+    return {
+        'pstats': flask.url_for('api.get_profile_pstats', profile_id=profile_id),
+        'collapsed': flask.url_for('api.get_profile_collapsed', profile_id=profile_id)
+    }
+
+
+def admin_only(view):
+    # Profiles hold the inputs of other users' analyses, only admins holding the profiling token may read them
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not callback_profiler.is_admin():
+            return error_response(f"The profiling token is required in the {PROFILE_HEADER} header", status=403)
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@api.route('/profiles', methods=['GET'])
+@admin_only
+def get_profiles():
+    """
+    Lists the profiles in the buffer, newest first, with links to download them
+    """
+    records = callback_profiler.store.list()
+    return json_response(json.dumps([record | {'links': profile_links(record['id'])} for record in records],
+                                    default=str))
+
+
+@api.route('/profiles/<int:profile_id>', methods=['GET'])
+@admin_only
+def get_profile(profile_id: int):
+    record = callback_profiler.store.get_record(profile_id)
+    if record is None:
+        return error_response(f"Profile {profile_id} does not exist", status=404)
+    return json_response(json.dumps(record | {'links': profile_links(profile_id)}, default=str))
+
+
+@api.route('/profiles/<int:profile_id>.pstats', methods=['GET'])
+@admin_only
+def get_profile_pstats(profile_id: int):
+    """
+    Profile statistics, read with pstats.Stats or e.g. snakeviz
+    """
+    pstats = callback_profiler.store.get_pstats(profile_id)
+    if pstats is None:
+        return error_response(f"Profile {profile_id} does not exist", status=404)
+    response = flask.Response(pstats, mimetype='application/octet-stream')
+    response.headers['Content-Disposition'] = f'attachment; filename=profile-{profile_id}.pstats'
+    return response
+
+
+@api.route('/profiles/<int:profile_id>.collapsed', methods=['GET'])
+@admin_only
+def get_profile_collapsed(profile_id: int):
+    """
+    Sampled stacks in the collapsed format, read with flamegraph.pl or speedscope
+    """
+    collapsed = callback_profiler.store.get_collapsed(profile_id)
+    if collapsed is None:
+        return error_response(f"Profile {profile_id} does not exist", status=404)
+    response = flask.Response(collapsed, mimetype='text/plain')
+    response.headers['Content-Disposition'] = f'attachment; filename=profile-{profile_id}.collapsed'
+    return response
@@ -0,0 +1,51 @@
+import gzip
+import json
+
+import flask
+
+try:
+    import orjson
+except ImportError:     # Optional, parsing falls back to the standard library
+    orjson = None
+
+# Responses smaller than this are sent uncompressed as gzip would barely reduce them
+GZIP_MINIMUM_SIZE = 1024
+GZIP_LEVEL = 1
+
+
+def parse_json_body() -> dict:
+    """
+    Parses the JSON body of the current request
+
+    Returns:
+        body: Parsed JSON object
+    """
+    data = flask.request.get_data(cache=False)
+    try:
+        body = orjson.loads(data) if orjson is not None else json.loads(data)
+    except ValueError as e:
+        raise ValueError(f"Invalid JSON body: {e}")
+    if not isinstance(body, dict):
+        raise ValueError('The JSON body must be an object')
+    return body
+
+
+def json_response(body: str | bytes, status: int = 200) -> flask.Response:
+    """
+    Creates a response from serialised JSON, gzip compressing large bodies for clients accepting it
+    Args:
+        body: Serialised JSON
+        status: HTTP status code
+    """
+    if isinstance(body, str):
+        body = body.encode()
+    response = flask.Response(body, status=status, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    if len(body) >= GZIP_MINIMUM_SIZE and 'gzip' in flask.request.accept_encodings:
+        response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+def error_response(message: str, status: int = 400) -> flask.Response:
+    return json_response(json.dumps({'error': message}), status=status)
@@ -4,11 +4,26 @@ from uuid import uuid4
 
 import dash
 import dash_bootstrap_components as dbc
+import flask
 from dash import html, DiskcacheManager, CeleryManager
 from flask_caching import Cache
 from loguru import logger
 
+from src.api import api
+from src.api.jobs import event_streams
 from src.utils import IS_DOCKER
+from src.utils.analysis.dnv_examples import get_example_store
+from src.utils.analysis.parallel_assessment import parallel_executor
+from src.utils.caching.analysis_cache import analysis_cache
+from src.utils.caching.batch_results import batch_results
+from src.utils.caching.limit_curve_cache import limit_curve_cache
+from src.utils.caching.single_flight import DiskcacheLockClient
+from src.utils.graphing import defect_plots
+from src.utils.jobs.fleet_job import CeleryTaskExecutor, LocalTaskExecutor, fleet_orchestrator
+from src.utils.jobs.job_runner import CeleryJobExecutor, LocalJobExecutor, job_queue
+from src.utils.jobs.job_store import job_store
+from src.utils.monitoring.profiling import callback_profiler
+from src.utils.monitoring.stage_metrics import stage_metrics
 
 launch_uid = uuid4()
 
@@ -25,6 +40,25 @@ if 'REDIS_URL' in environ:
         celery_app, cache_by=[lambda: launch_uid], expire=60
     )
 
+    # Share limit curves between workers through Redis
+    import redis
+    redis_client = redis.Redis.from_url(environ['REDIS_URL'])
+    limit_curve_cache.backend = redis_client
+
+    # Coalesce identical analyses across workers
+    analysis_cache.single_flight.lock_client = redis_client
+
+    # Run API jobs on the Celery workers, storing their progress and results in Redis
+    job_store.backend = redis_client
+    job_queue.executor = CeleryJobExecutor(celery_app, job_store)
+    fleet_orchestrator.executor = CeleryTaskExecutor(celery_app, job_store)
+
+    # Add the stages timed by every worker to counters in Redis
+    stage_metrics.backend = redis_client
+
+    # Keep the profiles recorded by every worker in Redis
+    callback_profiler.store.backend = redis_client
+
 else:
     # Diskcache for non-production apps when developing locally
     import diskcache
@@ -33,6 +67,39 @@ else:
         cache, cache_by=[lambda: launch_uid], expire=60
     )
 
+    # Share limit curves between processes through the local diskcache
+    limit_curve_cache.backend = cache
+
+    # Coalesce identical analyses across the background callback processes
+    analysis_cache.single_flight.lock_client = DiskcacheLockClient(cache)
+
+    # Run API jobs in a local process pool, storing their progress and results in the local diskcache
+    job_store.backend = cache
+    job_queue.executor = LocalJobExecutor(max_workers=int(environ.get('JOB_WORKERS', 2)))
+    fleet_orchestrator.executor = LocalTaskExecutor(job_store, max_workers=int(environ.get('FLEET_WORKERS', 4)))
+
+    # Add the stages timed by every background process to counters in the local diskcache
+    stage_metrics.backend = cache
+
+    # Keep the profiles recorded by every background process in the local diskcache
+    callback_profiler.store.backend = cache
+
+limit_curve_cache.maxsize = int(environ.get('LIMIT_CURVE_CACHE_SIZE', limit_curve_cache.maxsize))
+defect_plots.LIMIT_CURVE_DISPLAY_POINTS = int(environ.get('LIMIT_CURVE_DISPLAY_POINTS',
+                                                          defect_plots.LIMIT_CURVE_DISPLAY_POINTS))
+# Assess large batches across processes sharing the feature and result columns
+parallel_executor.max_workers = int(environ.get('ASSESSMENT_WORKERS', parallel_executor.max_workers))
+# Number of fleet tasks in flight per fleet job
+fleet_orchestrator.max_concurrency = int(environ.get('FLEET_CONCURRENCY', fleet_orchestrator.max_concurrency))
+# Each job event stream holds a server thread until its job finishes
+event_streams.maximum = int(environ.get('MAX_EVENT_STREAMS', event_streams.maximum))
+# Profile every analysis, or only those requested through ?profile=1 or by admins holding the token, keeping the last
+# profiles
+callback_profiler.enabled = bool(int(environ.get('PROFILE_CALLBACKS', 0)))
+callback_profiler.requests_enabled = bool(int(environ.get('PROFILING_ENABLED', 0)))
+callback_profiler.token = environ.get('PROFILING_TOKEN')
+callback_profiler.store.maxsize = int(environ.get('PROFILE_BUFFER_SIZE', callback_profiler.store.maxsize))
+
 app = dash.Dash(
     __name__,
     external_stylesheets=[dbc.themes.MATERIA],
@@ -59,6 +126,41 @@ else:
         'CACHE_DIR': 'cache-directory'
     })
 
+# Memoise analyses so that repeated and shared inputs are served from the cache
+analysis_cache.backend = cache
+analysis_cache.timeout = int(environ.get('ANALYSIS_CACHE_TIMEOUT', analysis_cache.timeout))
+
+# Share batch assessment results between the background workers computing them and the server paging through them
+batch_results.backend = cache
+batch_results.timeout = int(environ.get('BATCH_RESULT_TIMEOUT', batch_results.timeout))
+
+# Serve the DNV examples from memory, rendered once at startup or loaded from the build artifact
+example_store = get_example_store()
+
+
+@app.server.route('/api/v1/examples/<example_id>')
+def get_example(example_id: str):
+    if example_id not in example_store:
+        flask.abort(404)
+    # Loading an example is served here since the example graphs are updated client side
+    with callback_profiler.profile('get_example', {'example_id': example_id}, enabled=callback_profiler.requested()):
+        body, etag = example_store.get(example_id)
+        response = flask.Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.cache_control.no_cache = True  # Revalidate with the ETag rather than refetching
+        return response.make_conditional(flask.request)
+
+
+@app.server.route('/metrics')
+def get_metrics():
+    # Stage durations of every process, in the Prometheus text format
+    return flask.Response(stage_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# REST API for programmatic assessments
+app.server.register_blueprint(api)
+
+
 app.layout = html.Div([
     # html.H1('Corrosion Analyser'),
     dbc.NavbarSimple([
@@ -0,0 +1,14 @@
+// Clientside callbacks for the batch assessment page
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    batch_assessment: {
+        /**
+         * Discards the rows held by the batch grid so that the pages of a new batch are requested from the server
+         * @param {string} batchId id of the assessed batch
+         */
+        refresh_grid: async function (batchId) {
+            const api = await dash_ag_grid.getApiAsync('batch_grid');
+            api.purgeInfiniteCache();
+            return batchId;
+        }
+    }
+});
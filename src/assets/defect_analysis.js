@@ -0,0 +1,76 @@
+// Clientside callbacks for the defect analysis page, keeping pure UI state changes off the server
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    defect_analysis: {
+        /**
+         * Updates the input tables to reflect the selected measurement method
+         * @param {string} measurement 'relative' or 'absolute'
+         * @param {Array} mainData main input table data
+         * @param {Array} secondaryData secondary input table data
+         */
+        update_measurement_method: function (measurement, mainData, secondaryData) {
+            mainData = mainData.map(row => Object.assign({}, row));
+            secondaryData = secondaryData.map(row => Object.assign({}, row));
+
+            if (measurement === 'relative') {
+                mainData[5].Unit = 't';
+                mainData[10].Unit = '';
+
+                secondaryData[2].Unit = 't';
+            } else {
+                mainData[5].Unit = 'mm';
+                mainData[10].Unit = 'mm';
+
+                secondaryData[2].Unit = 'mm';
+            }
+            return [mainData, secondaryData];
+        },
+
+        /**
+         * Sets the combined stress to the compressive sum of the axial and bending stresses, or converts a manually
+         * entered combined stress to a compressive load
+         * @param {number} timestamp data update timestamp
+         * @param {Array} rows input table data rows
+         */
+        sanitise_stress_values: function (timestamp, rows) {
+            const toFloat = function (value) {
+                const number = typeof value === 'string' && !value.trim() ? NaN : Number(value);
+                if (Number.isNaN(number)) {
+                    throw new Error(`could not convert string to float: '${value}'`);
+                }
+                return number;
+            };
+            let axialStress = 0;
+            let bendingStress = 0;
+
+            rows = rows.map(row => Object.assign({}, row));
+            for (const row of rows) {
+                if (row.Parameter === 'Axial Stress' && row.Value) {
+                    axialStress = Math.abs(toFloat(row.Value));
+                }
+                if (row.Parameter === 'Bending Stress' && row.Value) {
+                    bendingStress = Math.abs(toFloat(row.Value));
+                }
+                if (row.Parameter === 'Combined Stress') {
+                    if (axialStress || bendingStress) {
+                        row.Value = -1 * Math.abs(axialStress + bendingStress);
+                    } else if (row.Value) {
+                        row.Value = -1 * Math.abs(toFloat(row.Value));
+                    }
+                }
+            }
+            return rows;
+        },
+
+        /**
+         * Opens or closes the secondary defect panel
+         * @param {number} n number of clicks of the toggle button
+         * @param {boolean} isOpen whether the panel is open
+         */
+        toggle_collapse: function (n, isOpen) {
+            if (n) {
+                return !isOpen;
+            }
+            return isOpen;
+        }
+    }
+});
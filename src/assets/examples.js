@@ -0,0 +1,17 @@
+// Clientside callbacks for the examples page
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    examples: {
+        /**
+         * Fetches a precomputed example, revalidating the browser's cached copy through its ETag
+         * @param {string} exampleId id of the selected example
+         */
+        load_example: async function (exampleId) {
+            const response = await fetch(`/api/v1/examples/${encodeURIComponent(exampleId)}`);
+            if (!response.ok) {
+                throw new Error(`Failed to load example ${exampleId}: ${response.status}`);
+            }
+            const example = await response.json();
+            return [...example.figures, example.description, example.evaluation];
+        }
+    }
+});
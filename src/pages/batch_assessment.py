@@ -0,0 +1,303 @@
+import hashlib
+import time
+
+import dash
+import dash_ag_grid as dag
+import dash_bootstrap_components as dbc
+import pandas as pd
+import plotly.graph_objects as go
+from dash import dcc, html, callback, clientside_callback, dash_table, no_update
+from dash.dependencies import ClientsideFunction, Input, Output, State
+from loguru import logger
+
+from src.utils.analysis.assessment import assess_governing_feature
+from src.utils.analysis.parallel_assessment import parallel_executor
+from src.utils.analysis.tally import parse_tally
+from src.utils.caching.batch_results import batch_results
+from src.utils.caching.limit_curve_cache import generate_cache_key
+from src.utils.graphing import defect_plots
+from src.utils.layout import center_align_style
+
+dash.register_page(__name__)
+
+# Input table parameters and their scenario keys, the defect dimensions are given per feature by the tally
+SCENARIO_PARAMETERS = {
+    'Pipe Outer Diameter': 'outside_diameter',
+    'Pipe Wall Thickness': 'wall_thickness',
+    'SMTS': 'smts',
+    'Defect Elevation': 'elevation',
+    'Design Pressure': 'design_pressure',
+    'Design Temperature': 'design_temperature',
+    'Incidental to Design Pressure Ratio': 'incidental_to_design_pressure_ratio',
+    'Accuracy': 'accuracy',
+    'Confidence Level': 'confidence_level',
+    'Seawater Density': 'seawater_density',
+    'Containment Density': 'containment_density',
+    'Elevation Reference': 'elevation_reference',
+    'Defect Width': 'defect_width',
+    'Combined Stress': 'combined_stress'
+}
+SAFETY_CLASSES = ['low', 'medium', 'high']
+# Grid columns and their headers, optional tally columns are only shown when provided
+GRID_COLUMNS = {
+    'kp': 'KP (km)',
+    'defect_length': 'Defect Length (mm)',
+    'defect_depth': 'Defect Depth (t)',
+    'elevation': 'Elevation (m)',
+    'defect_width': 'Defect Width (mm)',
+    'combined_stress': 'Combined Stress (MPa)',
+    'effective_pressure': 'Effective Pressure (MPa)',
+    'pressure_resistance': 'Pressure Resistance (MPa)',
+    'allowable_relative_depth': 'Allowable Depth (t)',
+    'erf': 'ERF',
+    'acceptable': 'Acceptable'
+}
+# Columns shown on hover for each feature of the plotted population
+POPULATION_HOVER_COLUMNS = ('kp', 'pressure_resistance', 'erf', 'acceptable')
+PAGE_SIZE = 100
+# Number of features assessed between progress updates
+CHUNK_SIZE = 50_000
+
+
+def generate_column_defs(columns) -> list[dict]:
+    column_defs = []
+    for column in columns:
+        if column == 'acceptable':
+            column_defs.append({'field': column, 'headerName': GRID_COLUMNS[column], 'filter': 'agTextColumnFilter'})
+        else:
+            column_defs.append({'field': column, 'headerName': GRID_COLUMNS[column], 'filter': 'agNumberColumnFilter',
+                                'valueFormatter': {'function': "d3.format('.4~f')(params.value)"}})
+    return column_defs
+
+
+def generate_population_plot(scenario: dict, result: pd.DataFrame) -> go.Figure:
+    """
+    Plots the assessed features against the limit curves of the governing feature
+    Args:
+        scenario: Scenario of the batch
+        result: Assessed features
+
+    Returns:
+        fig: Figure, empty if the limit curves could not be calculated
+    """
+    try:
+        pipe = assess_governing_feature(scenario, result)
+    except Exception as e:
+        logger.warning(f"Limit curves of the governing feature could not be calculated: {e}")
+        return go.Figure()
+    population = result.rename(columns={'defect_depth': 'defect_relative_depth'})
+    population = population[['defect_length', 'defect_relative_depth',
+                             *(column for column in POPULATION_HOVER_COLUMNS if column in population.columns)]]
+    return defect_plots.generate_defect_depth_plot(pipe, population=population)
+
+
+def layout():
+    # Pipe configured with the default values as defined in Example A.1-1
+    input_fields = [
+        {'Parameter': 'Pipe Outer Diameter', 'Value': 812.8, 'Unit': 'mm'},
+        {'Parameter': 'Pipe Wall Thickness', 'Value': 19.1, 'Unit': 'mm'},
+        {'Parameter': 'SMTS', 'Value': 530.9, 'Unit': 'MPa'},
+        {'Parameter': 'Defect Elevation', 'Value': -100, 'Unit': 'm'},
+        {'Parameter': 'Design Pressure', 'Value': 150, 'Unit': 'bar'},
+        {'Parameter': 'Design Temperature', 'Value': 75, 'Unit': '°C'},
+        {'Parameter': 'Incidental to Design Pressure Ratio', 'Value': 1.1, 'Unit': ''},
+        {'Parameter': 'Accuracy', 'Value': 0.1, 'Unit': ''},
+        {'Parameter': 'Confidence Level', 'Value': 0.8, 'Unit': ''},
+        {'Parameter': 'Seawater Density', 'Value': 1025, 'Unit': 'kg/m³'},
+        {'Parameter': 'Containment Density', 'Value': 200, 'Unit': 'kg/m³'},
+        {'Parameter': 'Elevation Reference', 'Value': 30, 'Unit': 'm'},
+        {'Parameter': 'Defect Width', 'Value': '', 'Unit': 'mm'},
+        {'Parameter': 'Combined Stress', 'Value': '', 'Unit': 'MPa'}
+    ]
+    input_table = dash_table.DataTable(
+        id='batch_input_table',
+        columns=[
+            {'name': 'Parameter', 'id': 'Parameter', 'editable': False},
+            {'name': 'Value', 'id': 'Value', 'editable': True},
+            {'name': 'Unit', 'id': 'Unit', 'editable': False}],
+        data=input_fields,
+        fill_width=False,
+        style_cell_conditional=[
+            {
+                'if': {'column_id': 'Parameter'},
+                'textAlign': 'left'
+            }
+        ]
+    )
+
+    input_layout = dbc.Row(
+        [
+            dbc.Row(dbc.Col(html.H2('Pipeline'))),
+            dbc.Row(
+                dbc.Col(dbc.InputGroup([
+                    dbc.InputGroupText("Safety Class:"),
+                    dbc.Select(
+                        id='batch_select_safety_class',
+                        value='medium',
+                        options=[{'label': safety_class.title(), 'value': safety_class}
+                                 for safety_class in SAFETY_CLASSES],
+                        style=center_align_style
+                    )
+                ], className="mb-3"), xs=12, md=6), style=center_align_style
+            ),
+            dbc.Row(dbc.Col(input_table, style=center_align_style)),
+            dbc.Row(dbc.Col(html.H2('Pipe Tally', style={"margin-top": "15px"}))),
+            dbc.Row(dbc.Col(
+                dcc.Upload(
+                    id='batch_upload',
+                    children=html.Div(['Drop or ', html.A('select'), ' a CSV of kp (km), defect_length (mm), '
+                                                                     'defect_depth (t) and optional elevation (m), '
+                                                                     'defect_width (mm) and combined_stress (MPa)']),
+                    style={'borderWidth': '1px', 'borderStyle': 'dashed', 'borderRadius': '5px', 'padding': '10px'}
+                ), xs=12, md=8), style=center_align_style),
+            dbc.Row(dbc.Col(
+                [
+                    dbc.Progress(id='batch_progress', value=0, striped=True, animated=True,
+                                 style={'visibility': 'hidden', "margin-top": "10px"}),
+                    dcc.Markdown(id='batch_summary', style={"margin-top": "10px"})
+                ]
+            )),
+            dbc.Modal(
+                [
+                    dbc.ModalHeader(dbc.ModalTitle("Input Error")),
+                    dbc.ModalBody(id='batch_input_error_modal_body'),
+                ],
+                id="batch_input_error_modal",
+                is_open=False,
+            ),
+            dcc.Store(id='batch_id'),
+            dcc.Store(id='batch_grid_batch_id')
+        ],
+        style={"margin-top": "15px", **center_align_style}
+    )
+
+    # Rows are requested a page at a time and sorted, filtered and paged on the server
+    grid_layout = dbc.Row(
+        dbc.Col(dag.AgGrid(
+            id='batch_grid',
+            rowModelType='infinite',
+            columnDefs=generate_column_defs(['kp', 'defect_length', 'defect_depth', 'effective_pressure',
+                                             'pressure_resistance', 'allowable_relative_depth', 'erf', 'acceptable']),
+            defaultColDef={'sortable': True, 'resizable': True, 'floatingFilter': True,
+                           'filterParams': {'maxNumConditions': 2}},
+            dashGridOptions={
+                'pagination': True,
+                'paginationPageSize': PAGE_SIZE,
+                'cacheBlockSize': PAGE_SIZE,
+                'maxBlocksInCache': 1,
+                'rowBuffer': 0
+            },
+            style={'height': '600px'}
+        ), xs=12, md=10),
+        justify='center',
+        style={"margin-top": "15px"}
+    )
+
+    graph_layout = dbc.Row(
+        dbc.Col(dcc.Loading(dcc.Graph(id='batch_graph')), xs=12, md=10),
+        justify='center',
+        style={"margin-top": "15px"}
+    )
+
+    return dbc.Container(
+        children=[
+            dbc.Row(html.H1("Batch Assessment"), style={"text-align": "center"}),
+            input_layout,
+            graph_layout,
+            grid_layout
+        ],
+        fluid=True
+    )
+
+
+@callback(
+    Output(component_id='batch_id', component_property='data'),
+    Output(component_id='batch_grid', component_property='columnDefs'),
+    Output(component_id='batch_summary', component_property='children'),
+    Output(component_id='batch_graph', component_property='figure'),
+    Output(component_id='batch_input_error_modal', component_property='is_open'),
+    Output(component_id='batch_input_error_modal_body', component_property='children'),
+    Input(component_id='batch_upload', component_property='contents'),
+    State(component_id='batch_input_table', component_property='data'),
+    State(component_id='batch_select_safety_class', component_property='value'),
+    background=True,
+    progress=[
+        Output(component_id='batch_progress', component_property='value'),
+        Output(component_id='batch_progress', component_property='label')
+    ],
+    running=[
+        (Output(component_id='batch_progress', component_property='style'),
+         {'visibility': 'visible', "margin-top": "10px"}, {'visibility': 'hidden', "margin-top": "10px"})
+    ],
+    prevent_initial_call=True
+)
+def assess_tally(set_progress, contents, data, safety_class):
+    start_time = time.time()
+
+    try:
+        set_progress((0, 'Reading tally'))
+        scenario = {'safety_class': safety_class, 'measurement_method': 'relative'}
+        for item in data:
+            value = item['Value']
+            scenario[SCENARIO_PARAMETERS[item['Parameter']]] = float(value) if value not in ('', None) else None
+        features = parse_tally(contents)
+
+        batch_id = generate_cache_key(scenario | {'source': hashlib.sha256(contents.encode()).hexdigest()},
+                                      namespace='batch')
+        result = batch_results.get(batch_id)
+        if result is None:
+            chunks = []
+            # Give every worker a full task per progress update when assessing in parallel
+            chunk_size = CHUNK_SIZE if parallel_executor.max_workers <= 1 else \
+                parallel_executor.max_workers * parallel_executor.rows_per_task
+            for start in range(0, len(features), chunk_size):
+                set_progress((int(90 * start / len(features)), f'Assessing features {start + 1} to '
+                                                               f'{min(start + chunk_size, len(features))}'))
+                chunks.append(parallel_executor.assess_defect_population(scenario,
+                                                                         features.iloc[start:start + chunk_size]))
+            set_progress((90, 'Storing results'))
+            result = pd.concat(chunks, ignore_index=True)
+            result = result[[column for column in GRID_COLUMNS if column in result.columns]]
+            batch_results.set(batch_id, result)
+        set_progress((95, 'Plotting features'))
+        figure = generate_population_plot(scenario, result)
+        set_progress((100, 'Complete'))
+
+        failing = int((~result['acceptable']).sum())
+        summary = (f"{failing} of {len(result)} features unacceptable  \n"
+                   f"Minimum pressure resistance:\t{result['pressure_resistance'].min():.2f} MPa  \n"
+                   f"Maximum ERF:\t{result['erf'].max():.3f}")
+        logger.info(f"Batch assessment completed | {len(result)} features | "
+                    f"Processing time: {time.time() - start_time:.2f}s")
+    except Exception as e:
+        logger.error(f"Error while assessing pipe tally: {e}")
+        return no_update, no_update, no_update, no_update, True, str(e)
+
+    return batch_id, generate_column_defs(result.columns), summary, figure, False, ''
+
+
+# Discard the rows of the previous batch held by the grid so that it requests the new batch
+clientside_callback(
+    ClientsideFunction(namespace='batch_assessment', function_name='refresh_grid'),
+    Output(component_id='batch_grid_batch_id', component_property='data'),
+    Input(component_id='batch_id', component_property='data'),
+    prevent_initial_call=True
+)
+
+
+@callback(
+    Output(component_id='batch_grid', component_property='getRowsResponse'),
+    Input(component_id='batch_grid', component_property='getRowsRequest'),
+    State(component_id='batch_id', component_property='data'),
+    prevent_initial_call=True
+)
+def get_batch_rows(request, batch_id):
+    if request is None:
+        return no_update
+    if batch_id is None:
+        return {'rowData': [], 'rowCount': 0}
+    try:
+        return batch_results.query(batch_id, request)
+    except (KeyError, ValueError) as e:
+        logger.error(f"Error while querying batch results: {e}")
+        return {'rowData': [], 'rowCount': 0}
@@ -1,15 +1,22 @@
 import datetime
+import json
 import time
+from typing import Callable
 
 import dash
 import dash_bootstrap_components as dbc
-from dash import dcc, html, callback, dash_table, no_update
-from dash.dependencies import Input, Output, State
+from dash import dcc, html, callback, clientside_callback, dash_table, no_update
+from dash.dependencies import ClientsideFunction, Input, Output, State
 from loguru import logger
 
 from src.utils import models
+from src.utils.analysis.assessment import assess_pipe, parse_pipe_data, quick_check
+from src.utils.caching.analysis_cache import analysis_cache
 from src.utils.graphing import defect_plots, pipe_plots
+from src.utils.graphing.figure_patches import fingerprint_figure, patch_figure
 from src.utils.layout import center_align_style
+from src.utils.monitoring.profiling import callback_profiler
+from src.utils.monitoring.stage_metrics import stage_metrics
 
 dash.register_page(__name__)
 
@@ -268,6 +275,10 @@ def layout():
                 [
                     dbc.Button(children='Analyse', id='single_defect_table_analyse',
                                style={"margin-top": "10px", "margin-bottom": "10px"}),
+                    dbc.Button(children='Quick Check', id='single_defect_table_quick_check', color='secondary',
+                               style={"margin-top": "10px", "margin-bottom": "10px", "margin-left": "10px"}),
+                    dbc.Progress(id='single_defect_progress', value=0, striped=True, animated=True,
+                                 style={'visibility': 'hidden'}),
                     dcc.Markdown(id='single_defect_table_analysis')
                 ]
             )),
@@ -291,7 +302,10 @@ def layout():
                 dbc.Col(dcc.Loading(dcc.Graph(id='single_defect_pipe_cross_section_graph')), xs=12, sm=10, md=5),
                 dbc.Col(dcc.Loading(dcc.Graph(id='single_defect_defect_cross_section_graph')), xs=12, sm=10, md=5)
             ], justify='center'),
-            dbc.Row(dbc.Col(dcc.Markdown(id='single_defect_table_evaluation', style={"text-align": "center"})))
+            dbc.Row(dbc.Col(dcc.Markdown(id='single_defect_table_evaluation', style={"text-align": "center"}))),
+            dcc.Store(id='single_defect_figure_fingerprints'),
+            # The query string of the page can request profiling of the analysis, see monitoring.profiling
+            dcc.Location(id='single_defect_location', refresh=False)
         ],
         style={"margin-top": "15px", **center_align_style}
     )
@@ -309,109 +323,128 @@ def layout():
     return combined_layout
 
 
-def create_pipe(pipe_data: dict) -> models.Pipe:
+def create_pipe(pipe_data: dict, progress: Callable[[int, str], None] = None) -> models.Pipe:
     """
     Creates a Pipe object from the input data
     Args:
-        pipe_data:
+        pipe_data: Normalised input data
+        progress: Called with the percentage complete and a description of each stage of the assessment
 
     Returns:
         pipe: Pipe object
     """
-    diameter = pipe_data['Pipe Outer Diameter']['Value']
-    wall_thickness = pipe_data['Pipe Wall Thickness']['Value']
-    smts = pipe_data['SMTS']['Value']
-    design_pressure = pipe_data['Design Pressure']['Value']
-    design_temperature = pipe_data['Design Temperature']['Value']
-    incidental_to_design_pressure_ratio = pipe_data['Incidental to Design Pressure Ratio']['Value']
-    accuracy = pipe_data['Accuracy']['Value']
-    confidence_level = pipe_data['Confidence Level']['Value']
-    safety_class = pipe_data['Safety Class']['Value']
-
-    measurement_method = "relative" if pipe_data['Defect Depth']['Unit'] == "t" else "absolute"
-    pipe_config = {
-        'outside_diameter': diameter,
-        'wall_thickness': wall_thickness,
-        'smts': smts,
-        'design_pressure': design_pressure,
-        'design_temperature': design_temperature,
-        'incidental_to_design_pressure_ratio': incidental_to_design_pressure_ratio,
-        'accuracy': accuracy,
-        'confidence_level': confidence_level,
-        'safety_class': safety_class,
-        'measurement_method': measurement_method
-    }
+    return assess_pipe(parse_pipe_data(pipe_data), progress=progress)
 
-    # Configure defect(s)
-    defect_config = {
-        'length': pipe_data['Defect Length']['Value'],
-        'width': pipe_data['Defect Width']['Value'],
-        "relative_depth" if pipe_data['Defect Depth']['Unit'] == "t" else "depth": pipe_data['Defect Depth']['Value']
-    }
-    secondary_defect_config = {
-        'length': pipe_data['Secondary Defect Length']['Value'],
-        'width': pipe_data['Secondary Defect Width']['Value'],
-        "relative_depth" if pipe_data['Secondary Defect Depth']['Unit'] == "t" else "depth": pipe_data['Secondary Defect Depth']['Value']
-    }
-    if pipe_data['First Date']['Value'] and pipe_data['Second Date']['Value']:
-        first_timestamp = datetime.datetime.timestamp(datetime.datetime.strptime(pipe_data['First Date']['Value'], '%Y-%m-%d'))
-        second_timestamp = datetime.datetime.timestamp(datetime.datetime.strptime(pipe_data['Second Date']['Value'], '%Y-%m-%d'))
-
-        defect_config['measurement_timestamp'] = first_timestamp
-        secondary_defect_config['measurement_timestamp'] = second_timestamp
-
-    secondary_defect_separation = pipe_data['Secondary Defect Separation']['Value']
-    if secondary_defect_separation:
-        secondary_defect_config['position'] = secondary_defect_separation
-
-    # Configure environment
-    seawater_density = pipe_data['Seawater Density']['Value']
-    containment_density = pipe_data['Containment Density']['Value']
-    elevation_reference = pipe_data['Elevation Reference']['Value']
-    environment_config = {
-        'seawater_density': seawater_density,
-        'containment_density': containment_density,
-        'elevation_reference': elevation_reference,
-        'elevation': pipe_data['Defect Elevation']['Value']
+
+def analyse_pipe(pipe_data: dict, progress: Callable[[int, str], None] = None) -> dict:
+    """
+    Assesses a pipe and generates its figures
+    Args:
+        pipe_data: Normalised input data
+        progress: Called with the percentage complete and a description of each stage of the assessment
+
+    Returns:
+        result: Serialised figures and the analysis and evaluation text
+    """
+    progress = progress or (lambda percentage, stage: None)
+    pipe = create_pipe(pipe_data, progress=progress)
+
+    # Generate figures
+    progress(80, 'Generating figures')
+    fig1 = defect_plots.generate_defect_depth_plot(pipe)
+    fig2 = pipe_plots.generate_pipe_cross_section_plot(pipe)
+    fig3 = pipe_plots.generate_defect_cross_section_plot(pipe)
+
+    analysis = f"""Effective Pressure:\t{pipe.properties.effective_pressure:.2f} MPa  
+    Pressure Resistance:\t{pipe.properties.pressure_resistance:.2f} MPa"""
+    if any([defect.position for defect in pipe.defects]):
+        if len(pipe.defects) == 3:
+            analysis += "  \nDefect interaction found"
+        else:
+            analysis += "  \nNo defect interaction found"
+
+    if pipe.properties.remaining_life is not None:
+        analysis += f"  \nRemaining Life:\t{pipe.properties.remaining_life:.0f} days"
+
+    evaluation = f"""
+    Effective Pressure {pipe.properties.effective_pressure:.2f} MPa 
+    {'<' if pipe.properties.effective_pressure < pipe.properties.pressure_resistance else '>'} 
+    Pressure Resistance {pipe.properties.pressure_resistance:.2f} MPa.  
+    Corrosion is **{'acceptable' if pipe.properties.effective_pressure < pipe.properties.pressure_resistance else 'unacceptable'}**.
+    """
+
+    with stage_metrics.time('figure_serialisation'):
+        figures = [figure.to_json() for figure in (fig1, fig2, fig3)]
+
+    return {
+        'figures': figures,
+        'analysis': analysis,
+        'evaluation': evaluation
     }
 
-    combined_stress = pipe_data['Combined Stress']['Value']
-    if combined_stress:
-        if secondary_defect_separation:
-            raise ValueError('Interacting defects are not supported with superimposed stress.')
-        if not defect_config['width']:
-            raise ValueError('Defect Width is required for stress calculations.')
-        loading_config = {
-            'combined_stress': combined_stress
-        }
-    else:
-        loading_config = None
 
-    pipe = models.Pipe(config=pipe_config)
-    defect = models.Defect(**defect_config)
-    environment = models.Environment(**environment_config)
+def normalise_inputs(data: list, safety_class: str, secondary_data: list, start_date: str, end_date: str) -> dict:
+    """
+    Combines the input tables into the normalised input data
+    Args:
+        data: Main input table data
+        safety_class: Selected safety class
+        secondary_data: Secondary defect input table data
+        start_date: Date of the first inspection
+        end_date: Date of the second inspection
 
-    pipe.add_defect(defect)
-    if secondary_defect_config['length']:
-        secondary_defect = models.Defect(**secondary_defect_config)
-        pipe.add_defect(secondary_defect)
+    Returns:
+        pipe_data: Normalised input data keyed by parameter
+    """
+    def set_dtypes(table_data):
+        for item in table_data:
+            if item['Value'] == '':
+                item['Value'] = None
+            else:
+                try:
+                    item['Value'] = float(item['Value'])
+                except (ValueError, TypeError):
+                    pass
+        return table_data
+
+    data = set_dtypes(data + [{'Parameter': 'Safety Class', 'Value': safety_class, 'Unit': ''}])
+    data_dict = {item['Parameter']: {"Value": item['Value'], "Unit": item['Unit']} for item in data}
+
+    secondary_data = set_dtypes(secondary_data)
+    secondary_data_dict = {f"Secondary {item['Parameter']}": {"Value": item['Value'], "Unit": item['Unit']} for item in
+                           secondary_data}
+    secondary_data_dict['First Date'] = {"Value": start_date, "Unit": 'date'}
+    secondary_data_dict['Second Date'] = {"Value": end_date, "Unit": 'date'}
 
-    if loading_config:
-        pipe.add_loading(**loading_config)
-    pipe.set_environment(environment)
+    return data_dict | secondary_data_dict
+
+
+def quick_check_pipe(pipe_data: dict) -> dict:
+    """
+    Checks whether a pipe's corrosion is acceptable without calculating limit curves, remaining life or figures
+    Args:
+        pipe_data: Normalised input data
 
-    # Calculate p_corr
-    pipe.calculate_pressure_resistance()
-    pipe.calculate_effective_pressure()
+    Returns:
+        result: Analysis and evaluation text
+    """
+    result = quick_check(parse_pipe_data(pipe_data))
 
-    # Calculate maximum allowable defect depth
-    pipe.calculate_maximum_allowable_defect_depth()
+    analysis = f"""Effective Pressure:\t{result.effective_pressure:.2f} MPa  
+    Pressure Resistance:\t{result.pressure_resistance:.2f} MPa  
+    Quick check only, limit curves and remaining life were not calculated. Select Analyse to generate them."""
 
-    # Calculate estimated remaining life
-    if len(pipe.defects) > 1 and all(defect.measurement_timestamp for defect in pipe.defects):
-        pipe.estimate_remaining_life()
+    evaluation = f"""
+    Effective Pressure {result.effective_pressure:.2f} MPa 
+    {'<' if result.acceptable else '>'} 
+    Pressure Resistance {result.pressure_resistance:.2f} MPa.  
+    Corrosion is **{'acceptable' if result.acceptable else 'unacceptable'}**.
+    """
 
-    return pipe
+    return {
+        'analysis': analysis,
+        'evaluation': evaluation
+    }
 
 
 # Add controls to build the interaction
@@ -423,76 +456,69 @@ def create_pipe(pipe_data: dict) -> models.Pipe:
     Output(component_id='single_defect_table_evaluation', component_property='children'),
     Output(component_id="single_defect_input_error_modal", component_property="is_open"),
     Output(component_id="single_defect_input_error_modal_body", component_property="children"),
+    Output(component_id='single_defect_figure_fingerprints', component_property='data'),
     Input(component_id='single_defect_table_analyse', component_property='n_clicks'),
     State(component_id='single_defect_input_table', component_property='data'),
     State(component_id='single_defect_select_safety_class', component_property='value'),
     State(component_id='single_defect_secondary_input_table', component_property='data'),
     State(component_id='single_defect_date_range', component_property='start_date'),
     State(component_id='single_defect_date_range', component_property='end_date'),
+    State(component_id='single_defect_figure_fingerprints', component_property='data'),
+    State(component_id='single_defect_location', component_property='search'),
+    background=True,
+    progress=[
+        Output(component_id='single_defect_progress', component_property='value'),
+        Output(component_id='single_defect_progress', component_property='label')
+    ],
+    running=[
+        (Output(component_id='single_defect_progress', component_property='style'),
+         {'visibility': 'visible'}, {'visibility': 'hidden'})
+    ],
+    # Re-triggering the callback terminates the running job, editing the inputs abandons it
+    cancel=[
+        Input(component_id='single_defect_input_table', component_property='data_timestamp'),
+        Input(component_id='single_defect_secondary_input_table', component_property='data_timestamp'),
+        Input(component_id='single_defect_select_safety_class', component_property='value'),
+        Input(component_id='single_defect_select_measurement', component_property='value')
+    ]
 )
 def calculate_pipe_characteristics(
+        set_progress,
         trigger_update,
         data,
         safety_class,
         secondary_data,
         start_date,
-        end_date
+        end_date,
+        figure_fingerprints,
+        search
 ):
-    def set_dtypes(table_data):
-        for item in table_data:
-            if item['Value'] == '':
-                item['Value'] = None
-            else:
-                try:
-                    item['Value'] = float(item['Value'])
-                except (ValueError, TypeError):
-                    pass
-        return table_data
-
     start_time = time.time()
 
-    data.append({'Parameter': 'Safety Class', 'Value': safety_class, 'Unit': ''})
-    data = set_dtypes(data)
-
-    data_dict = {item['Parameter']: {"Value": item['Value'], "Unit": item['Unit']} for item in data}
-
-    secondary_data = set_dtypes(secondary_data)
-    secondary_data_dict = {f"Secondary {item['Parameter']}": {"Value": item['Value'], "Unit": item['Unit']} for item in
-                           secondary_data}
-    secondary_data_dict['First Date'] = {"Value": start_date, "Unit": 'date'}
-    secondary_data_dict['Second Date'] = {"Value": end_date, "Unit": 'date'}
-
-    data_dict = data_dict | secondary_data_dict
+    data_dict = normalise_inputs(data, safety_class, secondary_data, start_date, end_date)
 
     error_encountered = False
     error = ''
 
     try:
-        # Create pipe
-        pipe = create_pipe(data_dict)
-
-        # Generate figures
-        fig1 = defect_plots.generate_defect_depth_plot(pipe)
-        fig2 = pipe_plots.generate_pipe_cross_section_plot(pipe)
-        fig3 = pipe_plots.generate_defect_cross_section_plot(pipe)
-
-        analysis = f"""Effective Pressure:\t{pipe.properties.effective_pressure:.2f} MPa  
-        Pressure Resistance:\t{pipe.properties.pressure_resistance:.2f} MPa"""
-        if any([defect.position for defect in pipe.defects]):
-            if len(pipe.defects) == 3:
-                analysis += "  \nDefect interaction found"
-            else:
-                analysis += "  \nNo defect interaction found"
-
-        if pipe.properties.remaining_life is not None:
-            analysis += f"  \nRemaining Life:\t{pipe.properties.remaining_life:.0f} days"
-
-        evaluation = f"""
-        Effective Pressure {pipe.properties.effective_pressure:.2f} MPa 
-        {'<' if pipe.properties.effective_pressure < pipe.properties.pressure_resistance else '>'} 
-        Pressure Resistance {pipe.properties.pressure_resistance:.2f} MPa.  
-        Corrosion is **{'acceptable' if pipe.properties.effective_pressure < pipe.properties.pressure_resistance else 'unacceptable'}**.
-        """
+        def report_progress(percentage, stage):
+            set_progress((percentage, stage))
+
+        report_progress(0, 'Queued')
+        with callback_profiler.profile('calculate_pipe_characteristics', data_dict,
+                                       enabled=callback_profiler.requested(search)):
+            result = analysis_cache.get_or_compute(data_dict,
+                                                   lambda: analyse_pipe(data_dict, progress=report_progress))
+            report_progress(100, 'Complete')
+            figures = [json.loads(figure) for figure in result['figures']]
+
+            # Only send the traces, layout entries and shapes that differ from the displayed figures
+            figure_fingerprints = figure_fingerprints or [None] * len(figures)
+            fig1, fig2, fig3 = [patch_figure(figure, fingerprint)
+                                for figure, fingerprint in zip(figures, figure_fingerprints)]
+            figure_fingerprints = [fingerprint_figure(figure) for figure in figures]
+        analysis = result['analysis']
+        evaluation = result['evaluation']
         logger.info(f"Single-Defect Scenario loaded | Processing time: {time.time() - start_time:.2f}s")
     except Exception as e:
         # Upon error, open the modal
@@ -504,81 +530,64 @@ def calculate_pipe_characteristics(
         fig3 = no_update
         analysis = no_update
         evaluation = no_update
+        figure_fingerprints = no_update
+    finally:
+        # Background callbacks run in their own process, add the stages they timed to the shared metrics
+        stage_metrics.flush()
 
-    return fig1, fig2, fig3, analysis, evaluation, error_encountered, error
+    return fig1, fig2, fig3, analysis, evaluation, error_encountered, error, figure_fingerprints
 
 
 @callback(
-    Output(component_id='single_defect_input_table', component_property='data'),
-    Output(component_id='single_defect_secondary_input_table', component_property='data'),
-    Input(component_id='single_defect_select_measurement', component_property='value'),
+    Output(component_id='single_defect_table_analysis', component_property='children', allow_duplicate=True),
+    Output(component_id='single_defect_table_evaluation', component_property='children', allow_duplicate=True),
+    Output(component_id="single_defect_input_error_modal", component_property="is_open", allow_duplicate=True),
+    Output(component_id="single_defect_input_error_modal_body", component_property="children", allow_duplicate=True),
+    Input(component_id='single_defect_table_quick_check', component_property='n_clicks'),
     State(component_id='single_defect_input_table', component_property='data'),
+    State(component_id='single_defect_select_safety_class', component_property='value'),
     State(component_id='single_defect_secondary_input_table', component_property='data'),
+    State(component_id='single_defect_date_range', component_property='start_date'),
+    State(component_id='single_defect_date_range', component_property='end_date'),
     prevent_initial_call=True
 )
-def update_measurement_method(measurement: str, main_data: dict, secondary_data: dict):
-    """
-    Updates the input table to reflect the selected measurement method
-    Args:
-        measurement: 'relative' or 'absolute'
-        main_data: main input table data
-        secondary_data: secondary input table data
-
-    Returns:
+def quick_check_pipe_characteristics(trigger_update, data, safety_class, secondary_data, start_date, end_date):
+    # Runs in the request thread, the check takes milliseconds so no background job is needed
+    start_time = time.time()
+    data_dict = normalise_inputs(data, safety_class, secondary_data, start_date, end_date)
 
-    """
-    if measurement == 'relative':
-        main_data[5]['Unit'] = 't'
-        main_data[10]['Unit'] = ''
+    try:
+        result = quick_check_pipe(data_dict)
+        logger.info(f"Single-Defect Scenario checked | Processing time: {time.time() - start_time:.3f}s")
+    except Exception as e:
+        logger.error(f"Error while checking single-defect scenario: {e}")
+        return no_update, no_update, True, str(e)
 
-        secondary_data[2]['Unit'] = 't'
-    else:
-        main_data[5]['Unit'] = 'mm'
-        main_data[10]['Unit'] = 'mm'
+    return result['analysis'], result['evaluation'], False, ''
 
-        secondary_data[2]['Unit'] = 'mm'
-    return main_data, secondary_data
 
+# Pure UI state changes are handled in the browser, see assets/defect_analysis.js
+clientside_callback(
+    ClientsideFunction(namespace='defect_analysis', function_name='update_measurement_method'),
+    Output(component_id='single_defect_input_table', component_property='data'),
+    Output(component_id='single_defect_secondary_input_table', component_property='data'),
+    Input(component_id='single_defect_select_measurement', component_property='value'),
+    State(component_id='single_defect_input_table', component_property='data'),
+    State(component_id='single_defect_secondary_input_table', component_property='data'),
+    prevent_initial_call=True
+)
 
-@callback(
+clientside_callback(
+    ClientsideFunction(namespace='defect_analysis', function_name='sanitise_stress_values'),
     Output(component_id='single_defect_input_table', component_property='data', allow_duplicate=True),
     Input(component_id='single_defect_input_table', component_property='data_timestamp'),
     State(component_id='single_defect_input_table', component_property='data'),
     prevent_initial_call=True
 )
-def sanitise_stress_values(timestamp: str, rows: dict):
-    """
-    Updates the input table to reflect the selected measurement method
-    Args:
-        timestamp: data update timestamp
-        rows: input table data rows
-
-    Returns:
 
-    """
-    axial_stress = 0
-    bending_stress = 0
-
-    for row in rows:
-        if row['Parameter'] == 'Axial Stress' and row['Value']:
-            axial_stress = abs(float(row['Value']))
-        if row['Parameter'] == 'Bending Stress' and row['Value']:
-            bending_stress = abs(float(row['Value']))
-        if row['Parameter'] == 'Combined Stress':
-            if any([axial_stress, bending_stress]):
-                row['Value'] = -1 * abs(axial_stress + bending_stress)
-            elif row['Value']:
-                row['Value'] = -1 * abs(float(row['Value']))
-
-    return rows
-
-
-@callback(
+clientside_callback(
+    ClientsideFunction(namespace='defect_analysis', function_name='toggle_collapse'),
     Output("secondary_defect_collapse", "is_open"),
     [Input("secondary_defect_collapse_button", "n_clicks")],
     [State("secondary_defect_collapse", "is_open")],
 )
-def toggle_collapse(n, is_open):
-    if n:
-        return not is_open
-    return is_open
@@ -0,0 +1,240 @@
+import hashlib
+import time
+
+import dash
+import dash_bootstrap_components as dbc
+from dash import dcc, html, callback, ctx, dash_table, no_update
+from dash.dependencies import Input, Output, State
+from loguru import logger
+
+from src.utils.analysis.lod_pyramid import LodPyramid, pyramid_store
+from src.utils.analysis.sweep import assess_defect_population
+from src.utils.analysis.synthetic_features import generate_synthetic_features
+from src.utils.analysis.tally import parse_tally
+from src.utils.caching.limit_curve_cache import generate_cache_key
+from src.utils.graphing.overview_plots import OVERVIEW_METRICS, generate_overview_plot
+from src.utils.layout import center_align_style
+
+dash.register_page(__name__)
+
+# Input table parameters and their scenario keys, the defect dimensions and elevation are given per feature
+SCENARIO_PARAMETERS = {
+    'Pipe Outer Diameter': 'outside_diameter',
+    'Pipe Wall Thickness': 'wall_thickness',
+    'SMTS': 'smts',
+    'Defect Elevation': 'elevation',
+    'Design Pressure': 'design_pressure',
+    'Design Temperature': 'design_temperature',
+    'Incidental to Design Pressure Ratio': 'incidental_to_design_pressure_ratio',
+    'Accuracy': 'accuracy',
+    'Confidence Level': 'confidence_level',
+    'Seawater Density': 'seawater_density',
+    'Containment Density': 'containment_density',
+    'Elevation Reference': 'elevation_reference'
+}
+SAFETY_CLASSES = ['low', 'medium', 'high']
+# Maximum number of features or bins sent to the browser for any zoom window
+MAX_WINDOW_POINTS = 2000
+
+
+def layout():
+    # Base scenario configured with the default values as defined in Example A.1-1
+    input_fields = [
+        {'Parameter': 'Pipe Outer Diameter', 'Value': 812.8, 'Unit': 'mm'},
+        {'Parameter': 'Pipe Wall Thickness', 'Value': 19.1, 'Unit': 'mm'},
+        {'Parameter': 'SMTS', 'Value': 530.9, 'Unit': 'MPa'},
+        {'Parameter': 'Defect Elevation', 'Value': -100, 'Unit': 'm'},
+        {'Parameter': 'Design Pressure', 'Value': 150, 'Unit': 'bar'},
+        {'Parameter': 'Design Temperature', 'Value': 75, 'Unit': '°C'},
+        {'Parameter': 'Incidental to Design Pressure Ratio', 'Value': 1.1, 'Unit': ''},
+        {'Parameter': 'Accuracy', 'Value': 0.1, 'Unit': ''},
+        {'Parameter': 'Confidence Level', 'Value': 0.8, 'Unit': ''},
+        {'Parameter': 'Seawater Density', 'Value': 1025, 'Unit': 'kg/m³'},
+        {'Parameter': 'Containment Density', 'Value': 200, 'Unit': 'kg/m³'},
+        {'Parameter': 'Elevation Reference', 'Value': 30, 'Unit': 'm'}
+    ]
+    input_table = dash_table.DataTable(
+        id='overview_input_table',
+        columns=[
+            {'name': 'Parameter', 'id': 'Parameter', 'editable': False},
+            {'name': 'Value', 'id': 'Value', 'editable': True},
+            {'name': 'Unit', 'id': 'Unit', 'editable': False}],
+        data=input_fields,
+        fill_width=False,
+        style_cell_conditional=[
+            {
+                'if': {'column_id': 'Parameter'},
+                'textAlign': 'left'
+            }
+        ]
+    )
+
+    input_layout = dbc.Row(
+        [
+            dbc.Row(dbc.Col(html.H2('Pipeline'))),
+            dbc.Row(
+                dbc.Col(dbc.InputGroup([
+                    dbc.InputGroupText("Safety Class:"),
+                    dbc.Select(
+                        id='overview_select_safety_class',
+                        value='medium',
+                        options=[{'label': safety_class.title(), 'value': safety_class}
+                                 for safety_class in SAFETY_CLASSES],
+                        style=center_align_style
+                    )
+                ], className="mb-3"), xs=12, md=6), style=center_align_style
+            ),
+            dbc.Row(dbc.Col(input_table, style=center_align_style)),
+            dbc.Row(dbc.Col(html.H2('Features', style={"margin-top": "15px"}))),
+            dbc.Row(dbc.Col(
+                dcc.Upload(
+                    id='overview_upload',
+                    children=html.Div(['Drop or ', html.A('select'), ' a CSV of kp (km), defect_length (mm), '
+                                                                     'defect_depth (t) and optional elevation (m)']),
+                    style={'borderWidth': '1px', 'borderStyle': 'dashed', 'borderRadius': '5px', 'padding': '10px'}
+                ), xs=12, md=8), style=center_align_style),
+            dbc.Row(
+                dbc.Col(dbc.InputGroup([
+                    dbc.InputGroupText("Synthetic Features:"),
+                    dbc.Input(id='overview_synthetic_count', type='number', value=1_000_000, min=1, max=10_000_000),
+                    dbc.Button(children='Load Synthetic Line', id='overview_load_synthetic')
+                ], style={"margin-top": "10px"}), xs=12, md=6), style=center_align_style
+            ),
+            dbc.Row(
+                dbc.Col(dbc.InputGroup([
+                    dbc.InputGroupText("Metric:"),
+                    dbc.Select(
+                        id='overview_select_metric',
+                        value='erf',
+                        options=[{'label': label, 'value': value} for value, label in OVERVIEW_METRICS.items()]
+                    )
+                ], style={"margin-top": "10px"}), xs=12, md=6), style=center_align_style
+            ),
+            dbc.Row(dbc.Col(dcc.Loading(dcc.Markdown(id='overview_summary', style={"margin-top": "10px"})))),
+            dbc.Modal(
+                [
+                    dbc.ModalHeader(dbc.ModalTitle("Input Error")),
+                    dbc.ModalBody(id='overview_input_error_modal_body'),
+                ],
+                id="overview_input_error_modal",
+                is_open=False,
+            ),
+            dcc.Store(id='overview_dataset_id')
+        ],
+        style={"margin-top": "15px", **center_align_style}
+    )
+
+    graphs_layout = dbc.Row(
+        dbc.Col(dcc.Graph(id='overview_graph'), xs=12, md=10),
+        justify='center',
+        style={"margin-top": "15px"}
+    )
+
+    return dbc.Container(
+        children=[
+            dbc.Row(html.H1("Pipeline Overview"), style={"text-align": "center"}),
+            input_layout,
+            graphs_layout
+        ],
+        fluid=True
+    )
+
+
+def parse_relayout_range(relayout_data: dict | None) -> tuple[float | None, float | None] | None:
+    """
+    Extracts the KP window from a graph's relayoutData
+    Args:
+        relayout_data: relayoutData of the overview graph
+
+    Returns:
+        window: (start, end) of the visible KP range, (None, None) for the full line, or None if the x-axis range
+                did not change
+    """
+    if not relayout_data or relayout_data.get('xaxis.autorange'):
+        return None, None
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        return float(relayout_data['xaxis.range[0]']), float(relayout_data['xaxis.range[1]'])
+    if 'xaxis.range' in relayout_data:
+        start, end = relayout_data['xaxis.range']
+        return float(start), float(end)
+    return None
+
+
+@callback(
+    Output(component_id='overview_dataset_id', component_property='data'),
+    Output(component_id='overview_summary', component_property='children'),
+    Output(component_id='overview_input_error_modal', component_property='is_open'),
+    Output(component_id='overview_input_error_modal_body', component_property='children'),
+    Input(component_id='overview_upload', component_property='contents'),
+    Input(component_id='overview_load_synthetic', component_property='n_clicks'),
+    State(component_id='overview_synthetic_count', component_property='value'),
+    State(component_id='overview_input_table', component_property='data'),
+    State(component_id='overview_select_safety_class', component_property='value'),
+    prevent_initial_call=True
+)
+def load_features(contents, trigger_load, synthetic_count, data, safety_class):
+    # The pyramid is kept in the memory of the serving process, so it is built in the request rather than as a
+    # background callback running in a separate worker process
+    start_time = time.time()
+
+    try:
+        scenario = {'safety_class': safety_class, 'measurement_method': 'relative'}
+        for item in data:
+            value = item['Value']
+            scenario[SCENARIO_PARAMETERS[item['Parameter']]] = float(value) if value not in ('', None) else None
+
+        if ctx.triggered_id == 'overview_upload':
+            features = parse_tally(contents)
+            source = hashlib.sha256(contents.encode()).hexdigest()
+        else:
+            if not synthetic_count or synthetic_count < 1:
+                raise ValueError('The number of synthetic features must be at least 1.')
+            features = generate_synthetic_features(int(synthetic_count))
+            source = f'synthetic:{int(synthetic_count)}'
+
+        dataset_id = generate_cache_key(scenario | {'source': source}, namespace='overview')
+        pyramid = pyramid_store.get(dataset_id)
+        if pyramid is None:
+            result = assess_defect_population(scenario, features)
+            pyramid = LodPyramid(result['kp'], {metric: result[metric] for metric in OVERVIEW_METRICS},
+                                 severity='erf')
+            pyramid_store.set(dataset_id, pyramid)
+
+        summary = f"{len(pyramid)} features loaded in {len(pyramid.levels)} levels of detail"
+        logger.info(f"Pipeline overview loaded | {len(pyramid)} features | "
+                    f"Processing time: {time.time() - start_time:.2f}s")
+    except Exception as e:
+        logger.error(f"Error while loading pipeline features: {e}")
+        return no_update, no_update, True, str(e)
+
+    return dataset_id, summary, False, ''
+
+
+@callback(
+    Output(component_id='overview_graph', component_property='figure'),
+    Input(component_id='overview_dataset_id', component_property='data'),
+    Input(component_id='overview_select_metric', component_property='value'),
+    Input(component_id='overview_graph', component_property='relayoutData'),
+    prevent_initial_call=True
+)
+def update_overview_window(dataset_id, metric, relayout_data):
+    if dataset_id is None:
+        return no_update
+    if ctx.triggered_id == 'overview_graph':
+        kp_range = parse_relayout_range(relayout_data)
+        if kp_range is None:
+            return no_update
+    else:
+        # A new dataset or metric starts from the full line
+        kp_range = (None, None)
+
+    pyramid = pyramid_store.get(dataset_id)
+    if pyramid is None:
+        logger.warning(f"Pipeline overview dataset {dataset_id} is no longer available")
+        return no_update
+
+    window = pyramid.window(*kp_range, max_points=MAX_WINDOW_POINTS)
+    fig = generate_overview_plot(window, metric, dataset_id=dataset_id)
+    if kp_range != (None, None):
+        fig.update_xaxes(range=list(kp_range))
+    return fig
@@ -0,0 +1,230 @@
+import time
+
+import dash
+import dash_bootstrap_components as dbc
+import numpy as np
+from dash import dcc, html, callback, dash_table, no_update
+from dash.dependencies import Input, Output, State
+from loguru import logger
+
+from src.utils.analysis.sweep import run_parameter_sweep
+from src.utils.graphing.sweep_plots import generate_sweep_heatmap, RESULT_LABELS
+from src.utils.layout import center_align_style
+
+dash.register_page(__name__)
+
+# Input table parameters and their scenario keys
+SCENARIO_PARAMETERS = {
+    'Pipe Outer Diameter': 'outside_diameter',
+    'Pipe Wall Thickness': 'wall_thickness',
+    'SMTS': 'smts',
+    'Defect Length': 'defect_length',
+    'Defect Width': 'defect_width',
+    'Defect Depth': 'defect_depth',
+    'Defect Elevation': 'elevation',
+    'Design Pressure': 'design_pressure',
+    'Design Temperature': 'design_temperature',
+    'Incidental to Design Pressure Ratio': 'incidental_to_design_pressure_ratio',
+    'Accuracy': 'accuracy',
+    'Confidence Level': 'confidence_level',
+    'Seawater Density': 'seawater_density',
+    'Containment Density': 'containment_density',
+    'Elevation Reference': 'elevation_reference',
+    'Combined Stress': 'combined_stress'
+}
+SWEEP_OPTIONS = [
+    {'label': 'Design Pressure (bar)', 'value': 'design_pressure'},
+    {'label': 'Accuracy', 'value': 'accuracy'},
+    {'label': 'Confidence Level', 'value': 'confidence_level'},
+    {'label': 'Safety Class', 'value': 'safety_class'},
+    {'label': 'Defect Elevation (m)', 'value': 'elevation'},
+    {'label': 'Combined Stress (MPa)', 'value': 'combined_stress'},
+    {'label': 'Defect Length (mm)', 'value': 'defect_length'},
+    {'label': 'Defect Depth (t)', 'value': 'defect_depth'}
+]
+SAFETY_CLASSES = ['low', 'medium', 'high']
+
+
+def generate_range_inputs(axis: str, parameter: str, start: float, stop: float):
+    return dbc.InputGroup(
+        [
+            dbc.InputGroupText(f"{axis.upper()}:"),
+            dbc.Select(id=f'sensitivity_{axis}_parameter', value=parameter, options=SWEEP_OPTIONS),
+            dbc.Input(id=f'sensitivity_{axis}_start', type='number', value=start, placeholder='Start'),
+            dbc.Input(id=f'sensitivity_{axis}_stop', type='number', value=stop, placeholder='Stop'),
+            dbc.Input(id=f'sensitivity_{axis}_steps', type='number', value=21, min=2, max=201, placeholder='Steps')
+        ],
+        className="mb-3"
+    )
+
+
+def layout():
+    # Base scenario configured with the default values as defined in Example A.1-1
+    input_fields = [
+        {'Parameter': 'Pipe Outer Diameter', 'Value': 812.8, 'Unit': 'mm'},
+        {'Parameter': 'Pipe Wall Thickness', 'Value': 19.1, 'Unit': 'mm'},
+        {'Parameter': 'SMTS', 'Value': 530.9, 'Unit': 'MPa'},
+        {'Parameter': 'Defect Length', 'Value': 200, 'Unit': 'mm'},
+        {'Parameter': 'Defect Width', 'Value': '', 'Unit': 'mm'},
+        {'Parameter': 'Defect Depth', 'Value': 0.25, 'Unit': 't'},
+        {'Parameter': 'Defect Elevation', 'Value': -100, 'Unit': 'm'},
+        {'Parameter': 'Design Pressure', 'Value': 150, 'Unit': 'bar'},
+        {'Parameter': 'Design Temperature', 'Value': 75, 'Unit': '°C'},
+        {'Parameter': 'Incidental to Design Pressure Ratio', 'Value': 1.1, 'Unit': ''},
+        {'Parameter': 'Accuracy', 'Value': 0.1, 'Unit': ''},
+        {'Parameter': 'Confidence Level', 'Value': 0.8, 'Unit': ''},
+        {'Parameter': 'Seawater Density', 'Value': 1025, 'Unit': 'kg/m³'},
+        {'Parameter': 'Containment Density', 'Value': 200, 'Unit': 'kg/m³'},
+        {'Parameter': 'Elevation Reference', 'Value': 30, 'Unit': 'm'},
+        {'Parameter': 'Combined Stress', 'Value': '', 'Unit': 'MPa'}
+    ]
+    input_table = dash_table.DataTable(
+        id='sensitivity_input_table',
+        columns=[
+            {'name': 'Parameter', 'id': 'Parameter', 'editable': False},
+            {'name': 'Value', 'id': 'Value', 'editable': True},
+            {'name': 'Unit', 'id': 'Unit', 'editable': False}],
+        data=input_fields,
+        fill_width=False,
+        style_cell_conditional=[
+            {
+                'if': {'column_id': 'Parameter'},
+                'textAlign': 'left'
+            }
+        ]
+    )
+
+    input_layout = dbc.Row(
+        [
+            dbc.Row(dbc.Col(html.H2('Base Scenario'))),
+            dbc.Row(
+                dbc.Col(dbc.InputGroup([
+                    dbc.InputGroupText("Safety Class:"),
+                    dbc.Select(
+                        id='sensitivity_select_safety_class',
+                        value='medium',
+                        options=[{'label': safety_class.title(), 'value': safety_class}
+                                 for safety_class in SAFETY_CLASSES],
+                        style=center_align_style
+                    )
+                ], className="mb-3"), xs=12, md=6), style=center_align_style
+            ),
+            dbc.Row(dbc.Col(input_table, style=center_align_style)),
+            dbc.Row(dbc.Col(html.H2('Sweep', style={"margin-top": "15px"}))),
+            dbc.Row(dbc.Col(generate_range_inputs('x', 'design_pressure', 100, 200), xs=12, md=8),
+                    style=center_align_style),
+            dbc.Row(dbc.Col(generate_range_inputs('y', 'accuracy', 0.02, 0.16), xs=12, md=8),
+                    style=center_align_style),
+            dbc.Row(
+                dbc.Col(dbc.InputGroup([
+                    dbc.InputGroupText("Result:"),
+                    dbc.Select(
+                        id='sensitivity_select_result',
+                        value='acceptable',
+                        options=[{'label': label, 'value': value} for value, label in RESULT_LABELS.items()]
+                    )
+                ], className="mb-3"), xs=12, md=6), style=center_align_style
+            ),
+            dbc.Row(dbc.Col(
+                [
+                    dbc.Button(children='Run Sweep', id='sensitivity_run',
+                               style={"margin-top": "10px", "margin-bottom": "10px"}),
+                    dcc.Markdown(id='sensitivity_summary')
+                ]
+            )),
+            dbc.Modal(
+                [
+                    dbc.ModalHeader(dbc.ModalTitle("Input Error")),
+                    dbc.ModalBody(id='sensitivity_input_error_modal_body'),
+                ],
+                id="sensitivity_input_error_modal",
+                is_open=False,
+            ),
+        ],
+        style={"margin-top": "15px", **center_align_style}
+    )
+
+    graphs_layout = dbc.Row(
+        dbc.Col(dcc.Loading(dcc.Graph(id='sensitivity_heatmap')), xs=12, md=10),
+        justify='center',
+        style={"margin-top": "15px"}
+    )
+
+    return dbc.Container(
+        children=[
+            dbc.Row(html.H1("Sensitivity Study"), style={"text-align": "center"}),
+            input_layout,
+            graphs_layout
+        ],
+        fluid=True
+    )
+
+
+def generate_sweep_values(parameter: str, start: float, stop: float, steps: int) -> list:
+    """
+    Generates the values of a swept parameter
+    Args:
+        parameter: Swept parameter
+        start: First value of the range
+        stop: Last value of the range
+        steps: Number of values in the range
+
+    Returns:
+        values: Values to be evaluated
+    """
+    if parameter == 'safety_class':
+        return SAFETY_CLASSES
+    if start is None or stop is None or not steps:
+        raise ValueError(f'A range must be provided for {parameter}.')
+    return list(np.linspace(float(start), float(stop), int(steps)))
+
+
+@callback(
+    Output(component_id='sensitivity_heatmap', component_property='figure'),
+    Output(component_id='sensitivity_summary', component_property='children'),
+    Output(component_id='sensitivity_input_error_modal', component_property='is_open'),
+    Output(component_id='sensitivity_input_error_modal_body', component_property='children'),
+    Input(component_id='sensitivity_run', component_property='n_clicks'),
+    State(component_id='sensitivity_input_table', component_property='data'),
+    State(component_id='sensitivity_select_safety_class', component_property='value'),
+    State(component_id='sensitivity_x_parameter', component_property='value'),
+    State(component_id='sensitivity_x_start', component_property='value'),
+    State(component_id='sensitivity_x_stop', component_property='value'),
+    State(component_id='sensitivity_x_steps', component_property='value'),
+    State(component_id='sensitivity_y_parameter', component_property='value'),
+    State(component_id='sensitivity_y_start', component_property='value'),
+    State(component_id='sensitivity_y_stop', component_property='value'),
+    State(component_id='sensitivity_y_steps', component_property='value'),
+    State(component_id='sensitivity_select_result', component_property='value'),
+    background=True,
+    running=[(Output(component_id='sensitivity_run', component_property='disabled'), True, False)]
+)
+def run_sensitivity_study(trigger_update, data, safety_class, x, x_start, x_stop, x_steps,
+                          y, y_start, y_stop, y_steps, result_column):
+    start_time = time.time()
+
+    try:
+        if x == y:
+            raise ValueError('Select different parameters for the X and Y axes.')
+
+        scenario = {'safety_class': safety_class, 'measurement_method': 'relative'}
+        for item in data:
+            value = item['Value']
+            scenario[SCENARIO_PARAMETERS[item['Parameter']]] = float(value) if value not in ('', None) else None
+
+        sweep = {
+            x: generate_sweep_values(x, x_start, x_stop, x_steps),
+            y: generate_sweep_values(y, y_start, y_stop, y_steps)
+        }
+        result = run_parameter_sweep(scenario, sweep)
+        fig = generate_sweep_heatmap(result, x=x, y=y, value=result_column)
+
+        summary = (f"{result['acceptable'].sum()} of {len(result)} scenarios acceptable  \n"
+                   f"Minimum pressure resistance:\t{result['pressure_resistance'].min():.2f} MPa")
+        logger.info(f"Sensitivity study completed | {len(result)} scenarios | "
+                    f"Processing time: {time.time() - start_time:.2f}s")
+    except Exception as e:
+        logger.error(f"Error while running sensitivity study: {e}")
+        return no_update, no_update, True, str(e)
+
+    return fig, summary, False, ''
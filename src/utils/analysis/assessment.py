@@ -0,0 +1,307 @@
+"""
+Assessment entry points shared by the Dash pages and the REST API.
+Inputs are described by plain configuration dicts mirroring the model constructors:
+    {'pipe': Pipe config, 'defects': [Defect config], 'environment': Environment config, 'loading': add_loading kwargs}
+"""
+import datetime
+import json
+import math
+from dataclasses import fields
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from src.utils import models
+from src.utils.analysis.sweep import SCENARIO_DEFAULTS, SCENARIO_KEYS, assess_features
+from src.utils.models.factors import Factors
+
+# Defect config keys and the matching scenario keys of the vectorised assessment
+DEFECT_COLUMNS = {
+    'length': 'defect_length',
+    'relative_depth': 'defect_depth',
+    'depth': 'defect_depth',
+    'width': 'defect_width',
+    'elevation': 'elevation',
+    'combined_stress': 'combined_stress'
+}
+
+
+def parse_pipe_data(pipe_data: dict) -> dict:
+    """
+    Converts the normalised input table data of the defect analysis page to model configs
+    Args:
+        pipe_data: {parameter: {'Value': value, 'Unit': unit}}
+
+    Returns:
+        configs: {'pipe', 'defects', 'environment', 'loading'}, with loading None if no stress is applied
+    """
+    measurement_method = "relative" if pipe_data['Defect Depth']['Unit'] == "t" else "absolute"
+    pipe_config = {
+        'outside_diameter': pipe_data['Pipe Outer Diameter']['Value'],
+        'wall_thickness': pipe_data['Pipe Wall Thickness']['Value'],
+        'smts': pipe_data['SMTS']['Value'],
+        'design_pressure': pipe_data['Design Pressure']['Value'],
+        'design_temperature': pipe_data['Design Temperature']['Value'],
+        'incidental_to_design_pressure_ratio': pipe_data['Incidental to Design Pressure Ratio']['Value'],
+        'accuracy': pipe_data['Accuracy']['Value'],
+        'confidence_level': pipe_data['Confidence Level']['Value'],
+        'safety_class': pipe_data['Safety Class']['Value'],
+        'measurement_method': measurement_method
+    }
+
+    # Configure defect(s)
+    defect_config = {
+        'length': pipe_data['Defect Length']['Value'],
+        'width': pipe_data['Defect Width']['Value'],
+        "relative_depth" if pipe_data['Defect Depth']['Unit'] == "t" else "depth": pipe_data['Defect Depth']['Value']
+    }
+    secondary_defect_config = {
+        'length': pipe_data['Secondary Defect Length']['Value'],
+        'width': pipe_data['Secondary Defect Width']['Value'],
+        "relative_depth" if pipe_data['Secondary Defect Depth']['Unit'] == "t" else "depth":
+            pipe_data['Secondary Defect Depth']['Value']
+    }
+    if pipe_data['First Date']['Value'] and pipe_data['Second Date']['Value']:
+        first_timestamp = datetime.datetime.timestamp(
+            datetime.datetime.strptime(pipe_data['First Date']['Value'], '%Y-%m-%d'))
+        second_timestamp = datetime.datetime.timestamp(
+            datetime.datetime.strptime(pipe_data['Second Date']['Value'], '%Y-%m-%d'))
+
+        defect_config['measurement_timestamp'] = first_timestamp
+        secondary_defect_config['measurement_timestamp'] = second_timestamp
+
+    secondary_defect_separation = pipe_data['Secondary Defect Separation']['Value']
+    if secondary_defect_separation:
+        secondary_defect_config['position'] = secondary_defect_separation
+
+    defect_configs = [defect_config]
+    if secondary_defect_config['length']:
+        defect_configs.append(secondary_defect_config)
+
+    # Configure environment
+    environment_config = {
+        'seawater_density': pipe_data['Seawater Density']['Value'],
+        'containment_density': pipe_data['Containment Density']['Value'],
+        'elevation_reference': pipe_data['Elevation Reference']['Value'],
+        'elevation': pipe_data['Defect Elevation']['Value']
+    }
+
+    combined_stress = pipe_data['Combined Stress']['Value']
+    if combined_stress:
+        if secondary_defect_separation:
+            raise ValueError('Interacting defects are not supported with superimposed stress.')
+        if not defect_config['width']:
+            raise ValueError('Defect Width is required for stress calculations.')
+        loading_config = {
+            'combined_stress': combined_stress
+        }
+    else:
+        loading_config = None
+
+    return {
+        'pipe': pipe_config,
+        'defects': defect_configs,
+        'environment': environment_config,
+        'loading': loading_config
+    }
+
+
+def build_pipe(configs: dict) -> models.Pipe:
+    """
+    Builds a new Pipe from model configs, the configs are not modified
+    Args:
+        configs: {'pipe', 'defects', 'environment', 'loading'} model configs
+
+    Returns:
+        pipe: Pipe with its defects, loading and environment set
+    """
+    pipe = models.Pipe(config=dict(configs['pipe']))
+    for defect_config in configs['defects']:
+        pipe.add_defect(models.Defect(**defect_config))
+    if configs.get('loading'):
+        pipe.add_loading(**configs['loading'])
+    pipe.set_environment(models.Environment(**configs['environment']))
+    return pipe
+
+
+def assess_pipe(configs: dict, progress: Callable[[int, str], None] = None) -> models.Pipe:
+    """
+    Assesses the defects of a pipe, including their limit curves and remaining life
+    Args:
+        configs: {'pipe', 'defects', 'environment', 'loading'} model configs
+        progress: Called with the percentage complete and a description of each stage of the assessment
+
+    Returns:
+        pipe: Assessed Pipe object
+    """
+    progress = progress or (lambda percentage, stage: None)
+    pipe = build_pipe(configs)
+
+    # Calculate p_corr
+    progress(10, 'Calculating pressure resistance')
+    pipe.calculate_pressure_resistance()
+    pipe.calculate_effective_pressure()
+
+    # Calculate maximum allowable defect depth
+    progress(30, 'Calculating limit curves')
+    pipe.calculate_maximum_allowable_defect_depth()
+
+    # Calculate estimated remaining life
+    if len(pipe.defects) > 1 and all(defect.measurement_timestamp for defect in pipe.defects):
+        progress(60, 'Estimating remaining life')
+        pipe.estimate_remaining_life()
+
+    return pipe
+
+
+def quick_check(configs: dict) -> models.QuickCheckResult:
+    """
+    Checks the acceptance of the defects of a pipe without calculating limit curves or the remaining life
+    Args:
+        configs: {'pipe', 'defects', 'environment', 'loading'} model configs
+
+    Returns:
+        result: Result of Pipe.quick_check
+    """
+    return build_pipe(configs).quick_check()
+
+
+def validate_configs(configs: dict) -> float | None:
+    """
+    Checks the pipe and loading configs with the validation of the models. The vectorised assessment does not raise for
+    invalid pipe inputs, e.g. a design temperature outside the de-rating range gives NaN pressure resistances, which
+    would be reported as unacceptable defects.
+    Args:
+        configs: {'pipe', 'loading'} model configs with every pipe input set, 'loading' is optional
+
+    Returns:
+        loading_stress: Longitudinal stress applied by the loading as in Pipe.add_loading, None if unloaded
+    """
+    pipe_config = configs['pipe']
+    models.MaterialProperties(alpha_u=pipe_config.get('alpha_u', SCENARIO_DEFAULTS['alpha_u']),
+                              temperature=pipe_config['design_temperature'], smts=pipe_config.get('smts'),
+                              smys=pipe_config.get('smys'))
+    Factors(safety_class=pipe_config['safety_class'],
+            inspection_method=pipe_config.get('measurement_method', SCENARIO_DEFAULTS['measurement_method']),
+            measurement_accuracy=pipe_config['accuracy'], confidence_level=pipe_config['confidence_level'],
+            wall_thickness=pipe_config['wall_thickness'])
+    loading = configs.get('loading')
+    return models.LoadingSpec(**loading).loading_stress if loading else None
+
+
+def build_scenario(configs: dict, defects: pd.DataFrame) -> tuple[dict, pd.DataFrame]:
+    """
+    Validates the inputs of assess_defects and converts them to the scenario and features of the vectorised assessment
+    Args:
+        configs: {'pipe', 'environment', 'loading'} model configs, 'loading' is optional
+        defects: Defects as passed to assess_defects
+
+    Returns:
+        scenario: Values shared by every defect, keyed by SCENARIO_KEYS
+        features: One row per defect with the scenario keys given per defect
+    """
+    scenario = dict(configs['pipe']) | dict(configs['environment'])
+    scenario.setdefault('measurement_method', 'relative')
+    depth_column = 'relative_depth' if scenario['measurement_method'] == 'relative' else 'depth'
+    missing = [column for column in ('length', depth_column) if column not in defects.columns]
+    if missing:
+        raise ValueError(f"Missing defect inputs: {', '.join(missing)}")
+
+    inputs = ['length', depth_column, *(column for column in ('width', 'elevation', 'combined_stress')
+                                        if column in defects.columns)]
+    columns = {DEFECT_COLUMNS[column]: pd.to_numeric(defects[column]).to_numpy(dtype=float) for column in inputs}
+    if np.isnan(columns['defect_length']).any() or np.isnan(columns['defect_depth']).any():
+        raise ValueError('Every defect requires a length and depth')
+
+    missing = [key for key in SCENARIO_KEYS
+               if scenario.get(key) is None and key not in columns and key not in SCENARIO_DEFAULTS]
+    if missing:
+        raise ValueError(f"Missing inputs: {', '.join(missing)}")
+    relative_depth = columns['defect_depth'] if depth_column == 'relative_depth' else \
+        columns['defect_depth'] / float(scenario['wall_thickness'])
+    if (relative_depth < 0).any() or (relative_depth >= 1).any():
+        raise ValueError('Defect depths must be at least 0 and less than the wall thickness')
+    # Axial and bending loads are combined into the longitudinal stress as by Pipe
+    scenario['combined_stress'] = validate_configs(configs)
+    # Defects without a value of their own take the value of the pipe
+    for key, values in columns.items():
+        if scenario.get(key) is not None:
+            columns[key] = np.where(np.isnan(values), scenario[key], values)
+    return scenario, pd.DataFrame(columns, index=defects.index)
+
+
+def assess_defects(configs: dict, defects: pd.DataFrame, quick: bool = False, audit: bool = False) -> pd.DataFrame:
+    """
+    Assesses many independent defects of a pipe in a single vectorised evaluation, without limit curves
+    Args:
+        configs: {'pipe', 'environment', 'loading'} model configs, 'loading' is optional
+        defects: One row per defect with columns named as the Defect config keys: length and either relative_depth
+                 or depth according to the pipe's measurement method, optionally width. elevation and combined_stress
+                 columns override the environment and loading per defect. Other columns are returned unchanged.
+        quick: Only check the acceptance of each defect, without solving for its allowable depth
+        audit: Also append the intermediate values of each assessment, see sweep.AUDIT_COLUMNS
+
+    Returns:
+        result: The defects with the effective pressure, pressure resistance, allowable measured relative depth
+                (Q and (d/t)* instead if quick), acceptance, any audit columns and ERF of each defect appended
+    """
+    scenario, features = build_scenario(configs, defects)
+    return pd.concat([defects, assess_features(scenario, features, quick=quick, audit=audit)], axis=1)
+
+
+def assess_governing_feature(scenario: dict, result: pd.DataFrame) -> models.Pipe:
+    """
+    Assesses the feature of an assessed population with the highest ERF as a single defect, giving the limit curves
+    the population is shown against. Features with a NaN ERF, e.g. outside the equation, are skipped.
+    Args:
+        scenario: Scenario of the population, keyed by SCENARIO_KEYS
+        result: Result of sweep.assess_defect_population
+
+    Returns:
+        pipe: Assessed Pipe with the governing feature as its defect
+    """
+    if result['erf'].isna().all():
+        raise ValueError('No feature has an ERF')
+    feature = result.loc[result['erf'].idxmax()]
+
+    def value(key):
+        if key in feature.index and not pd.isna(feature[key]):
+            return float(feature[key])
+        return scenario.get(key, SCENARIO_DEFAULTS.get(key))
+
+    environment_keys = [field.name for field in fields(models.EnvironmentSpec)]
+    pipe_keys = [key for key in SCENARIO_KEYS
+                 if key not in environment_keys and key not in DEFECT_COLUMNS.values() and value(key) is not None]
+    depth_key = 'relative_depth' if value('measurement_method') == 'relative' else 'depth'
+    return assess_pipe({
+        'pipe': {key: value(key) for key in pipe_keys},
+        'defects': [{'length': value('defect_length'), depth_key: value('defect_depth'),
+                     'width': value('defect_width')}],
+        'environment': {key: value(key) for key in environment_keys},
+        'loading': {'combined_stress': value('combined_stress')} if value('combined_stress') else None
+    })
+
+
+def serialise_assessment(result: pd.DataFrame, orient: str = 'records') -> str:
+    """
+    Serialises the result of assess_defects with a summary of the assessment
+    Args:
+        result: Result of assess_defects
+        orient: 'records' for one object per defect, 'split' for the columns and rows of the result
+
+    Returns:
+        body: JSON object with the count of defects and unacceptable defects, the minimum pressure resistance, the
+              maximum ERF and the results
+    """
+    minimum_pressure_resistance = result['pressure_resistance'].min()
+    maximum_erf = result['erf'].max()
+    summary = {
+        'count': len(result),
+        'unacceptable': int((~result['acceptable']).sum()),
+        'minimum_pressure_resistance': None if math.isnan(minimum_pressure_resistance) else minimum_pressure_resistance,
+        'maximum_erf': None if math.isnan(maximum_erf) else maximum_erf
+    }
+    # Serialise the summary and the results separately so that the results are written by pandas in a single pass
+    results = result.to_json(orient=orient, **({'index': False} if orient == 'split' else {}))
+    return json.dumps(summary)[:-1] + ', "results": ' + results + '}'
@@ -0,0 +1,91 @@
+"""
+Audit trail of the intermediate values of each assessment, stored alongside the results for traceability.
+
+The batch path appends the audit columns to its results when called with audit=True, computing them from the arrays
+it already holds. The single defect path derives them from the assessed defects. Audit values are float32, halving
+their size, and are written to Parquet with the results rather than to the logs.
+"""
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.utils import models
+from src.utils.analysis.sweep import AUDIT_COLUMNS
+from src.utils.calculations import vectorised_calculations
+
+
+def audit_defects(defects: Sequence, outside_diameter: float, wall_thickness: float, f_u: float,
+                  loading_stress: float = None) -> pd.DataFrame:
+    """
+    Collects the audit values of assessed defects
+    Args:
+        defects: Defects with their factors, Q, (d/t)* and pressure resistance, e.g. AssessmentResult.defects or the
+                 defects of a Pipe after calculating its pressure resistance
+        outside_diameter: Nominal outside diameter (mm)
+        wall_thickness: Nominal wall thickness (mm)
+        f_u: Tensile strength of the material (MPa)
+        loading_stress: Longitudinal stress (MPa)
+
+    Returns:
+        audit: One row per defect with the AUDIT_COLUMNS as float32
+    """
+    def column(values) -> np.ndarray:
+        return np.fromiter(values, dtype=float, count=len(defects))
+
+    q = column(defect.length_correction_factor for defect in defects)
+    d_t_star = column(defect.relative_depth_with_uncertainty for defect in defects)
+    gamma_m = column(defect.factors.gamma_m for defect in defects)
+    gamma_d = column(defect.factors.gamma_d for defect in defects)
+    h1 = np.full(len(defects), np.nan)  # Not applicable without longitudinal stress
+    if loading_stress:
+        h1 = vectorised_calculations.calculate_h1(
+            gamma_m, gamma_d, outside_diameter, f_u, q, column(defect.width for defect in defects),
+            column(defect.relative_depth for defect in defects), d_t_star, loading_stress,
+            column(defect.factors.xi for defect in defects))
+    audit = {
+        'length_correction_factor': q,
+        'relative_depth_with_uncertainty': d_t_star,
+        'gamma_m': gamma_m,
+        'gamma_d': gamma_d,
+        'epsilon_d': column(defect.factors.epsilon_d for defect in defects),
+        'standard_deviation': column(defect.factors.standard_deviation for defect in defects),
+        'h1': h1,
+        'p_0': vectorised_calculations.calculate_uncorroded_pressure_resistance(gamma_m, wall_thickness,
+                                                                                outside_diameter, f_u),
+        'pressure_resistance': column(defect.pressure_resistance for defect in defects)
+    }
+    return pd.DataFrame(audit, columns=list(AUDIT_COLUMNS)).astype(np.float32)
+
+
+def audit_assessment(spec: models.PipeSpec, result: models.AssessmentResult) -> pd.DataFrame:
+    """
+    Audit values of each defect of models.assess, the combined defect last if the defects interact
+    """
+    material_properties = models.MaterialProperties(alpha_u=spec.alpha_u, temperature=spec.design_temperature,
+                                                    smts=spec.smts, smys=spec.smys)
+    return audit_defects(result.defects, spec.outside_diameter, spec.wall_thickness, material_properties.f_u,
+                         loading_stress=spec.loading.loading_stress if spec.loading else None)
+
+
+def audit_pipe(pipe: models.Pipe) -> pd.DataFrame:
+    """
+    Audit values of each defect of a pipe, the combined defect last if the defects interact
+    """
+    pipe.calculate_pressure_resistance()
+    return audit_defects(pipe.defects, pipe.dimensions.outside_diameter, pipe.dimensions.wall_thickness,
+                         pipe.material_properties.f_u,
+                         loading_stress=pipe.loading.loading_stress if pipe.loading else None)
+
+
+def write_audit_trail(result: pd.DataFrame, path):
+    """
+    Writes results with their audit columns to Parquet, the audit columns as float32
+    Args:
+        result: Results including the AUDIT_COLUMNS, e.g. of assess_defects with audit=True
+        path: File path or binary buffer
+    """
+    missing = [name for name in AUDIT_COLUMNS if name not in result.columns]
+    if missing:
+        raise ValueError(f"Missing audit columns: {', '.join(missing)}")
+    result.astype({name: np.float32 for name in AUDIT_COLUMNS}).to_parquet(path)
@@ -0,0 +1,276 @@
+"""
+Worked examples from Appendix A of DNV-RP-F101.
+
+The examples are fixed reference cases, so their results and figures are rendered once and served from memory. They
+can also be rendered at build time into a JSON artifact which is loaded at startup instead.
+
+Render the examples with:
+    python -m src.utils.analysis.dnv_examples [output_file]
+"""
+import hashlib
+import json
+import sys
+from os import path, makedirs
+
+import plotly.io
+from dash import html
+from loguru import logger
+
+from src.utils import models
+from src.utils.graphing.defect_plots import generate_defect_depth_plot
+from src.utils.graphing.pipe_plots import generate_pipe_cross_section_plot, generate_defect_cross_section_plot
+
+DEFAULT_EXAMPLES_PATH = path.join(path.dirname(path.dirname(path.dirname(__file__))), 'data', 'dnv_examples.json')
+
+
+def example_a_1_1():
+    pipe_config = {
+        'outside_diameter': 812.8,
+        'wall_thickness': 19.1,
+        'alpha_u': 0.96,
+        'smts': 530.9,
+        'design_pressure': 150,
+        'design_temperature': 75,
+        'incidental_to_design_pressure_ratio': 1.1,
+        'accuracy': 0.1,
+        'confidence_level': 0.8,
+        'safety_class': 'medium',
+        'measurement_method': 'relative'
+    }
+    pipe = models.Pipe(config=pipe_config)
+
+    defect = models.Defect(
+        length=200,
+        relative_depth=0.25
+    )
+
+    environment = models.Environment(
+        seawater_density=1025,
+        containment_density=200,
+        elevation_reference=30,
+        elevation=-100
+    )
+
+    pipe.add_defect(defect)
+    pipe.set_environment(environment)
+
+    # Calculate p_corr
+    pipe.calculate_pressure_resistance()
+    pipe.calculate_effective_pressure()
+    pipe.calculate_maximum_allowable_defect_depth()
+    return pipe
+
+
+def example_a_1_2():
+    pipe_config = {
+        'outside_diameter': 812.8,
+        'wall_thickness': 19.1,
+        'alpha_u': 0.96,
+        'smts': 530.9,
+        'design_pressure': 150,
+        'design_temperature': 75,
+        'incidental_to_design_pressure_ratio': 1.1,
+        'accuracy': 1,
+        'confidence_level': 0.8,
+        'safety_class': 'medium',
+        'measurement_method': 'absolute'
+    }
+    pipe = models.Pipe(config=pipe_config)
+
+    defect = models.Defect(
+        length=200,
+        relative_depth=0.25
+    )
+
+    environment = models.Environment(
+        seawater_density=1025,
+        containment_density=200,
+        elevation_reference=30,
+        elevation=-200
+    )
+
+    pipe.add_defect(defect)
+    pipe.set_environment(environment)
+
+    # Calculate p_corr
+    pipe.calculate_pressure_resistance()
+    pipe.calculate_effective_pressure()
+    pipe.calculate_maximum_allowable_defect_depth()
+    return pipe
+
+
+def example_a_1_3():
+    pipe_config = {
+        'outside_diameter': 219.0,
+        'wall_thickness': 14.5,
+        'alpha_u': 0.96,
+        'smts': 455.1,
+        'design_pressure': 150,
+        'design_temperature': 100,
+        'incidental_to_design_pressure_ratio': 1.0,
+        'accuracy': 0.1,
+        'confidence_level': 0.8,
+        'safety_class': 'medium',
+        'measurement_method': 'relative'
+    }
+    pipe = models.Pipe(config=pipe_config)
+
+    defect = models.Defect(
+        length=200.0,
+        width=100.0,
+        relative_depth=0.62
+    )
+
+    environment = models.Environment(
+        seawater_density=1025,
+        containment_density=200,
+        elevation_reference=30,
+        elevation=-100
+    )
+
+    pipe.add_defect(defect)
+    pipe.add_loading(combined_stress=-200)
+    pipe.set_environment(environment)
+
+    # Calculate p_corr
+    pipe.calculate_pressure_resistance()
+    pipe.calculate_effective_pressure()
+    pipe.calculate_maximum_allowable_defect_depth()
+    return pipe
+
+
+EXAMPLES = {
+    'a-1-1': ('Example A.1-1', example_a_1_1),
+    'a-1-2': ('Example A.1-2', example_a_1_2),
+    'a-1-3': ('Example A.1-3', example_a_1_3)
+}
+
+
+def render_example(example_id: str) -> dict:
+    """
+    Assesses an example and renders its figures and description
+    Args:
+        example_id: Key of EXAMPLES
+
+    Returns:
+        example: Figures, description components and evaluation text of the example
+    """
+    pipe = EXAMPLES[example_id][1]()
+    fig_defect_assessment = generate_defect_depth_plot(pipe)
+    fig_pipe_cross_section = generate_pipe_cross_section_plot(pipe)
+    fig_defect_cross_section = generate_defect_cross_section_plot(pipe)
+
+    description = [
+        f"""Pipe Dimensions:
+            Outside Diameter:      {pipe.dimensions.outside_diameter} mm
+            Wall Thickness:         {pipe.dimensions.wall_thickness} mm
+        """,
+        f"""Material Properties:
+            SMTS:                   {pipe.material_properties.smts} N/mm^2
+            SMYS:                   {pipe.material_properties.smys} N/mm^2
+        """,
+        f"""Defect Properties:
+            Length:                 {pipe.defect.length} mm
+            Depth:                  {pipe.defect.depth:.2f} mm
+            Relative Depth:         {pipe.defect.relative_depth:.2f}t
+        """,
+        f"""Environment Properties:
+            Seawater Density:       {pipe.environment.seawater_density} kg/m^3
+            Containment Density:    {pipe.environment.containment_density} kg/m^3
+            Elevation Reference:    {pipe.environment.elevation_reference} m
+            Elevation:              {pipe.environment.elevation} m
+            External Pressure:      {pipe.environment.external_pressure:.2f} bar
+            Incidental Pressure:    {pipe.environment.incidental_pressure:.2f} bar
+        """
+    ]
+    if hasattr(pipe, 'loading'):
+        stress_description = 'Loading: \n'
+        loading = pipe.loading
+        if hasattr(loading, 'axial_stress') and loading.axial_stress:
+            stress_description += f"""Axial Stress:         {loading.axial_stress:.2f} N/mm^2\n"""
+        if hasattr(loading, 'bending_stress') and loading.bending_stress:
+            stress_description += f"""Bending Stress:         {loading.bending_stress:.2f} N/mm^2\n"""
+        if hasattr(loading, 'loading_stress') and loading.loading_stress:
+            stress_description += f"""Loading Stress:        {loading.loading_stress:.2f} N/mm^2\n"""
+        description.append(stress_description)
+    description.append(
+        f"""Effective Pressure:         {pipe.properties.effective_pressure:.2f} N/mm^2
+        Pressure Resistance:        {pipe.properties.pressure_resistance:.2f} N/mm^2
+        """)
+    evaluation = f"""
+            Effective Pressure {pipe.properties.effective_pressure:.2f} MPa 
+            {'<' if pipe.properties.effective_pressure < pipe.properties.pressure_resistance else '>'} 
+            Pressure Resistance {pipe.properties.pressure_resistance:.2f} MPa.  
+            Corrosion is **{'acceptable' if pipe.properties.effective_pressure < pipe.properties.pressure_resistance else 'unacceptable'}**.
+            """
+    description = [html.Div(contents, style={
+        'whiteSpace': 'pre-line', 'display': 'inline-block', "padding": "0px 10px", "vertical-align": "text-top"})
+                   for contents in description]
+    return {
+        'figures': [fig_defect_assessment, fig_pipe_cross_section, fig_defect_cross_section],
+        'description': description,
+        'evaluation': evaluation
+    }
+
+
+def render_examples() -> dict[str, str]:
+    """
+    Renders every example to JSON
+    """
+    return {example_id: plotly.io.json.to_json_plotly(render_example(example_id)) for example_id in EXAMPLES}
+
+
+class ExampleStore:
+    """
+    In-memory store of the rendered examples along with their ETags
+    """
+    def __init__(self, examples: dict[str, str]):
+        self._examples = {
+            example_id: (body.encode(), hashlib.sha256(body.encode()).hexdigest())
+            for example_id, body in examples.items()
+        }
+
+    def __contains__(self, example_id: str):
+        return example_id in self._examples
+
+    def get(self, example_id: str) -> tuple[bytes, str]:
+        """
+        Returns:
+            body: Rendered example as JSON
+            etag: Strong validator of the body
+        """
+        return self._examples[example_id]
+
+    def save(self, file_path: str = DEFAULT_EXAMPLES_PATH):
+        makedirs(path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w') as file:
+            json.dump({example_id: body.decode() for example_id, (body, _) in self._examples.items()}, file)
+
+    @classmethod
+    def load(cls, file_path: str = DEFAULT_EXAMPLES_PATH) -> 'ExampleStore':
+        with open(file_path, 'r') as file:
+            return cls(json.load(file))
+
+
+_store = None
+
+
+def get_example_store() -> ExampleStore:
+    """
+    Returns the process-wide store, loading the examples from DEFAULT_EXAMPLES_PATH or rendering them if they have not
+    been rendered yet
+    """
+    global _store
+    if _store is None:
+        if path.exists(DEFAULT_EXAMPLES_PATH):
+            _store = ExampleStore.load()
+        else:
+            logger.info('Rendered examples not found, rendering in memory')
+            _store = ExampleStore(render_examples())
+    return _store
+
+
+if __name__ == '__main__':
+    output_file = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_EXAMPLES_PATH
+    ExampleStore(render_examples()).save(output_file)
+    logger.info(f"Examples saved to {output_file}")
@@ -0,0 +1,120 @@
+"""
+Server-side sorting, filtering and paging of tabular results for AG Grid's infinite row model.
+The grid requests blocks of rows with its sort and filter models, so only the rows of the requested block are sent to
+the browser however large the result.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+
+NUMBER_FILTERS = {
+    'equals': lambda values, filter_: values == filter_['filter'],
+    'notEqual': lambda values, filter_: values != filter_['filter'],
+    'lessThan': lambda values, filter_: values < filter_['filter'],
+    'lessThanOrEqual': lambda values, filter_: values <= filter_['filter'],
+    'greaterThan': lambda values, filter_: values > filter_['filter'],
+    'greaterThanOrEqual': lambda values, filter_: values >= filter_['filter'],
+    'inRange': lambda values, filter_: (values >= filter_['filter']) & (values <= filter_['filterTo']),
+    'blank': lambda values, filter_: np.isnan(values),
+    'notBlank': lambda values, filter_: ~np.isnan(values)
+}
+TEXT_FILTERS = {
+    'equals': lambda values, filter_: values == filter_['filter'].lower(),
+    'notEqual': lambda values, filter_: values != filter_['filter'].lower(),
+    'contains': lambda values, filter_: values.str.contains(filter_['filter'].lower(), regex=False),
+    'notContains': lambda values, filter_: ~values.str.contains(filter_['filter'].lower(), regex=False),
+    'startsWith': lambda values, filter_: values.str.startswith(filter_['filter'].lower()),
+    'endsWith': lambda values, filter_: values.str.endswith(filter_['filter'].lower()),
+    'blank': lambda values, filter_: values == '',
+    'notBlank': lambda values, filter_: values != ''
+}
+
+
+def _condition_mask(column: pd.Series, condition: dict) -> np.ndarray:
+    conditions = condition.get('conditions') or [condition[key] for key in ('condition1', 'condition2')
+                                                  if key in condition]
+    if conditions:
+        masks = [_condition_mask(column, {'filterType': condition.get('filterType'), **item}) for item in conditions]
+        combine = np.logical_or if condition.get('operator') == 'OR' else np.logical_and
+        return combine.reduce(masks)
+
+    if condition.get('filterType') == 'text':
+        text_filter = TEXT_FILTERS.get(condition['type'])
+        if text_filter is None:
+            raise ValueError(f"Unsupported text filter: {condition['type']}")
+        # Filter the distinct values only, result columns hold few of them (e.g. acceptable)
+        codes, uniques = pd.factorize(column)
+        texts = pd.Series([*uniques.astype(str), '']).str.lower()
+        return np.asarray(text_filter(texts, condition))[codes]
+
+    number_filter = NUMBER_FILTERS.get(condition['type'])
+    if number_filter is None:
+        raise ValueError(f"Unsupported number filter: {condition['type']}")
+    return number_filter(column.to_numpy(dtype=float), condition)
+
+
+def filter_rows(result: pd.DataFrame, filter_model: dict = None) -> np.ndarray:
+    """
+    Applies an AG Grid filter model
+    Args:
+        result: Rows to filter
+        filter_model: {column: filter}, each filter a number or text condition or a combination of conditions
+
+    Returns:
+        indices: Positions of the rows passing every filter
+    """
+    mask = np.ones(len(result), dtype=bool)
+    for column, condition in (filter_model or {}).items():
+        if column not in result.columns:
+            raise ValueError(f"Unknown filter column: {column}")
+        mask &= _condition_mask(result[column], condition)
+    return np.flatnonzero(mask)
+
+
+def sort_rows(result: pd.DataFrame, indices: np.ndarray, sort_model: list = None) -> np.ndarray:
+    """
+    Applies an AG Grid sort model
+    Args:
+        result: Rows to sort
+        indices: Positions of the rows to sort
+        sort_model: [{'colId': column, 'sort': 'asc' or 'desc'}] in order of priority
+
+    Returns:
+        indices: Positions of the rows in sorted order
+    """
+    for sort in reversed(sort_model or []):
+        if sort['colId'] not in result.columns:
+            raise ValueError(f"Unknown sort column: {sort['colId']}")
+        values = pd.Series(result[sort['colId']].to_numpy()[indices])
+        order = values.sort_values(ascending=sort['sort'] != 'desc', kind='stable', na_position='last').index
+        indices = indices[order]
+    return indices
+
+
+def view_key(request: dict) -> str:
+    """
+    Identifies the rows selected by a request, independent of the requested block
+    """
+    return json.dumps([request.get('sortModel') or [], request.get('filterModel') or {}], sort_keys=True)
+
+
+def query_rows(result: pd.DataFrame, request: dict, view: np.ndarray = None) -> tuple[dict, np.ndarray]:
+    """
+    Serves a block of rows to AG Grid's infinite row model
+    Args:
+        result: Complete result
+        request: getRowsRequest of the grid with startRow, endRow, sortModel and filterModel
+        view: Sorted and filtered row positions of a previous request with the same view_key
+
+    Returns:
+        response: getRowsResponse of the grid with the rows of the block and the number of filtered rows
+        view: Sorted and filtered row positions, to be reused by requests for other blocks
+    """
+    if view is None:
+        view = sort_rows(result, filter_rows(result, request.get('filterModel')), request.get('sortModel'))
+    start = max(int(request.get('startRow', 0)), 0)
+    end = min(int(request.get('endRow', start + 100)), len(view))
+    rows = result.iloc[view[start:end]]
+    response = {'rowData': json.loads(rows.to_json(orient='records', double_precision=6)), 'rowCount': len(view)}
+    return response, view
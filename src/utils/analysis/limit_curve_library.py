@@ -0,0 +1,219 @@
+"""
+Precomputed library of normalised limit curves (internal pressure loading only, Section 3.7.3).
+
+With the normalised length lambda = l/sqrt(D*t) and the pressure ratio r = p_eff/p_0, where p_0 = gamma_m*2*t*f_u/(D-t),
+the allowable measured relative depth is
+
+    (d/t)_allowable = A(lambda, r) / gamma_d - epsilon_d * StD[d/t]
+    A(lambda, r) = (1 - r) / (1 - r/Q),  Q = sqrt(1 + 0.31*lambda^2)
+
+A is independent of the pipe dimensions, material and partial safety factors, so a single table of A over a grid of
+(r, lambda) serves every D/t, safety class, accuracy and confidence level. The table is built once, stored as a .npy
+file and memory-mapped at runtime, where curves are obtained by bilinear interpolation with O(log n) grid lookups.
+calculate_limit_curve samples unloaded limit curves from the library whenever its interpolation error is within the
+requested tolerance.
+
+Build the library with:
+    python -m src.utils.analysis.limit_curve_library [output_directory]
+"""
+import json
+import math
+import sys
+from os import path, makedirs
+
+import numpy as np
+from loguru import logger
+
+from src.utils.calculations.sampling_calculations import sample_curve_adaptively
+
+DEFAULT_LIBRARY_PATH = path.join(path.dirname(path.dirname(path.dirname(__file__))), 'data', 'limit_curve_library')
+
+
+def calculate_depth_factor(pressure_ratio, normalised_length):
+    """
+    Calculates A = gamma_d * (d/t)* at the limit state p_corr = p_eff, by reversing the equation in Section 3.7.3
+    Args:
+        pressure_ratio: p_eff / p_0
+        normalised_length: l / sqrt(D*t)
+
+    Returns:
+        A: Depth factor, NaN where p_eff >= p_0
+    """
+    pressure_ratio = np.asarray(pressure_ratio, dtype=float)
+    q = np.sqrt(1 + 0.31 * np.asarray(normalised_length, dtype=float) ** 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        depth_factor = (1 - pressure_ratio) / (1 - pressure_ratio / q)
+    return np.where((0 < pressure_ratio) & (pressure_ratio < 1), depth_factor, np.nan)
+
+
+class LimitCurveLibrary:
+    def __init__(self, pressure_ratios: np.ndarray, normalised_lengths: np.ndarray, table: np.ndarray,
+                 max_error: float = None):
+        """
+        Args:
+            pressure_ratios: Sorted grid of p_eff / p_0
+            normalised_lengths: Sorted grid of l / sqrt(D*t)
+            table: Depth factor A at each (pressure ratio, normalised length)
+            max_error: Maximum absolute interpolation error of A, which bounds the error of the allowable (d/t)
+                       since gamma_d >= 1
+        """
+        self.pressure_ratios = pressure_ratios
+        self.normalised_lengths = normalised_lengths
+        self.table = table
+        self.max_error = max_error
+
+    @classmethod
+    def build(cls, pressure_ratio_count: int = 981, normalised_length_count: int = 801,
+              max_normalised_length: float = 100.0) -> 'LimitCurveLibrary':
+        """
+        Tabulates the depth factor over the pressure ratio and normalised length grids
+        Args:
+            pressure_ratio_count: Number of pressure ratios between 0.01 and 0.99
+            normalised_length_count: Number of normalised lengths between 0 and max_normalised_length
+            max_normalised_length: Largest tabulated l / sqrt(D*t)
+        """
+        pressure_ratios = np.linspace(0.01, 0.99, pressure_ratio_count)
+        # Lengths are spaced geometrically as the curve flattens out with increasing length
+        normalised_lengths = np.concatenate(
+            ([0.0], np.geomspace(0.01, max_normalised_length, normalised_length_count - 1)))
+        table = calculate_depth_factor(pressure_ratios[:, np.newaxis], normalised_lengths[np.newaxis, :])
+
+        library = cls(pressure_ratios, normalised_lengths, table)
+        library.max_error = library.estimate_error()
+        return library
+
+    def estimate_error(self) -> float:
+        """
+        Estimates the maximum interpolation error by comparing the interpolated depth factor against the exact value
+        at the midpoints of every grid cell
+        """
+        pressure_ratios = (self.pressure_ratios[:-1] + self.pressure_ratios[1:]) / 2
+        normalised_lengths = (self.normalised_lengths[:-1] + self.normalised_lengths[1:]) / 2
+        exact = calculate_depth_factor(pressure_ratios[:, np.newaxis], normalised_lengths[np.newaxis, :])
+        interpolated = np.stack([self.interpolate(ratio, normalised_lengths) for ratio in pressure_ratios])
+        return float(np.nanmax(np.abs(interpolated - exact)))
+
+    def save(self, directory: str = DEFAULT_LIBRARY_PATH):
+        makedirs(directory, exist_ok=True)
+        np.save(path.join(directory, 'pressure_ratios.npy'), self.pressure_ratios)
+        np.save(path.join(directory, 'normalised_lengths.npy'), self.normalised_lengths)
+        np.save(path.join(directory, 'table.npy'), self.table)
+        with open(path.join(directory, 'metadata.json'), 'w') as file:
+            json.dump({'max_error': self.max_error, 'shape': list(self.table.shape)}, file)
+
+    @classmethod
+    def load(cls, directory: str = DEFAULT_LIBRARY_PATH) -> 'LimitCurveLibrary':
+        """
+        Loads a saved library, memory-mapping the table
+        """
+        with open(path.join(directory, 'metadata.json'), 'r') as file:
+            metadata = json.load(file)
+        return cls(
+            pressure_ratios=np.load(path.join(directory, 'pressure_ratios.npy')),
+            normalised_lengths=np.load(path.join(directory, 'normalised_lengths.npy')),
+            table=np.load(path.join(directory, 'table.npy'), mmap_mode='r'),
+            max_error=metadata['max_error']
+        )
+
+    def interpolate(self, pressure_ratio: float, normalised_lengths) -> np.ndarray:
+        """
+        Bilinearly interpolates the depth factor at a pressure ratio for the given normalised lengths
+        Args:
+            pressure_ratio: p_eff / p_0
+            normalised_lengths: l / sqrt(D*t), lengths beyond the tabulated range take the last tabulated value
+
+        Returns:
+            A: Depth factor at each normalised length, NaN outside the tabulated pressure ratios
+        """
+        if not self.pressure_ratios[0] <= pressure_ratio <= self.pressure_ratios[-1]:
+            return np.full(np.shape(normalised_lengths), np.nan)
+
+        row = min(int(np.searchsorted(self.pressure_ratios, pressure_ratio, side='right')) - 1,
+                  len(self.pressure_ratios) - 2)
+        weight = ((pressure_ratio - self.pressure_ratios[row]) /
+                  (self.pressure_ratios[row + 1] - self.pressure_ratios[row]))
+        depth_factors = (1 - weight) * self.table[row] + weight * self.table[row + 1]
+        return np.interp(normalised_lengths, self.normalised_lengths, depth_factors)
+
+    def lookup(self, d: float, t: float, f_u: float, gamma_m: float, gamma_d: float, epsilon_d: float,
+               st_dev: float, p_li: float, p_le: float, defect_lengths=None) -> np.ndarray:
+        """
+        Returns the limit curve of a pipe, equivalent to the curve calculated with calculate_maximum_defect_length
+        Args:
+            d: Pipe Diameter (mm)
+            t: Pipe Thickness (mm)
+            f_u: Tensile strength to be used in design (N/mm^2)
+            gamma_m: Partial Safety Factor for Longitudinal Corrosion Model Projection
+            gamma_d: Partial Safety Factor for Corrosion Depth
+            epsilon_d: Factor for defining a fractile value for corrosion depth
+            st_dev: Standard deviation of the relative depth measurement
+            p_li: Local Incidental Pressure (N/mm^2)
+            p_le: Local External Pressure (N/mm^2)
+            defect_lengths: Defect lengths (mm) to evaluate, defaults to the tabulated lengths
+
+        Returns:
+            limits: Array of [defect_length, defect_relative_depth] sorted by defect length
+        """
+        p_0 = gamma_m * (2 * t * f_u) / (d - t)
+        characteristic_length = math.sqrt(d * t)
+        if defect_lengths is None:
+            defect_lengths = self.normalised_lengths * characteristic_length
+        defect_lengths = np.asarray(defect_lengths, dtype=float)
+
+        depth_factors = self.interpolate((p_li - p_le) / p_0, defect_lengths / characteristic_length)
+        relative_depths = np.clip(depth_factors / gamma_d - epsilon_d * st_dev, 0, None)
+        return np.array([defect_lengths, relative_depths])
+
+    def sample(self, d: float, t: float, f_u: float, gamma_m: float, gamma_d: float, epsilon_d: float, st_dev: float,
+               p_li: float, p_le: float, tolerance: float) -> np.ndarray | None:
+        """
+        Samples the limit curve of a pipe adaptively from the library, so that linearly interpolating between the
+        returned points is within the tolerance of the exact curve
+        Args:
+            d, t, f_u, gamma_m, gamma_d, epsilon_d, st_dev, p_li, p_le: As for lookup
+            tolerance: Maximum error in relative depth, including the interpolation error of the library
+
+        Returns:
+            limits: Array of [defect_length, defect_relative_depth] sorted by defect length, None if the interpolation
+                    error leaves no room within the tolerance or the pressure ratio is not tabulated
+        """
+        interpolation_error = self.max_error / gamma_d
+        if interpolation_error >= tolerance:
+            return None
+        defect_lengths, relative_depths = self.lookup(d=d, t=t, f_u=f_u, gamma_m=gamma_m, gamma_d=gamma_d,
+                                                      epsilon_d=epsilon_d, st_dev=st_dev, p_li=p_li, p_le=p_le)
+        if np.isnan(relative_depths).any():
+            return None
+
+        def limit(defect_length):
+            relative_depth = float(np.interp(defect_length, defect_lengths, relative_depths))
+            return (defect_length, relative_depth) if relative_depth > 0 else None
+
+        return sample_curve_adaptively(limit, start=0, stop=float(defect_lengths[-1]),
+                                       tolerance=tolerance - interpolation_error)
+
+
+_library = None
+
+
+def get_limit_curve_library() -> LimitCurveLibrary:
+    """
+    Returns the process-wide library, loading it from DEFAULT_LIBRARY_PATH or building it in memory if it has not
+    been built yet
+    """
+    global _library
+    if _library is None:
+        if path.exists(path.join(DEFAULT_LIBRARY_PATH, 'metadata.json')):
+            _library = LimitCurveLibrary.load()
+        else:
+            logger.info('Limit curve library not found, building in memory')
+            _library = LimitCurveLibrary.build()
+    return _library
+
+
+if __name__ == '__main__':
+    output_directory = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_LIBRARY_PATH
+    library = LimitCurveLibrary.build()
+    library.save(output_directory)
+    logger.info(f"Limit curve library saved to {output_directory} | shape: {library.table.shape} | "
+                f"max interpolation error: {library.max_error:.2e}")
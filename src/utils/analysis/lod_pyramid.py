@@ -0,0 +1,154 @@
+"""
+Multi-resolution (level of detail) aggregation of pipeline features over KP.
+
+Features are sorted by KP and grouped into bins holding an equal number of features. Each level of the pyramid groups
+the bins of the level below, storing for every bin its KP extent, the minimum and maximum of each metric and the index
+of its most severe feature. A window of the line is served from the finest level whose bins in the window fit within
+the point budget, or as raw features when the window holds few enough of them, so payloads stay bounded regardless of
+the length of the line.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class LodPyramid:
+    def __init__(self, kp, metrics: dict, severity: str, base_bin_size: int = 16, branching_factor: int = 4):
+        """
+        Args:
+            kp: Kilometre point of each feature
+            metrics: Values of each metric per feature, e.g. relative depth, ERF and pressure resistance
+            severity: Metric ranking the features, the feature with its highest value represents each bin
+            base_bin_size: Number of features in the bins of the first level
+            branching_factor: Number of bins of a level grouped into each bin of the next level
+        """
+        if severity not in metrics:
+            raise ValueError(f"Severity metric {severity} is not one of the metrics")
+        kp = np.asarray(kp, dtype=float)
+        if not len(kp):
+            raise ValueError("At least one feature is required")
+        order = np.argsort(kp, kind='stable')
+        self.kp = kp[order]
+        self.metrics = {name: np.asarray(values, dtype=float)[order] for name, values in metrics.items()}
+        self.severity = severity
+        self.levels = []
+
+        # Rank NaN severities below any value so that they never represent a bin
+        severity_values = np.nan_to_num(self.metrics[severity], nan=-np.inf)
+        bin_size = base_bin_size
+        previous = None
+        while True:
+            if previous is None:
+                level = self._aggregate_features(bin_size, severity_values)
+            else:
+                level = self._aggregate_bins(previous, branching_factor, severity_values)
+            level['bin_size'] = bin_size
+            self.levels.append(level)
+            if len(level['kp_min']) <= 1:
+                break
+            previous = level
+            bin_size *= branching_factor
+
+    def __len__(self):
+        return len(self.kp)
+
+    def _aggregate_features(self, bin_size: int, severity_values: np.ndarray) -> dict:
+        starts = np.arange(0, len(self.kp), bin_size)
+        level = {
+            'kp_min': self.kp[starts],
+            'kp_max': self.kp[np.minimum(starts + bin_size, len(self.kp)) - 1],
+            'min': {name: np.fmin.reduceat(values, starts) for name, values in self.metrics.items()},
+            'max': {name: np.fmax.reduceat(values, starts) for name, values in self.metrics.items()}
+        }
+        padded = np.full(len(starts) * bin_size, -np.inf)
+        padded[:len(severity_values)] = severity_values
+        level['severity_index'] = starts + padded.reshape(-1, bin_size).argmax(axis=1)
+        return level
+
+    @staticmethod
+    def _aggregate_bins(previous: dict, branching_factor: int, severity_values: np.ndarray) -> dict:
+        bin_count = len(previous['kp_min'])
+        starts = np.arange(0, bin_count, branching_factor)
+        level = {
+            'kp_min': previous['kp_min'][starts],
+            'kp_max': previous['kp_max'][np.minimum(starts + branching_factor, bin_count) - 1],
+            'min': {name: np.fmin.reduceat(values, starts) for name, values in previous['min'].items()},
+            'max': {name: np.fmax.reduceat(values, starts) for name, values in previous['max'].items()}
+        }
+        candidates = np.full(len(starts) * branching_factor, -1)
+        candidates[:bin_count] = previous['severity_index']
+        candidates = candidates.reshape(-1, branching_factor)
+        candidate_severity = np.where(candidates >= 0, severity_values[candidates], -np.inf)
+        level['severity_index'] = candidates[np.arange(len(starts)), candidate_severity.argmax(axis=1)]
+        return level
+
+    def window(self, kp_start: float = None, kp_end: float = None, max_points: int = 2000) -> dict:
+        """
+        Returns the features or aggregated bins within a KP window
+        Args:
+            kp_start: Start of the window, defaults to the start of the line
+            kp_end: End of the window, defaults to the end of the line
+            max_points: Maximum number of features or bins returned
+
+        Returns:
+            window: For raw features {'level': 0, 'kp', 'values'},
+                    otherwise {'level', 'kp_min', 'kp_max', 'min', 'max', 'severity_kp', 'severity_values'}
+                    with metrics keyed by name
+        """
+        first = 0 if kp_start is None else int(np.searchsorted(self.kp, kp_start, side='left'))
+        last = len(self.kp) if kp_end is None else int(np.searchsorted(self.kp, kp_end, side='right'))
+
+        if last - first <= max_points:
+            return {
+                'level': 0,
+                'kp': self.kp[first:last],
+                'values': {name: values[first:last] for name, values in self.metrics.items()}
+            }
+
+        for index, level in enumerate(self.levels, start=1):
+            first_bin = first // level['bin_size']
+            last_bin = (last - 1) // level['bin_size'] + 1
+            if last_bin - first_bin <= max_points or index == len(self.levels):
+                bins = slice(first_bin, last_bin)
+                severity_index = level['severity_index'][bins]
+                return {
+                    'level': index,
+                    'kp_min': level['kp_min'][bins],
+                    'kp_max': level['kp_max'][bins],
+                    'min': {name: values[bins] for name, values in level['min'].items()},
+                    'max': {name: values[bins] for name, values in level['max'].items()},
+                    'severity_kp': self.kp[severity_index],
+                    'severity_values': {name: values[severity_index] for name, values in self.metrics.items()}
+                }
+
+
+class PyramidStore:
+    """
+    Bounded LRU store of the pyramids built for each dataset of the current process
+    """
+    def __init__(self, maxsize: int = 8):
+        self.maxsize = maxsize
+        self._pyramids: OrderedDict[str, LodPyramid] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, dataset_id: str):
+        return dataset_id in self._pyramids
+
+    def get(self, dataset_id: str) -> LodPyramid | None:
+        with self._lock:
+            pyramid = self._pyramids.get(dataset_id)
+            if pyramid is not None:
+                self._pyramids.move_to_end(dataset_id)
+            return pyramid
+
+    def set(self, dataset_id: str, pyramid: LodPyramid):
+        with self._lock:
+            self._pyramids[dataset_id] = pyramid
+            self._pyramids.move_to_end(dataset_id)
+            while len(self._pyramids) > self.maxsize:
+                self._pyramids.popitem(last=False)
+
+
+# Process-wide store used by the pipeline overview page
+pyramid_store = PyramidStore()
@@ -0,0 +1,187 @@
+"""
+Parallel assessment of large defect populations through shared memory.
+
+The per-defect input columns are copied once into a shared memory block and the workers write their results into a
+second block, each computing a range of rows in place. Only the block descriptors, the scalar scenario and the row
+range of each task are pickled, so the cost of sending millions of rows to the workers no longer exceeds the cost of
+assessing them.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.utils.analysis.sweep import (SWEEPABLE_PARAMETERS, audit_only_columns, result_columns, evaluate_scenarios,
+                                      assess_defect_population)
+
+
+def create_block(columns: list[str], length: int) -> tuple[shared_memory.SharedMemory, dict]:
+    """
+    Creates a shared memory block holding float64 columns of equal length
+    Returns:
+        block: Shared memory block, to be closed and unlinked by the creator
+        descriptor: {'name', 'columns', 'length'} describing the block to the workers
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(len(columns) * length * 8, 1))
+    return block, {'name': block.name, 'columns': list(columns), 'length': length}
+
+
+def block_array(block: shared_memory.SharedMemory, descriptor: dict) -> np.ndarray:
+    """
+    Returns a (columns, length) view of a block, without copying
+    """
+    return np.ndarray((len(descriptor['columns']), descriptor['length']), dtype=np.float64, buffer=block.buf)
+
+
+def assess_rows(scenario: dict, inputs: dict, outputs: dict, start: int, stop: int, quick: bool,
+                audit: bool = False) -> int:
+    """
+    Assesses a range of rows of the shared inputs, writing the results into the same rows of the shared outputs
+    Args:
+        scenario: Scenario values shared by every defect
+        inputs: Descriptor of the block of per-defect scenario values
+        outputs: Descriptor of the block of results
+        start: First row
+        stop: Row after the last row
+        quick: Skip solving for the allowable depth
+        audit: Also write the audit columns
+
+    Returns:
+        count: Number of rows assessed
+    """
+    input_block = shared_memory.SharedMemory(name=inputs['name'])
+    output_block = shared_memory.SharedMemory(name=outputs['name'])
+    try:
+        input_array = block_array(input_block, inputs)
+        output_array = block_array(output_block, outputs)
+        per_defect = {name: input_array[index, start:stop] for index, name in enumerate(inputs['columns'])}
+        results = evaluate_scenarios(scenario | per_defect, quick=quick, audit=audit)
+        for index, name in enumerate(outputs['columns']):
+            output_array[index, start:stop] = results[name]
+        # Views must be released before the blocks can be closed
+        del input_array, output_array, per_defect, results
+    finally:
+        input_block.close()
+        output_block.close()
+    return stop - start
+
+
+class SharedMemoryExecutor:
+    """
+    Assesses defect populations across a pool of local processes sharing the defect and result columns.
+    Populations smaller than two tasks, or any population while max_workers is 1, are assessed in the calling process,
+    one task at a time.
+    """
+    def __init__(self, max_workers: int = 1, rows_per_task: int = 250_000):
+        """
+        Args:
+            max_workers: Number of worker processes
+            rows_per_task: Maximum number of rows assessed by each task, bounding the memory used by the temporary
+                           arrays of each worker
+        """
+        self.max_workers = max_workers
+        self.rows_per_task = rows_per_task
+        self._pool = None
+
+    def assess_defect_population(self, scenario: dict, features: pd.DataFrame, quick: bool = False,
+                                 audit: bool = False) -> pd.DataFrame:
+        """
+        Equivalent to sweep.assess_defect_population
+        """
+        if self.max_workers <= 1 or len(features) < 2 * self.rows_per_task:
+            if len(features) <= self.rows_per_task:
+                return assess_defect_population(scenario, features, quick=quick, audit=audit)
+            return pd.concat([assess_defect_population(scenario, features.iloc[start:start + self.rows_per_task],
+                                                       quick=quick, audit=audit)
+                              for start in range(0, len(features), self.rows_per_task)])
+        self.start()
+
+        input_columns = [key for key in features.columns if key in SWEEPABLE_PARAMETERS]
+        output_columns = list(result_columns(quick, audit))
+        scenario = {key: value for key, value in scenario.items() if key not in input_columns}
+        length = len(features)
+        input_block, inputs = create_block(input_columns, length)
+        output_block, outputs = create_block(output_columns, length)
+        try:
+            input_array = block_array(input_block, inputs)
+            for index, name in enumerate(input_columns):
+                input_array[index] = features[name].to_numpy(dtype=float)
+            del input_array
+
+            tasks = [self._pool.submit(assess_rows, scenario, inputs, outputs, start,
+                                       min(start + self.rows_per_task, length), quick, audit)
+                     for start in range(0, length, self.rows_per_task)]
+            for task in tasks:
+                task.result()
+
+            output_array = block_array(output_block, outputs)
+            result = features.copy()
+            for index, name in enumerate(output_columns):
+                column = output_array[index]
+                if name == 'acceptable':
+                    result[name] = column.astype(bool)
+                elif name in audit_only_columns(quick):
+                    result[name] = column.astype(np.float32)
+                else:
+                    result[name] = column.copy()
+            del output_array
+        finally:
+            for block in (input_block, output_block):
+                block.close()
+                block.unlink()
+        result['erf'] = result['effective_pressure'] / result['pressure_resistance']
+        return result
+
+    def start(self):
+        """
+        Starts the worker processes if they are not running
+        """
+        if self._pool is None:
+            # Workers forked after the resource tracker has started share it, rather than each tracking and removing
+            # the blocks they attach to on exit
+            resource_tracker.ensure_running()
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            list(self._pool.map(int, range(self.max_workers)))
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+# Process-wide executor, the number of workers is configured by the app
+parallel_executor = SharedMemoryExecutor()
+
+
+if __name__ == '__main__':
+    # Reports the scaling of the executor on a synthetic feature list: python -m src.utils.analysis.parallel_assessment
+    from src.utils.analysis.synthetic_features import generate_synthetic_features
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    worker_counts = [int(value) for value in sys.argv[2].split(',')] if len(sys.argv) > 2 else \
+        sorted({1, 2, 4, os.cpu_count() or 1})
+    benchmark_scenario = {
+        'outside_diameter': 812.8, 'wall_thickness': 19.1, 'smts': 530.9, 'design_pressure': 150,
+        'design_temperature': 75, 'incidental_to_design_pressure_ratio': 1.1, 'accuracy': 0.1,
+        'confidence_level': 0.8, 'safety_class': 'medium', 'measurement_method': 'relative',
+        'seawater_density': 1025, 'containment_density': 200, 'elevation_reference': 30
+    }
+    benchmark_features = generate_synthetic_features(count)[['defect_length', 'defect_depth', 'elevation']]
+    logger.info(f"{count} features | {os.cpu_count()} CPUs")
+    baseline = None
+    for workers in worker_counts:
+        executor = SharedMemoryExecutor(max_workers=workers)
+        if workers > 1:
+            executor.start()
+        start_time = time.perf_counter()
+        executor.assess_defect_population(benchmark_scenario, benchmark_features)
+        elapsed = time.perf_counter() - start_time
+        executor.shutdown()
+        baseline = baseline or elapsed
+        logger.info(f"{workers} workers | {elapsed:.2f}s | speedup {baseline / elapsed:.2f} | "
+                    f"efficiency {baseline / elapsed / workers:.0%}")
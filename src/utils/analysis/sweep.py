@@ -0,0 +1,232 @@
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from src.utils.calculations import vectorised_calculations
+
+# Keys describing a single assessment scenario. Pipe config keys are combined with the environment, defect and
+# loading inputs so that any of them can be swept.
+SCENARIO_DEFAULTS = {
+    'alpha_u': 0.96,
+    'measurement_method': 'relative',
+    'defect_width': None,
+    'combined_stress': None
+}
+SCENARIO_KEYS = (
+    'outside_diameter', 'wall_thickness', 'smts', 'alpha_u', 'design_pressure', 'design_temperature',
+    'incidental_to_design_pressure_ratio', 'accuracy', 'confidence_level', 'safety_class', 'measurement_method',
+    'seawater_density', 'containment_density', 'elevation_reference', 'elevation',
+    'defect_length', 'defect_depth', 'defect_width', 'combined_stress'
+)
+SWEEPABLE_PARAMETERS = tuple(key for key in SCENARIO_KEYS if key != 'measurement_method')
+RESULT_COLUMNS = ('effective_pressure', 'pressure_resistance', 'allowable_relative_depth', 'acceptable')
+# Results of a quick check, which skips solving for the allowable depth
+QUICK_CHECK_COLUMNS = ('length_correction_factor', 'relative_depth_with_uncertainty', 'effective_pressure',
+                       'pressure_resistance', 'acceptable')
+# Intermediate values of each assessment kept for traceability: Q, (d/t)*, gamma_m, gamma_d, epsilon_d, StD, H1 (NaN
+# without longitudinal stress), p_0 and p_corr
+AUDIT_COLUMNS = ('length_correction_factor', 'relative_depth_with_uncertainty', 'gamma_m', 'gamma_d', 'epsilon_d',
+                 'standard_deviation', 'h1', 'p_0', 'pressure_resistance')
+
+
+def audit_only_columns(quick: bool = False) -> tuple[str, ...]:
+    """
+    Returns:
+        columns: The AUDIT_COLUMNS missing from the results of an assessment, appended as float32 when auditing
+    """
+    columns = QUICK_CHECK_COLUMNS if quick else RESULT_COLUMNS
+    return tuple(name for name in AUDIT_COLUMNS if name not in columns)
+
+
+def result_columns(quick: bool = False, audit: bool = False) -> tuple[str, ...]:
+    """
+    Returns:
+        columns: Columns appended to the features by an assessment, before the ERF
+    """
+    return (QUICK_CHECK_COLUMNS if quick else RESULT_COLUMNS) + (audit_only_columns(quick) if audit else ())
+
+
+def evaluate_scenarios(scenario: dict, quick: bool = False, audit: bool = False) -> dict:
+    """
+    Evaluates the DNV-RP-F101 single defect assessment for every combination of the broadcastable inputs
+    Args:
+        scenario: Scenario values keyed by SCENARIO_KEYS, each either a scalar or a broadcastable array.
+                  defect_depth is relative to the wall thickness for 'relative' measurements, in mm otherwise.
+        quick: Skip solving for the allowable measured relative depth
+        audit: Also return the remaining AUDIT_COLUMNS
+
+    Returns:
+        results: Arrays of Q, (d/t)*, effective pressure, pressure resistance, allowable measured relative depth at the
+                 defect length (unless quick) and the acceptance of the defect. The pressure resistance is NaN, and
+                 the defect unacceptable, for depths outside the range of the equation of Section 3.7.3.
+    """
+    scenario = SCENARIO_DEFAULTS | scenario
+    missing = [key for key in SCENARIO_KEYS if key not in scenario]
+    if missing:
+        raise ValueError(f"Missing scenario inputs: {', '.join(missing)}")
+
+    measurement_method = scenario['measurement_method']
+    d = np.asarray(scenario['outside_diameter'], dtype=float)
+    t = np.asarray(scenario['wall_thickness'], dtype=float)
+
+    f_u = vectorised_calculations.calculate_tensile_strength(scenario['smts'], scenario['design_temperature'],
+                                                             scenario['alpha_u'])
+    st_dev = vectorised_calculations.calculate_std_dev(scenario['confidence_level'], scenario['accuracy'],
+                                                       measurement_method, t)
+    factors = vectorised_calculations.calculate_partial_safety_factors(scenario['safety_class'], measurement_method,
+                                                                       st_dev)
+    gamma_m, gamma_d, epsilon_d = factors['gamma_m'], factors['gamma_d'], factors['epsilon_d']
+
+    defect_depth = np.asarray(scenario['defect_depth'], dtype=float)
+    relative_depth = defect_depth if measurement_method == 'relative' else defect_depth / t
+    q = vectorised_calculations.calculate_length_correction_factor(scenario['defect_length'], d, t)
+
+    effective_pressure = vectorised_calculations.calculate_effective_pressure(
+        design_pressure=scenario['design_pressure'],
+        incidental_to_design_pressure_ratio=scenario['incidental_to_design_pressure_ratio'],
+        containment_density=scenario['containment_density'],
+        seawater_density=scenario['seawater_density'],
+        elevation_reference=scenario['elevation_reference'],
+        elevation=scenario['elevation']
+    )
+
+    sigma_l = np.nan_to_num(np.asarray(
+        scenario['combined_stress'] if scenario['combined_stress'] is not None else 0, dtype=float))
+    loaded = sigma_l != 0
+    if loaded.any():
+        if scenario['defect_width'] is None:
+            raise ValueError('Defect Width is required for stress calculations.')
+        xi = vectorised_calculations.calculate_usage_factors(scenario['safety_class'])
+
+    def pressure_resistance(d_t_meas):
+        d_t_star = d_t_meas + epsilon_d * st_dev
+        p_corr = vectorised_calculations.calculate_pressure_resistance(gamma_m, gamma_d, t, d, f_u, q, d_t_star)
+        if loaded.any():
+            p_corr_comp = vectorised_calculations.calculate_pressure_resistance_w_compressive_load(
+                gamma_m, gamma_d, t, d, f_u, q, scenario['defect_width'], d_t_meas, d_t_star, sigma_l, xi)
+            p_corr = np.where(loaded, p_corr_comp, p_corr)
+        # The equation of Section 3.7.3 only holds for gamma_d * (d/t)* < 1, deeper or negative depths have no
+        # pressure resistance and are unacceptable
+        valid = (d_t_meas >= 0) & (gamma_d * d_t_star < 1) & (p_corr > 0)
+        return np.where(valid, p_corr, np.nan)
+
+    p_corr = pressure_resistance(relative_depth)
+    results = {
+        'length_correction_factor': q,
+        'relative_depth_with_uncertainty': relative_depth + epsilon_d * st_dev,
+        'effective_pressure': effective_pressure,
+        'pressure_resistance': p_corr,
+        'acceptable': effective_pressure < p_corr
+    }
+    if not quick:
+        results['allowable_relative_depth'] = vectorised_calculations.calculate_allowable_relative_depth(
+            pressure_resistance, effective_pressure, gamma_d, epsilon_d, st_dev)
+    if audit:
+        h1 = np.nan     # Not applicable without longitudinal stress
+        if loaded.any():
+            h1 = np.where(loaded, vectorised_calculations.calculate_h1(
+                gamma_m, gamma_d, d, f_u, q, scenario['defect_width'], relative_depth,
+                results['relative_depth_with_uncertainty'], sigma_l, xi), np.nan)
+        results |= {
+            'gamma_m': gamma_m,
+            'gamma_d': gamma_d,
+            'epsilon_d': epsilon_d,
+            'standard_deviation': st_dev,
+            'h1': h1,
+            'p_0': vectorised_calculations.calculate_uncorroded_pressure_resistance(gamma_m, t, d, f_u)
+        }
+    return results
+
+
+def run_parameter_sweep(scenario: dict, sweep: dict[str, Iterable]) -> pd.DataFrame:
+    """
+    Evaluates a scenario over the Cartesian product of the swept parameter values.
+    Each swept parameter is placed on its own array axis so the grid is computed in a single broadcast evaluation.
+    Args:
+        scenario: Base scenario keyed by SCENARIO_KEYS
+        sweep: Values to evaluate for each swept parameter, e.g. {'design_pressure': [140, 150, 160]}
+
+    Returns:
+        result: Tidy DataFrame with one row per grid point, one column per swept parameter and the RESULT_COLUMNS.
+                The swept parameters are listed in result.attrs['dimensions'].
+    """
+    unknown = [key for key in sweep if key not in SWEEPABLE_PARAMETERS]
+    if unknown:
+        raise ValueError(f"Parameters cannot be swept: {', '.join(unknown)}")
+    if not sweep:
+        raise ValueError('At least one parameter must be swept')
+
+    dimensions = list(sweep)
+    axes = [np.asarray(list(values)) for values in sweep.values()]
+    grid_shape = tuple(len(values) for values in axes)
+    if not all(grid_shape):
+        raise ValueError('Swept parameters must have at least one value')
+
+    swept_inputs = {}
+    for axis, (name, values) in enumerate(zip(dimensions, axes)):
+        shape = [1] * len(axes)
+        shape[axis] = len(values)
+        swept_inputs[name] = values.reshape(shape)
+
+    results = evaluate_scenarios(scenario | swept_inputs)
+
+    columns = {name: np.broadcast_to(values, grid_shape).ravel() for name, values in swept_inputs.items()}
+    columns |= {name: np.broadcast_to(results[name], grid_shape).ravel() for name in RESULT_COLUMNS}
+    result = pd.DataFrame(columns)
+    result.attrs['dimensions'] = dimensions
+    return result
+
+
+def sweep_to_grid(result: pd.DataFrame, x: str, y: str, value: str) -> pd.DataFrame:
+    """
+    Pivots a sweep result into a 2D grid for plotting.
+    Swept parameters other than x and y are reduced to their worst case (minimum) value.
+    Args:
+        result: Result of run_parameter_sweep
+        x: Parameter along the columns
+        y: Parameter along the index
+        value: Result column to display
+
+    Returns:
+        grid: DataFrame indexed by y with x as columns
+    """
+    values = result[value].astype(float)
+    return (result.assign(**{value: values})
+            .pivot_table(index=y, columns=x, values=value, aggfunc='min', sort=False))
+
+
+def assess_features(scenario: dict, features: pd.DataFrame, quick: bool = False, audit: bool = False) -> pd.DataFrame:
+    """
+    Assesses every defect of a population as assess_defect_population, returning only the appended columns
+    Returns:
+        result: The RESULT_COLUMNS, or QUICK_CHECK_COLUMNS if quick, any audit columns and the ERF, indexed as the
+                features
+    """
+    per_defect = {key: features[key].to_numpy(dtype=float) for key in features.columns if key in SWEEPABLE_PARAMETERS}
+    results = evaluate_scenarios(scenario | per_defect, quick=quick, audit=audit)
+
+    # Collected before building the frame, as inserting columns one by one copies its blocks as they are consolidated
+    columns = {name: np.broadcast_to(results[name], len(features)) for name in result_columns(quick)}
+    for name in audit_only_columns(quick) if audit else ():
+        columns[name] = np.broadcast_to(np.asarray(results[name], dtype=np.float32), len(features))
+    columns['erf'] = columns['effective_pressure'] / columns['pressure_resistance']
+    return pd.DataFrame(columns, index=features.index)
+
+
+def assess_defect_population(scenario: dict, features: pd.DataFrame, quick: bool = False,
+                             audit: bool = False) -> pd.DataFrame:
+    """
+    Assesses every defect of a population, e.g. the features reported by an ILI run, in a single broadcast evaluation
+    Args:
+        scenario: Scenario keyed by SCENARIO_KEYS, inputs given per defect by the features may be omitted
+        features: One row per defect with defect_length and defect_depth columns. Columns matching any other
+                  SWEEPABLE_PARAMETERS (e.g. elevation or defect_width) override the scenario per defect.
+        quick: Only check the acceptance of each defect, without solving for its allowable depth
+        audit: Also append the AUDIT_COLUMNS missing from the results, as float32
+
+    Returns:
+        result: The features with the RESULT_COLUMNS, or QUICK_CHECK_COLUMNS if quick, and the ERF
+                (effective pressure / pressure resistance) appended
+    """
+    return pd.concat([features, assess_features(scenario, features, quick=quick, audit=audit)], axis=1)
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+
+def generate_synthetic_features(count: int, line_length: float = 500.0, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates a synthetic ILI feature list for demonstrations and benchmarks.
+    Defects cluster into corrosion colonies along the line and the elevation follows a smooth seabed profile.
+    Args:
+        count: Number of features
+        line_length: Length of the line (km)
+        seed: Random seed
+
+    Returns:
+        features: DataFrame with kp (km), defect_length (mm), defect_depth (d/t) and elevation (m) columns
+    """
+    rng = np.random.default_rng(seed)
+    colonies = rng.uniform(0, line_length, max(count // 1000, 1))
+    kp = np.clip(rng.choice(colonies, count) + rng.normal(0, line_length / 500, count), 0, line_length)
+    return pd.DataFrame({
+        'kp': kp,
+        'defect_length': rng.lognormal(np.log(60), 0.8, count).clip(5, 2000),
+        'defect_depth': rng.beta(2, 9, count).clip(0.01, 0.6),
+        'elevation': -100 - 50 * np.sin(kp / line_length * 2 * np.pi)
+    })
@@ -0,0 +1,31 @@
+import base64
+import io
+
+import pandas as pd
+
+# Columns of a pipe tally, one row per feature
+TALLY_COLUMNS = ('kp', 'defect_length', 'defect_depth')
+# Columns overriding the pipe inputs per feature when present
+OPTIONAL_TALLY_COLUMNS = ('elevation', 'defect_width', 'combined_stress')
+
+
+def parse_tally(contents: str) -> pd.DataFrame:
+    """
+    Parses an uploaded pipe tally
+    Args:
+        contents: dcc.Upload contents of a CSV file with kp (km), defect_length (mm) and defect_depth (t) columns,
+                  and optionally elevation (m), defect_width (mm) and combined_stress (MPa)
+
+    Returns:
+        features: The TALLY_COLUMNS and any OPTIONAL_TALLY_COLUMNS provided, as floats
+    """
+    _, encoded = contents.split(',', 1)
+    features = pd.read_csv(io.BytesIO(base64.b64decode(encoded)))
+    features.columns = [column.strip().lower() for column in features.columns]
+    missing = [column for column in TALLY_COLUMNS if column not in features.columns]
+    if missing:
+        raise ValueError(f"Missing tally columns: {', '.join(missing)}")
+    if features.empty:
+        raise ValueError('The tally has no features')
+    columns = [*TALLY_COLUMNS, *(column for column in OPTIONAL_TALLY_COLUMNS if column in features.columns)]
+    return features[columns].astype(float)
@@ -0,0 +1,114 @@
+import threading
+from typing import Callable
+
+from loguru import logger
+
+from src.utils.caching.limit_curve_cache import generate_cache_key
+from src.utils.caching.single_flight import SingleFlight
+
+# Bump when the analysis outputs (results or figures) change so that previously stored analyses are no longer used
+ANALYSIS_VERSION = 3
+
+
+def canonicalise_table_data(data_dict: dict) -> dict:
+    """
+    Flattens the {parameter: {'Value': value, 'Unit': unit}} inputs of an analysis so that they can be hashed
+    Args:
+        data_dict: Normalised analysis inputs
+
+    Returns:
+        inputs: {'<parameter> [<unit>]': value}
+    """
+    return {f"{parameter} [{item['Unit']}]": item['Value'] for parameter, item in data_dict.items()}
+
+
+class AnalysisCache:
+    """
+    Memoises complete analyses (results and serialised figures) in a Flask-Caching instance.
+    The backend is assigned by the app once Flask-Caching is configured, until then every analysis is computed.
+    Concurrent misses for the same inputs are coalesced into a single computation.
+    """
+    def __init__(self, backend=None, timeout: int = 3600, single_flight: SingleFlight = None):
+        self.backend = backend
+        self.timeout = timeout
+        self.single_flight = single_flight or SingleFlight()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.remote_coalesced = 0   # Misses served by another process holding the single-flight lock
+
+    def get_or_compute(self, data_dict: dict, compute: Callable[[], dict]) -> dict:
+        """
+        Returns the cached analysis for the inputs, computing and storing it on a miss.
+        Analyses raising an exception are not stored.
+        Args:
+            data_dict: Normalised analysis inputs
+            compute: Function returning the analysis
+        """
+        key = generate_cache_key(canonicalise_table_data(data_dict), namespace='analysis', version=ANALYSIS_VERSION)
+        if self.backend is None:
+            return self.single_flight.do(key, compute)[0]
+
+        analysis = self._get(key)
+        with self._lock:
+            if analysis is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            hits, misses = self.hits, self.misses
+        logger.info(f"Analysis cache {'hit' if analysis is not None else 'miss'} | hits: {hits} | misses: {misses}")
+        if analysis is not None:
+            return analysis
+
+        analysis, shared = self.single_flight.do(key, lambda: self._compute_and_store(key, compute))
+        if shared:
+            logger.info(f"Analysis coalesced with an in-flight computation | "
+                        f"coalesced: {self.single_flight.stats()['coalesced']}")
+        return analysis
+
+    def _compute_and_store(self, key: str, compute: Callable[[], dict]) -> dict:
+        # Another process may have stored the analysis while the single-flight lock was awaited
+        if self.single_flight.lock_client is not None:
+            analysis = self._get(key)
+            if analysis is not None:
+                with self._lock:
+                    self.remote_coalesced += 1
+                return analysis
+
+        analysis = compute()
+        try:
+            self.backend.set(key, analysis, timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"Analysis cache unavailable: {e}")
+        return analysis
+
+    def _get(self, key: str) -> dict | None:
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Analysis cache unavailable: {e}")
+            return None
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.remote_coalesced = 0
+        self.single_flight.reset_stats()
+
+    def stats(self) -> dict:
+        """
+        Returns the cache hit/miss counters, hit rate and number of coalesced requests
+        """
+        single_flight_stats = self.single_flight.stats()
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'coalesced': single_flight_stats['coalesced'] + self.remote_coalesced,
+                'in_flight': single_flight_stats['in_flight']
+            }
+
+
+# Process-wide cache used by the defect analysis page
+analysis_cache = AnalysisCache()
@@ -0,0 +1,85 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.utils.analysis.grid_query import query_rows, view_key
+
+
+class BatchResultStore:
+    """
+    Stores batch assessment results in a Flask-Caching instance shared with the background workers that compute them.
+    Results read by this process are kept in a bounded LRU together with the sorted and filtered row positions of their
+    most recent views, so that paging through a view neither reloads the result nor sorts it again.
+    The backend is assigned by the app once Flask-Caching is configured, until then results are only held locally.
+    """
+    def __init__(self, backend=None, timeout: int = 3600, maxsize: int = 4, max_views: int = 4):
+        self.backend = backend
+        self.timeout = timeout
+        self.maxsize = maxsize
+        self.max_views = max_views
+        self._results: OrderedDict[str, tuple[pd.DataFrame, OrderedDict[str, np.ndarray]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, batch_id: str) -> str:
+        return f'batch-result:{batch_id}'
+
+    def _remember(self, batch_id: str, result: pd.DataFrame) -> tuple[pd.DataFrame, OrderedDict]:
+        with self._lock:
+            entry = self._results.setdefault(batch_id, (result, OrderedDict()))
+            self._results.move_to_end(batch_id)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+            return entry
+
+    def _entry(self, batch_id: str) -> tuple[pd.DataFrame, OrderedDict] | None:
+        with self._lock:
+            entry = self._results.get(batch_id)
+            if entry is not None:
+                self._results.move_to_end(batch_id)
+                return entry
+        result = self.backend.get(self._key(batch_id)) if self.backend is not None else None
+        return self._remember(batch_id, result) if result is not None else None
+
+    def __contains__(self, batch_id: str):
+        return self._entry(batch_id) is not None
+
+    def set(self, batch_id: str, result: pd.DataFrame):
+        if self.backend is not None:
+            self.backend.set(self._key(batch_id), result, timeout=self.timeout)
+        self._remember(batch_id, result)
+
+    def get(self, batch_id: str) -> pd.DataFrame | None:
+        entry = self._entry(batch_id)
+        return entry[0] if entry is not None else None
+
+    def query(self, batch_id: str, request: dict) -> dict:
+        """
+        Serves a block of rows of a stored result to AG Grid's infinite row model
+        Args:
+            batch_id: Identifier of the result
+            request: getRowsRequest of the grid
+
+        Returns:
+            response: getRowsResponse of the grid
+        """
+        entry = self._entry(batch_id)
+        if entry is None:
+            raise KeyError(f"Batch result {batch_id} is not available")
+        result, views = entry
+
+        key = view_key(request)
+        with self._lock:
+            view = views.get(key)
+        response, view = query_rows(result, request, view)
+        with self._lock:
+            views[key] = view
+            views.move_to_end(key)
+            while len(views) > self.max_views:
+                views.popitem(last=False)
+        return response
+
+
+# Process-wide store used by the batch assessment page
+batch_results = BatchResultStore()
@@ -0,0 +1,182 @@
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+from loguru import logger
+
+# Bump when the limit curve calculation changes so that previously stored curves are no longer used
+LIMIT_CURVE_VERSION = 2
+
+
+def generate_cache_key(inputs: dict, namespace: str = 'limit-curve', version: int = LIMIT_CURVE_VERSION) -> str:
+    """
+    Generates a canonical key for a set of calculation inputs.
+    Keys are order independent and numeric values are normalised so that e.g. 150 and 150.0 share a key.
+    Args:
+        inputs: Calculation inputs
+        namespace: Prefix of the key
+        version: Version of the calculation producing the cached value
+
+    Returns:
+        key: '<namespace>:<version>:<sha256 of the canonical inputs>'
+    """
+    def canonicalise(value):
+        if isinstance(value, (bool, np.bool_)) or value is None:
+            return value
+        if isinstance(value, (int, float, np.integer, np.floating)):
+            return repr(float(value))
+        return str(value)
+
+    canonical = json.dumps({key: canonicalise(value) for key, value in inputs.items()}, sort_keys=True)
+    return f"{namespace}:{version}:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+
+def serialise_curve(curve: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, curve, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def deserialise_curve(data: bytes) -> np.ndarray:
+    curve = np.load(io.BytesIO(data), allow_pickle=False)
+    curve.setflags(write=False)
+    return curve
+
+
+class LimitCurveCache:
+    """
+    Bounded LRU cache of limit curves with an optional shared second tier.
+    Curves are stored as read-only (2, n) float64 arrays of [defect_length, defect_relative_depth].
+    The second tier can be any client exposing get/set/delete, e.g. diskcache.Cache or redis.Redis, and holds the
+    curves serialised in the .npy format so that they can be shared between processes.
+    """
+    def __init__(self, maxsize: int = 256, backend=None):
+        self.maxsize = maxsize
+        self.backend = backend
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.backend_hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str) -> np.ndarray | None:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        if self.backend is not None:
+            try:
+                data = self.backend.get(key)
+            except Exception as e:
+                logger.warning(f"Limit curve cache backend unavailable: {e}")
+                data = None
+            if data is not None:
+                curve = deserialise_curve(data)
+                self._store(key, curve)
+                with self._lock:
+                    self.backend_hits += 1
+                return curve
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, curve: np.ndarray) -> np.ndarray:
+        """
+        Stores a curve in both tiers
+        Returns:
+            curve: Read-only copy of the stored curve
+        """
+        curve = np.array(curve, dtype=np.float64)
+        curve.setflags(write=False)
+        self._store(key, curve)
+        if self.backend is not None:
+            try:
+                self.backend.set(key, serialise_curve(curve))
+            except Exception as e:
+                logger.warning(f"Limit curve cache backend unavailable: {e}")
+        return curve
+
+    def _store(self, key: str, curve: np.ndarray):
+        with self._lock:
+            self._entries[key] = curve
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, inputs: dict, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Returns the cached curve for the inputs, computing and storing it on a miss
+        Args:
+            inputs: Every input the curve depends on
+            compute: Function returning the curve as a (2, n) array
+        """
+        key = generate_cache_key(inputs)
+        curve = self.get(key)
+        if curve is None:
+            curve = self.set(key, compute())
+        return curve
+
+    def invalidate(self, inputs: dict = None):
+        """
+        Removes a curve from both tiers, or every curve if no inputs are provided
+        Args:
+            inputs: Inputs of the curve to remove
+        """
+        if inputs is not None:
+            key = generate_cache_key(inputs)
+            with self._lock:
+                self._entries.pop(key, None)
+            keys = [key]
+        else:
+            with self._lock:
+                self._entries.clear()
+            keys = None
+        if self.backend is None:
+            return
+
+        try:
+            if keys is None:
+                prefix = generate_cache_key({}).rsplit(':', 2)[0]
+                if hasattr(self.backend, 'scan_iter'):  # Redis
+                    keys = list(self.backend.scan_iter(match=f'{prefix}:*'))
+                else:  # diskcache
+                    keys = [key for key in self.backend.iterkeys()
+                            if isinstance(key, str) and key.startswith(f'{prefix}:')]
+            for key in keys:
+                self.backend.delete(key)
+        except Exception as e:
+            # Shared curves stay until invalidated again once the backend is available
+            logger.warning(f"Limit curve cache backend unavailable, shared curves not invalidated: {e}")
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.backend_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the cache hit/miss counters and hit rate
+        """
+        with self._lock:
+            requests = self.hits + self.backend_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'backend_hits': self.backend_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.backend_hits) / requests if requests else 0.0
+            }
+
+
+# Process-wide cache used by Pipe
+limit_curve_cache = LimitCurveCache()
@@ -0,0 +1,145 @@
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable
+
+from loguru import logger
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class DiskcacheLock:
+    """
+    Lock held in a diskcache.Cache, with the acquire and release of redis.lock.Lock used by SingleFlight
+    """
+    def __init__(self, cache, name: str, timeout: float = None, blocking_timeout: float = None,
+                 poll_interval: float = 0.01):
+        self.cache = cache
+        self.name = name
+        self.timeout = timeout
+        self.blocking_timeout = blocking_timeout
+        self.poll_interval = poll_interval
+        self._token = uuid.uuid4().hex
+
+    def acquire(self) -> bool:
+        deadline = None if self.blocking_timeout is None else time.monotonic() + self.blocking_timeout
+        # add only sets the key if it is missing, the lock expires with its key if its holder dies
+        while not self.cache.add(self.name, self._token, expire=self.timeout, retry=True):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def release(self):
+        # The lock may have expired and been acquired by another process
+        with self.cache.transact(retry=True):
+            if self.cache.get(self.name, retry=True) == self._token:
+                self.cache.delete(self.name, retry=True)
+
+
+class DiskcacheLockClient:
+    """
+    Provides the lock of redis.Redis on a diskcache.Cache, for processes sharing a host such as the background
+    callbacks of a DiskcacheManager
+    """
+    def __init__(self, cache):
+        self.cache = cache
+
+    def lock(self, name: str, timeout: float = None, blocking_timeout: float = None) -> DiskcacheLock:
+        return DiskcacheLock(self.cache, name, timeout=timeout, blocking_timeout=blocking_timeout)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls sharing a key into a single computation.
+    Within a process the first caller computes while the others wait for and share its result. Processes only share
+    in-flight computations through lock_client, a Redis client or a DiskcacheLockClient, whose lock guards the
+    computation so that only one process computes a key at a time; callers should then re-check their shared cache
+    once the lock is held.
+    """
+    def __init__(self, lock_client=None, lock_timeout: int = 120):
+        self.lock_client = lock_client
+        self.lock_timeout = lock_timeout
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: str, compute: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        Computes the value of a key unless an identical computation is already in flight
+        Args:
+            key: Canonical key of the computation
+            compute: Function returning the value
+
+        Returns:
+            value: Result of the computation
+            shared: Whether the result was computed by another caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            logger.debug(f"Waiting for in-flight computation {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            with self._distributed_lock(key):
+                call.result = compute()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    @contextmanager
+    def _distributed_lock(self, key: str):
+        if self.lock_client is None:
+            yield
+            return
+
+        lock = self.lock_client.lock(f'{key}:lock', timeout=self.lock_timeout, blocking_timeout=self.lock_timeout)
+        try:
+            acquired = lock.acquire()
+        except Exception as e:
+            logger.warning(f"Single-flight lock unavailable: {e}")
+            acquired = False
+        if not acquired:
+            logger.warning(f"Computing {key} without holding its single-flight lock")
+        try:
+            yield
+        finally:
+            if acquired:
+                try:
+                    lock.release()
+                except Exception as e:
+                    logger.warning(f"Failed to release single-flight lock: {e}")
+
+    def reset_stats(self):
+        with self._lock:
+            self.leaders = self.coalesced = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the number of computations performed and of callers that waited on one instead
+        """
+        with self._lock:
+            return {'in_flight': len(self._calls), 'leaders': self.leaders, 'coalesced': self.coalesced}
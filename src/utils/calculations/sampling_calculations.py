@@ -0,0 +1,125 @@
+from typing import Callable, Optional
+
+import numpy as np
+
+
+def calculate_chord_error(start: tuple, middle: tuple, end: tuple) -> float:
+    """
+    Calculates the vertical distance between a point and the chord joining its neighbours, i.e. the error in y made
+    by linearly interpolating between start and end at the x position of the middle point
+    Args:
+        start: (x, y) of the first point
+        middle: (x, y) of the point between start and end
+        end: (x, y) of the last point
+
+    Returns:
+        error: Absolute error in y
+    """
+    (x_0, y_0), (x_m, y_m), (x_1, y_1) = start, middle, end
+    if x_1 == x_0:
+        return abs(y_m - (y_0 + y_1) / 2)
+    fraction = min(max((x_m - x_0) / (x_1 - x_0), 0.0), 1.0)
+    return abs(y_m - (y_0 + fraction * (y_1 - y_0)))
+
+
+def sample_curve_adaptively(
+        point: Callable[[float], Optional[tuple[float, float]]],
+        start: float,
+        stop: float,
+        tolerance: float,
+        initial_samples: int = 17,
+        max_refinements: int = 16
+) -> np.ndarray:
+    """
+    Samples a parametric curve, recursively bisecting the intervals in which the chord error exceeds the tolerance.
+    Points are concentrated where the curve bends while nearly straight sections keep only a few points.
+    Args:
+        point: Function mapping the curve parameter to an (x, y) point, or None where the curve is undefined
+        start: First value of the curve parameter
+        stop: Last value of the curve parameter
+        tolerance: Maximum chord error in y, also the precision to which the ends of the defined region are located
+        initial_samples: Number of evenly spaced parameters evaluated before refining
+        max_refinements: Maximum number of times an initial interval is bisected
+
+    Returns:
+        points: Array of [x, y] ordered by the curve parameter
+    """
+    samples = {}
+
+    def evaluate(parameter):
+        if parameter not in samples:
+            samples[parameter] = point(parameter)
+        return samples[parameter]
+
+    parameters = np.linspace(start, stop, initial_samples)
+    for parameter in parameters:
+        evaluate(parameter)
+
+    # Locate the ends of the region in which the curve is defined
+    for lower, upper in zip(parameters[:-1], parameters[1:]):
+        if (samples[lower] is None) == (samples[upper] is None):
+            continue
+        undefined, defined = (lower, upper) if samples[lower] is None else (upper, lower)
+        while abs(defined - undefined) > tolerance:
+            middle = (defined + undefined) / 2
+            if evaluate(middle) is None:
+                undefined = middle
+            else:
+                defined = middle
+
+    # Refine the intervals between consecutive defined points
+    defined_parameters = sorted(parameter for parameter, sample in samples.items() if sample is not None)
+    pending = [(lower, upper, 0) for lower, upper in zip(defined_parameters[:-1], defined_parameters[1:])]
+    while pending:
+        lower, upper, refinements = pending.pop()
+        if refinements >= max_refinements:
+            continue
+        middle = (lower + upper) / 2
+        middle_point = evaluate(middle)
+        if middle_point is None:
+            continue
+        if calculate_chord_error(samples[lower], middle_point, samples[upper]) > tolerance:
+            pending.append((lower, middle, refinements + 1))
+            pending.append((middle, upper, refinements + 1))
+
+    points = [samples[parameter] for parameter in sorted(samples) if samples[parameter] is not None]
+    return np.array(points, dtype=float).reshape(-1, 2).T
+
+
+def downsample_largest_triangle(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Downsamples a curve for display with the Largest-Triangle-Three-Buckets algorithm, keeping the first and last
+    points and, from each of the buckets between them, the point forming the largest triangle with the point kept
+    from the previous bucket and the mean of the next bucket
+    Args:
+        x: x values of the curve
+        y: y values of the curve
+        max_points: Maximum number of points kept, at least 3
+
+    Returns:
+        indices: Sorted indices of the points kept
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    count = len(x)
+    if max_points < 3:
+        raise ValueError(f"At least 3 points must be kept, {max_points} requested")
+    if count <= max_points:
+        return np.arange(count)
+
+    # Interior points split into max_points - 2 buckets of near-equal size
+    edges = np.linspace(1, count - 1, max_points - 1).astype(int)
+    indices = np.empty(max_points, dtype=int)
+    indices[0], indices[-1] = 0, count - 1
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_x = x[end:edges[bucket + 2]].mean()
+            next_y = y[end:edges[bucket + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        previous_x, previous_y = x[indices[bucket]], y[indices[bucket]]
+        area = np.abs((previous_x - next_x) * (y[start:end] - previous_y)
+                      - (previous_x - x[start:end]) * (next_y - previous_y))
+        indices[bucket + 1] = start + int(area.argmax())
+    return indices
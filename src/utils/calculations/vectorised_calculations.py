@@ -0,0 +1,219 @@
+"""
+Array counterparts of the scalar DNV-RP-F101 calculations.
+
+Every function accepts scalars or NumPy arrays and relies on broadcasting, so a whole grid of scenarios can be
+evaluated in one call. Inputs outside the validity range of the recommended practice evaluate to NaN instead of
+raising, which allows a single invalid combination to be reported without aborting the whole grid.
+"""
+import numpy as np
+from scipy.special import ndtri
+
+from src.utils.calculations import statistical_calculations
+
+
+def calculate_std_dev(conf, acc, measurement_method: str, t=None):
+    """
+    Calculates the standard deviation of the relative defect depth measurement (see statistical_calculations)
+    Args:
+        conf: Confidence level
+        acc: Relative/Absolute accuracy
+        measurement_method: 'relative' or 'absolute'
+        t: Wall thickness (mm), only used with absolute measurements
+
+    Returns:
+        std_dev: Standard deviation
+    """
+    conf = np.asarray(conf, dtype=float)
+    acc = np.asarray(acc, dtype=float)
+    if measurement_method == 'relative':
+        return acc / ndtri(0.5 + conf / 2)
+    elif measurement_method == 'absolute':
+        if t is None:
+            raise ValueError('Cannot calculate absolute accuracy without wall thickness')
+        return (np.sqrt(2) * acc) / (np.asarray(t, dtype=float) * ndtri(0.5 + conf / 2))
+    raise ValueError('Must define either relative or absolute accuracy')
+
+
+def calculate_partial_safety_factors(safety_class, inspection_method: str, inspection_accuracy) -> dict:
+    """
+    Array version of statistical_calculations.calculate_partial_safety_factors (Table 3-2 and Table 3-8)
+    Args:
+        safety_class: Safety class or array of safety classes
+        inspection_method: 'relative' or 'absolute'
+        inspection_accuracy: Standard deviation of the relative depth measurement
+
+    Returns:
+        partial_safety_factors: {"gamma_m", "gamma_d", "epsilon_d"}, NaN where the accuracy is out of range
+    """
+    s = np.asarray(inspection_accuracy, dtype=float)
+    safety_class = np.char.lower(np.asarray(safety_class, dtype=str))
+    shape = np.broadcast_shapes(s.shape, safety_class.shape)
+
+    gamma_m = np.full(shape, np.nan)
+    gamma_d = np.full(shape, np.nan)
+    for selected_class in np.unique(safety_class):
+        mask = np.broadcast_to(safety_class == selected_class, shape)
+        # gamma_m only depends on the safety class and inspection method
+        gamma_m = np.where(
+            mask, statistical_calculations.calculate_partial_safety_factors(selected_class, inspection_method, 0.0)['gamma_m'],
+            gamma_m)
+        if selected_class == 'low':
+            class_gamma_d = np.select(
+                [s < 0.04, (0.04 <= s) & (s < 0.08), (0.08 <= s) & (s <= 0.16)],
+                [1.0 + 4.0 * s, 1.0 + 5.5 * s - 37.5 * s ** 2, np.full_like(s, 1.2)],
+                default=np.nan)
+        elif selected_class == 'medium':
+            class_gamma_d = np.where(s <= 0.16, 1.0 + 4.6 * s - 13.9 * s ** 2, np.nan)
+        elif selected_class == 'high':
+            class_gamma_d = np.where(s <= 0.16, 1.0 + 4.3 * s - 4.1 * s ** 2, np.nan)
+        else:  # very high
+            class_gamma_d = np.select(
+                [s < 0.03, (0.03 <= s) & (s < 0.16)],
+                [1.0 * 4.0 * s, 0.92 + 7.1 * s - 8.3 * s ** 2],
+                default=np.nan)
+        gamma_d = np.where(mask, class_gamma_d, gamma_d)
+
+    epsilon_d = np.select([s <= 0.04, (0.04 < s) & (s <= 0.16)], [np.zeros_like(s), -1.33 + 37.5 * s - 104.2 * s ** 2],
+                          default=np.nan)
+
+    return {
+        "gamma_m": gamma_m,
+        "gamma_d": gamma_d,
+        "epsilon_d": np.broadcast_to(epsilon_d, shape)
+    }
+
+
+def calculate_usage_factors(safety_class):
+    """
+    Array version of statistical_calculations.calculate_usage_factors (Table 3-10)
+    Args:
+        safety_class: Safety class or array of safety classes
+
+    Returns:
+        xi: Usage factor for longitudinal stress
+    """
+    safety_class = np.char.lower(np.asarray(safety_class, dtype=str))
+    xi = np.full(safety_class.shape, np.nan)
+    for selected_class in np.unique(safety_class):
+        xi = np.where(safety_class == selected_class, statistical_calculations.calculate_usage_factors(selected_class), xi)
+    return xi
+
+
+def calculate_tensile_strength(smts, temperature, alpha_u=0.96):
+    """
+    Calculates f_u as defined in Section 2.6 using the de-rating values of Figure 2-3
+    Args:
+        smts: Specified minimum tensile strength (N/mm^2)
+        temperature: Design temperature (C)
+        alpha_u: Material strength factor
+
+    Returns:
+        f_u: Tensile strength to be used in design (N/mm^2), NaN outside 50-200 C
+    """
+    temperature = np.asarray(temperature, dtype=float)
+    f_u_temp = np.select(
+        [(50 < temperature) & (temperature <= 100), (100 < temperature) & (temperature < 200)],
+        [0.6 * temperature - 30, 0.4 * temperature - 10],
+        default=np.nan)
+    return (np.asarray(smts, dtype=float) - f_u_temp) * alpha_u
+
+
+def calculate_length_correction_factor(defect_length, d_nominal, wall_thickness):
+    """
+    Calculates the length correction factor Q as defined in Section 2.1
+    Q = sqrt((1+0.31(l/sqrt(D*t))^2))
+    """
+    return np.sqrt(1 + 0.31 * (np.asarray(defect_length, dtype=float) / np.sqrt(d_nominal * wall_thickness)) ** 2)
+
+
+def calculate_effective_pressure(design_pressure, incidental_to_design_pressure_ratio, containment_density,
+                                 seawater_density, elevation_reference, elevation):
+    """
+    Calculates the effective pressure p_li - p_le (N/mm^2) as done by Environment and Pipe
+    Args:
+        design_pressure: Design pressure (bar)
+        incidental_to_design_pressure_ratio: Incidental to design pressure ratio
+        containment_density: Density of the contents (kg/m^3)
+        seawater_density: Density of seawater (kg/m^3)
+        elevation_reference: Reference elevation of the design pressure (m)
+        elevation: Elevation of the defect (m)
+
+    Returns:
+        p_eff: Effective pressure (N/mm^2)
+    """
+    external_pressure = (-1 * np.asarray(seawater_density, dtype=float) * 9.81 * elevation) / 1000000
+    incidental_pressure = (0.1 * np.asarray(design_pressure, dtype=float) * incidental_to_design_pressure_ratio +
+                           (containment_density * 9.81 * (np.asarray(elevation_reference, dtype=float) - elevation))
+                           / 1000000)
+    return incidental_pressure - external_pressure
+
+
+def calculate_pressure_resistance(gamma_m, gamma_d, t_nominal, d_nominal, f_u, q,
+                                  relative_defect_depth_with_uncertainty):
+    """
+    Calculates pressure resistance p_corr using the equation defined in Section 3.7.3
+    """
+    d_t_star = gamma_d * relative_defect_depth_with_uncertainty
+    return gamma_m * ((2 * t_nominal * f_u) / (d_nominal - t_nominal)) * ((1 - d_t_star) / (1 - d_t_star / q))
+
+
+def calculate_uncorroded_pressure_resistance(gamma_m, t_nominal, d_nominal, f_u):
+    """
+    Calculates p_0, the pressure resistance of the pipe without corrosion, as used in Section 3.7.3
+    """
+    return gamma_m * (2 * t_nominal * f_u) / (d_nominal - t_nominal)
+
+
+def calculate_h1(gamma_m, gamma_d, d_nominal, f_u, q, defect_width, defect_relative_depth_measured,
+                 relative_defect_depth_with_uncertainty, sigma_l, xi):
+    """
+    Calculates H1, the factor for longitudinal compressive stress defined in Section 3.7.4, before limiting it to 1
+    """
+    theta = np.asarray(defect_width, dtype=float) / (np.pi * d_nominal)
+    a_r = 1 - defect_relative_depth_measured * theta
+    d_t_star = gamma_d * relative_defect_depth_with_uncertainty
+    return (1 + (sigma_l / (xi * f_u)) * (1 / a_r)) / (1 - (gamma_m / (2 * xi * a_r)) * ((1 - d_t_star) /
+                                                                                       (1 - d_t_star / q)))
+
+
+def calculate_pressure_resistance_w_compressive_load(gamma_m, gamma_d, t_nominal, d_nominal, f_u, q, defect_width,
+                                                     defect_relative_depth_measured,
+                                                     relative_defect_depth_with_uncertainty, sigma_l, xi):
+    """
+    Calculates pressure resistance p_corr,comp using the equations defined in Section 3.7.4
+    """
+    p_corr = calculate_pressure_resistance(gamma_m, gamma_d, t_nominal, d_nominal, f_u, q,
+                                           relative_defect_depth_with_uncertainty)
+    h1 = calculate_h1(gamma_m, gamma_d, d_nominal, f_u, q, defect_width, defect_relative_depth_measured,
+                      relative_defect_depth_with_uncertainty, sigma_l, xi)
+    return p_corr * np.minimum(h1, 1.0)
+
+
+def calculate_allowable_relative_depth(pressure_resistance, target_pressure, gamma_d, epsilon_d, st_dev,
+                                       iterations: int = 48):
+    """
+    Finds the maximum measured relative depth for which the pressure resistance still exceeds the target pressure.
+    The pressure resistance decreases monotonically with depth, so the root is bracketed and bisected on every
+    element of the grid simultaneously.
+    Args:
+        pressure_resistance: Callable mapping measured relative depth (array) to pressure resistance (array)
+        target_pressure: Effective pressure to be resisted (N/mm^2)
+        gamma_d: Partial Safety Factor for Corrosion Depth
+        epsilon_d: Factor for defining a fractile value for corrosion depth
+        st_dev: Standard deviation of the relative depth measurement
+        iterations: Number of bisection steps, 48 resolves the depth well below floating point noise of the inputs
+
+    Returns:
+        d_t: Allowable measured relative depth, 0 where even an uncorroded section is insufficient
+    """
+    upper = np.minimum(1.0, 1 / gamma_d - epsilon_d * st_dev)
+    shape = np.broadcast_shapes(np.shape(upper), np.shape(target_pressure))
+    lower = np.zeros(shape)
+    upper = np.broadcast_to(upper, shape).copy()
+    for _ in range(iterations):
+        middle = (lower + upper) / 2
+        acceptable = pressure_resistance(middle) >= target_pressure
+        lower = np.where(acceptable, middle, lower)
+        upper = np.where(acceptable, upper, middle)
+    allowable_depth = np.where(pressure_resistance(np.zeros(shape)) >= target_pressure, lower, 0.0)
+    return np.where(np.isnan(upper), np.nan, allowable_depth)
@@ -1,23 +1,54 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 
 from src.utils import models
+from src.utils.calculations.sampling_calculations import downsample_largest_triangle
+from src.utils.monitoring.stage_metrics import stage_metrics
 
 
-def generate_defect_depth_plot(pipe: models.Pipe) -> go.Figure:
+# Discrete pass/fail colour scale for defect populations, 0 = acceptable, 1 = unacceptable
+POPULATION_COLOURSCALE = [[0, 'blue'], [0.5, 'blue'], [0.5, 'red'], [1, 'red']]
+# Maximum number of points of each limit curve sent to the browser, the full curves are kept for calculations
+LIMIT_CURVE_DISPLAY_POINTS = 48
+
+
+def downsample_limits(limits: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """
+    Downsamples a limit curve for display, preserving its shape
+    Args:
+        limits: Maximum allowable defect depth at each length
+        max_points: Maximum number of points kept
+
+    Returns:
+        limits: The points of the curve kept for display
     """
-    Generates a plot to represent the pipe's current state, with a single defect represented as a point
+    indices = downsample_largest_triangle(limits['defect_length'], limits['defect_relative_depth'], max_points)
+    return limits.iloc[indices]
+
+
+@stage_metrics.timed('figure_defect_depth')
+def generate_defect_depth_plot(pipe: models.Pipe, population: pd.DataFrame = None,
+                               max_curve_points: int = None) -> go.Figure:
+    """
+    Generates a plot to represent the pipe's current state, with each defect represented as a named point
     with the maximum allowable defect depth at each length represented as a line.
     Args:
         pipe: Pipe object
+        population: Optional defect population, e.g. from an ILI run, with columns defect_length,
+                    defect_relative_depth and pressure_resistance, and acceptable if assessed. Any further columns are
+                    shown on hover. The population is drawn as a single WebGL trace.
+        max_curve_points: Maximum number of points of each limit curve, defaults to LIMIT_CURVE_DISPLAY_POINTS
 
     Returns:
         fig: Figure
     """
+    max_curve_points = max_curve_points or LIMIT_CURVE_DISPLAY_POINTS
+    limits = [downsample_limits(curve, max_curve_points) for curve in pipe.properties.maximum_allowable_defect_depth]
     # Plot figure
     fig = px.line(
-        pipe.properties.maximum_allowable_defect_depth[0], x='defect_length', y='defect_relative_depth',
+        limits[0], x='defect_length', y='defect_relative_depth',
         color_discrete_sequence=['red'],
         labels={
             'defect_length': 'Corrosion Defect Length (mm)',
@@ -25,9 +56,9 @@ def generate_defect_depth_plot(pipe: models.Pipe) -> go.Figure:
         },
         range_y=[0, 1.0], range_x=[0, 1000])
 
-    if len(pipe.properties.maximum_allowable_defect_depth) > 1:
+    if len(limits) > 1:
         interacting_limits = px.line(
-            pipe.properties.maximum_allowable_defect_depth[1], x='defect_length', y='defect_relative_depth',
+            limits[1], x='defect_length', y='defect_relative_depth',
             color_discrete_sequence=['red'],
             line_dash_sequence=['dash'],
             labels={
@@ -37,57 +68,37 @@ def generate_defect_depth_plot(pipe: models.Pipe) -> go.Figure:
             range_y=[0, 1.0], range_x=[0, 1000]
         )
         fig.add_trace(interacting_limits.data[0])
-
-    def add_marker(defect):
-        marker_df = pd.DataFrame(
-            {
-                'defect_length': defect.length,
-                'defect_relative_depth': defect.relative_depth,
-                'pressure_resistance': round(defect.pressure_resistance, 2)
-            }, index=[0])
-        marker_colour = 'blue' if pipe.properties.effective_pressure <= defect.pressure_resistance else 'red'
-        marker = px.scatter(marker_df, x='defect_length', y='defect_relative_depth', text='pressure_resistance',
-                            color_discrete_sequence=[marker_colour])
-
-        fig.add_trace(marker.data[0])
-
-    for defect in pipe.defects:
-        add_marker(defect)
-
-    fig.update_traces(textposition='top center')
-
-    if len(fig['data']) == 2:
-        fig['data'][0]['showlegend'] = True
-        fig['data'][1]['showlegend'] = True
-        fig['data'][0]['name'] = 'Calculated Limits'
-        fig['data'][1]['name'] = 'Measured Defect'
-    elif len(fig['data']) == 3:
-        fig['data'][0]['showlegend'] = True
-        fig['data'][1]['showlegend'] = True
-        fig['data'][2]['showlegend'] = True
-
-        fig['data'][0]['name'] = 'Calculated Limits'
-        fig['data'][1]['name'] = 'Measured Defect 1'
-        fig['data'][2]['name'] = 'Measured Defect 2'
-        # set secondary marker to be a square
-        fig['data'][2]['marker']['symbol'] = 'square'
-    elif len(fig['data']) == 5:
-        fig['data'][0]['showlegend'] = True
-        fig['data'][1]['showlegend'] = True
-        fig['data'][2]['showlegend'] = True
-        fig['data'][3]['showlegend'] = True
-        fig['data'][4]['showlegend'] = True
-
         fig['data'][0]['name'] = 'Calculated Limits - Primary'
         fig['data'][1]['name'] = 'Calculated Limits - Interacting'
-        fig['data'][2]['name'] = 'Measured Defect 1'
-        fig['data'][3]['name'] = 'Measured Defect 2'
-        fig['data'][4]['name'] = 'Combined Defect'
+    else:
+        fig['data'][0]['name'] = 'Calculated Limits'
+    fig.update_traces(showlegend=True)
 
-        # set secondary marker to be a square
-        fig['data'][3]['marker']['symbol'] = 'square'
-        # set combined marker to be a square
-        fig['data'][4]['marker']['symbol'] = 'x'
+    if population is not None:
+        fig.add_trace(generate_defect_population_trace(population, pipe.properties.effective_pressure))
+
+    symbols = ['circle', 'square', 'x']     # Primary, secondary and combined defects
+    for index, defect in enumerate(pipe.defects):
+        if len(pipe.defects) == 1:
+            name = 'Measured Defect'
+        elif index < 2:
+            name = f'Measured Defect {index + 1}'
+        else:
+            name = 'Combined Defect'
+        fig.add_trace(go.Scatter(
+            x=[defect.length],
+            y=[defect.relative_depth],
+            text=[round(defect.pressure_resistance, 2)],
+            mode='markers+text',
+            textposition='top center',
+            marker=dict(
+                color='blue' if pipe.properties.effective_pressure <= defect.pressure_resistance else 'red',
+                symbol=symbols[min(index, len(symbols) - 1)]
+            ),
+            name=name,
+            hovertemplate='defect_length=%{x}<br>defect_relative_depth=%{y}<br>pressure_resistance=%{text}'
+                          '<extra></extra>'
+        ))
 
     fig.update_layout(
         # height=800,
@@ -101,3 +112,40 @@ def generate_defect_depth_plot(pipe: models.Pipe) -> go.Figure:
     fig.update_xaxes(fixedrange=True)
     fig.update_yaxes(fixedrange=True)
     return fig
+
+
+def generate_defect_population_trace(population: pd.DataFrame, effective_pressure: float) -> go.Scattergl:
+    """
+    Generates a single WebGL trace for a defect population, coloured by whether each defect is acceptable.
+    Colours are encoded as a numeric array on a discrete colour scale as per-point colour strings are slow to validate
+    for large populations.
+    Args:
+        population: Defects with columns defect_length, defect_relative_depth and pressure_resistance, any further
+                    columns are shown on hover. The acceptable column of assessed defects is used when present, as
+                    their effective pressures may differ from the pipe's.
+        effective_pressure: Effective pressure (MPa), defects are unacceptable unless their pressure resistance is
+                            greater, including those outside the equation with a NaN pressure resistance
+
+    Returns:
+        trace: Scattergl trace
+    """
+    hover_columns = [column for column in population.columns
+                     if column not in ('defect_length', 'defect_relative_depth')]
+    hovertemplate = 'defect_length=%{x}<br>defect_relative_depth=%{y}'
+    for index, column in enumerate(hover_columns):
+        hovertemplate += f'<br>{column}=%{{customdata[{index}]}}'
+
+    if 'acceptable' in population.columns:
+        unacceptable = ~population['acceptable'].to_numpy(dtype=bool)
+    else:
+        unacceptable = ~(population['pressure_resistance'].to_numpy() > effective_pressure)
+    unacceptable = unacceptable.astype(np.int8)
+    return go.Scattergl(
+        x=population['defect_length'].to_numpy(),
+        y=population['defect_relative_depth'].to_numpy(),
+        customdata=population[hover_columns].to_numpy(),
+        mode='markers',
+        marker=dict(color=unacceptable, colorscale=POPULATION_COLOURSCALE, cmin=0, cmax=1, size=5, opacity=0.6),
+        name='Defect Population',
+        hovertemplate=hovertemplate + '<extra></extra>'
+    )
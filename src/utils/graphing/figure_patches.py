@@ -0,0 +1,74 @@
+import hashlib
+import json
+
+from dash import Patch, no_update
+
+# Layout entries holding lists of elements that are patched element by element
+PATCHED_LAYOUT_LISTS = ('shapes', 'annotations')
+
+
+def _hash(value) -> str:
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+def fingerprint_figure(figure: dict) -> dict:
+    """
+    Summarises a figure as hashes of each trace, layout entry and shape so that a later version of the figure can be
+    compared against it without sending the figure back from the browser
+    Args:
+        figure: Figure as a plotly JSON dict
+
+    Returns:
+        fingerprint: {'data': [trace hash], 'layout': {key: hash}, <layout list>: [element hash]}
+    """
+    layout = figure.get('layout', {})
+    fingerprint = {
+        'data': [_hash(trace) for trace in figure.get('data', [])],
+        'layout': {key: _hash(value) for key, value in layout.items() if key not in PATCHED_LAYOUT_LISTS}
+    }
+    for key in PATCHED_LAYOUT_LISTS:
+        fingerprint[key] = [_hash(element) for element in layout.get(key, [])]
+    return fingerprint
+
+
+def patch_figure(figure: dict, previous_fingerprint: dict = None):
+    """
+    Generates the smallest update turning the figure described by previous_fingerprint into figure
+    Args:
+        figure: New figure as a plotly JSON dict
+        previous_fingerprint: Fingerprint of the figure currently displayed
+
+    Returns:
+        update: The complete figure if the number of traces or shapes changed, no_update if nothing changed,
+                otherwise a Patch replacing only the traces, layout entries and shapes that changed
+    """
+    fingerprint = fingerprint_figure(figure)
+    if previous_fingerprint is None or any(
+            len(fingerprint[key]) != len(previous_fingerprint.get(key, []))
+            for key in ('data', *PATCHED_LAYOUT_LISTS)):
+        return figure
+
+    layout = figure.get('layout', {})
+    patch = Patch()
+    changed = False
+
+    for index, (trace_hash, previous_hash) in enumerate(zip(fingerprint['data'], previous_fingerprint['data'])):
+        if trace_hash != previous_hash:
+            patch['data'][index] = figure['data'][index]
+            changed = True
+
+    for key, value_hash in fingerprint['layout'].items():
+        if value_hash != previous_fingerprint['layout'].get(key):
+            patch['layout'][key] = layout[key]
+            changed = True
+    for key in previous_fingerprint['layout'].keys() - fingerprint['layout'].keys():
+        del patch['layout'][key]
+        changed = True
+
+    for key in PATCHED_LAYOUT_LISTS:
+        for index, (element_hash, previous_hash) in enumerate(zip(fingerprint[key], previous_fingerprint[key])):
+            if element_hash != previous_hash:
+                patch['layout'][key][index] = layout[key][index]
+                changed = True
+
+    return patch if changed else no_update
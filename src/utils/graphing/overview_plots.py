@@ -0,0 +1,52 @@
+import numpy as np
+import plotly.graph_objects as go
+
+OVERVIEW_METRICS = {
+    'defect_depth': 'Defect Depth (t)',
+    'erf': 'ERF',
+    'pressure_resistance': 'Pressure Resistance (MPa)'
+}
+
+
+def generate_overview_plot(window: dict, metric: str, dataset_id: str = None) -> go.Figure:
+    """
+    Generates an overview of a metric along the line from a window of an LodPyramid
+    Args:
+        window: Result of LodPyramid.window
+        metric: Metric to display, one of OVERVIEW_METRICS
+        dataset_id: Identifier of the displayed dataset, preserving the zoom while the same dataset and metric are displayed
+
+    Returns:
+        fig: Figure
+    """
+    label = OVERVIEW_METRICS.get(metric, metric)
+    if window['level'] == 0:
+        traces = [
+            go.Scattergl(x=window['kp'], y=window['values'][metric], mode='markers', name='Features',
+                         marker={'size': 5, 'color': '#1f77b4'},
+                         hovertemplate=f'KP %{{x:.3f}} km<br>{label} %{{y:.3f}}<extra></extra>')
+        ]
+    else:
+        # Each bin is drawn at both ends of its KP extent so that the envelope covers the features it holds
+        kp = np.column_stack([window['kp_min'], window['kp_max']]).ravel()
+        maximum = np.repeat(window['max'][metric], 2)
+        minimum = np.repeat(window['min'][metric], 2)
+        traces = [
+            go.Scattergl(x=kp, y=minimum, mode='lines', name='Minimum', line={'width': 0.5, 'color': '#1f77b4'},
+                         hoverinfo='skip', showlegend=False),
+            go.Scattergl(x=kp, y=maximum, mode='lines', name='Range', line={'width': 0.5, 'color': '#1f77b4'},
+                         fill='tonexty', fillcolor='rgba(31, 119, 180, 0.3)', hoverinfo='skip'),
+            go.Scattergl(x=window['severity_kp'], y=window['severity_values'][metric], mode='markers',
+                         name='Most Severe', marker={'size': 5, 'color': '#d62728'},
+                         hovertemplate=f'KP %{{x:.3f}} km<br>{label} %{{y:.3f}}<extra></extra>')
+        ]
+
+    fig = go.Figure(data=traces)
+    fig.update_layout(
+        title=f"{label} along the line (level {window['level']})",
+        xaxis_title='KP (km)',
+        yaxis_title=label,
+        uirevision=f'{dataset_id}:{metric}',
+        hovermode='closest'
+    )
+    return fig
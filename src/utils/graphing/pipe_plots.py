@@ -3,8 +3,10 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 from src.utils import models
+from src.utils.monitoring.stage_metrics import stage_metrics
 
 
+@stage_metrics.timed('figure_pipe_cross_section')
 def generate_pipe_cross_section_plot(pipe: models.Pipe, figure_width: int = 400) -> go.Figure:
     """
     Generates a plot to represent the pipe's cross-section.
@@ -54,6 +56,7 @@ def generate_pipe_cross_section_plot(pipe: models.Pipe, figure_width: int = 400)
     return fig
 
 
+@stage_metrics.timed('figure_defect_cross_section')
 def generate_defect_cross_section_plot(pipe: models.Pipe, figure_width: int = 400) -> go.Figure:
     """
     Generates a plot to represent the pipe's cross-section with a defect.
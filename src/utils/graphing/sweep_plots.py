@@ -0,0 +1,47 @@
+import pandas as pd
+import plotly.graph_objects as go
+
+from src.utils.analysis.sweep import sweep_to_grid
+
+RESULT_LABELS = {
+    'effective_pressure': 'Effective Pressure (MPa)',
+    'pressure_resistance': 'Pressure Resistance (MPa)',
+    'allowable_relative_depth': 'Allowable Measured Relative Depth (d/t)',
+    'acceptable': 'Acceptable'
+}
+
+
+def generate_sweep_heatmap(result: pd.DataFrame, x: str, y: str, value: str) -> go.Figure:
+    """
+    Generates a heatmap of a parameter sweep result.
+    Args:
+        result: Result of run_parameter_sweep
+        x: Swept parameter along the x-axis
+        y: Swept parameter along the y-axis
+        value: Result column to display
+
+    Returns:
+        fig: Figure
+    """
+    grid = sweep_to_grid(result, x, y, value)
+
+    if value == 'acceptable':
+        heatmap = go.Heatmap(
+            z=grid.values, x=grid.columns, y=grid.index,
+            zmin=0, zmax=1,
+            colorscale=[[0, 'red'], [0.5, 'red'], [0.5, 'blue'], [1, 'blue']],
+            colorbar=dict(tickvals=[0.25, 0.75], ticktext=['Unacceptable', 'Acceptable']),
+            hovertemplate=f'{x}: %{{x}}<br>{y}: %{{y}}<br>Acceptable: %{{z}}<extra></extra>'
+        )
+    else:
+        heatmap = go.Heatmap(
+            z=grid.values, x=grid.columns, y=grid.index,
+            colorscale='Viridis',
+            colorbar=dict(title=RESULT_LABELS[value]),
+            hovertemplate=f'{x}: %{{x}}<br>{y}: %{{y}}<br>{RESULT_LABELS[value]}: %{{z:.3f}}<extra></extra>'
+        )
+
+    fig = go.Figure(heatmap)
+    fig.update_xaxes(title=x.replace('_', ' ').title(), type='category' if grid.columns.dtype == object else None)
+    fig.update_yaxes(title=y.replace('_', ' ').title(), type='category' if grid.index.dtype == object else None)
+    return fig
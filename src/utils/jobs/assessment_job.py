@@ -0,0 +1,33 @@
+from typing import Callable
+
+import pandas as pd
+
+from src.utils.analysis.assessment import assess_defects, serialise_assessment
+
+# Number of defects assessed between progress reports, each chunk is published as a partial result
+CHUNK_SIZE = 10_000
+
+
+def run_assessment_job(inputs: dict, report: Callable[..., None]) -> str:
+    """
+    Assesses the defects of an assessment job in chunks, reporting each chunk as a partial result
+    Args:
+        inputs: {'configs': model configs, 'defects': defect records or columns, 'orient': result orientation,
+                 'quick': only check the acceptance of each defect, 'audit': append the intermediate values}
+        report: Called with the percentage complete, a description of the stage and optionally a partial result
+
+    Returns:
+        result: Serialised result of the complete assessment
+    """
+    defects = pd.DataFrame(inputs['defects'])
+    orient = inputs.get('orient', 'records')
+    chunks = []
+    for start in range(0, len(defects), CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, len(defects))
+        report(int(95 * start / len(defects)), f'Assessing defects {start + 1} to {stop}')
+        chunk = assess_defects(inputs['configs'], defects.iloc[start:stop], quick=inputs.get('quick', False),
+                               audit=inputs.get('audit', False))
+        chunks.append(chunk)
+        report(int(95 * stop / len(defects)), f'Assessed {stop} of {len(defects)} defects',
+               partial=f'{{"start": {start}, "results": {chunk.to_json(orient="records")}}}')
+    return serialise_assessment(pd.concat(chunks), orient)
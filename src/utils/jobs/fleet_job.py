@@ -0,0 +1,285 @@
+"""
+Fleet assessment, assessing the defects of many pipelines in one job.
+
+The job splits the defects of each pipeline of its manifest into chunks and runs one task per chunk on a task
+executor, keeping at most max_concurrency tasks in flight. Each task is keyed by the hash of its inputs, which the
+orchestrator writes to the job store before submitting the key. The task writes its summary back under the same key,
+so a retried or resubmitted task returns the stored summary instead of assessing its chunk again. Chunk summaries are
+merged into a summary per pipeline: the governing defect, the minimum pressure resistance, the number of failing
+defects and the earliest time to failure.
+"""
+import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from src.utils.analysis.assessment import assess_defects
+from src.utils.caching.limit_curve_cache import generate_cache_key
+from src.utils.jobs.job_store import JobStore, job_store
+
+# Bump when the summary of a chunk changes so that previously stored summaries are no longer used
+FLEET_TASK_VERSION = 2
+# Number of defects of a pipeline assessed by each task
+FLEET_CHUNK_SIZE = 50_000
+# Number of times a failed task is resubmitted before the job fails
+TASK_RETRIES = 2
+
+
+def create_fleet_tasks(manifest: dict, chunk_size: int = None) -> list[dict]:
+    """
+    Splits the pipelines of a manifest into tasks
+    Args:
+        manifest: {'pipelines': [{'id', 'configs': model configs, 'defects': defect records or columns,
+                   'corrosion_rate': depth growth in mm/year (optional)}]}
+        chunk_size: Maximum number of defects per task
+
+    Returns:
+        tasks: [{'key', 'inputs'}] with inputs {'pipeline', 'configs', 'defects' as columns, 'offset',
+               'corrosion_rate'}
+    """
+    chunk_size = chunk_size or FLEET_CHUNK_SIZE
+    tasks = []
+    for pipeline in manifest['pipelines']:
+        defects = pd.DataFrame(pipeline['defects'])
+        for start in range(0, len(defects), chunk_size):
+            inputs = {
+                'pipeline': pipeline['id'],
+                'configs': pipeline['configs'],
+                'defects': defects.iloc[start:start + chunk_size].to_dict(orient='list'),
+                'offset': start,
+                'corrosion_rate': pipeline.get('corrosion_rate')
+            }
+            key = generate_cache_key({'inputs': json.dumps(inputs, sort_keys=True, default=str)},
+                                     namespace='fleet-task', version=FLEET_TASK_VERSION)
+            tasks.append({'key': key, 'inputs': inputs})
+    return tasks
+
+
+def _json_value(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _minimum(*values: float | None) -> float | None:
+    values = [value for value in values if value is not None]
+    return min(values) if values else None
+
+
+def _governing_rank(defect: dict) -> tuple:
+    # Unacceptable defects govern, those outside the range of the assessment first, then by ERF
+    return not defect['acceptable'], defect['erf'] is None, defect['erf'] or 0.0
+
+
+def summarise_chunk(inputs: dict) -> dict:
+    """
+    Assesses the defects of a task
+    Args:
+        inputs: Task inputs, see create_fleet_tasks
+
+    Returns:
+        summary: {'pipeline', 'count', 'failing', 'minimum_pressure_resistance', 'governing_defect',
+                  'earliest_failure'}. The governing defect is an unacceptable defect if there is one, preferring
+                  defects outside the range of the assessment, which have no pressure resistance or ERF, and then
+                  the highest ERF. The earliest failure is the defect reaching its allowable depth first at the
+                  corrosion rate, None without a corrosion rate.
+    """
+    defects = pd.DataFrame(inputs['defects'])
+    defects.index = defects.index + inputs['offset']
+    ids = defects['id'] if 'id' in defects.columns else pd.Series(defects.index, index=defects.index)
+    result = assess_defects(inputs['configs'], defects)
+
+    unacceptable = ~result['acceptable']
+    candidates = result[unacceptable] if unacceptable.any() else result
+    # Defects deeper than the equation of Section 3.7.3 allows have NaN pressure resistances and ERFs
+    out_of_range = candidates['erf'].isna()
+    governing = candidates.index[out_of_range][0] if out_of_range.any() else candidates['erf'].idxmax()
+    minimum_pressure_resistance = result['pressure_resistance'].min()
+    summary = {
+        'pipeline': inputs['pipeline'],
+        'count': len(result),
+        'failing': int(unacceptable.sum()),
+        'minimum_pressure_resistance': None if np.isnan(minimum_pressure_resistance)
+        else float(minimum_pressure_resistance),
+        'governing_defect': {
+            'id': _json_value(ids[governing]),
+            'erf': None if np.isnan(result['erf'][governing]) else float(result['erf'][governing]),
+            'pressure_resistance': None if np.isnan(result['pressure_resistance'][governing])
+            else float(result['pressure_resistance'][governing]),
+            'acceptable': bool(result['acceptable'][governing])
+        },
+        'earliest_failure': None
+    }
+
+    corrosion_rate = inputs.get('corrosion_rate')
+    if corrosion_rate:
+        wall_thickness = inputs['configs']['pipe']['wall_thickness']
+        if 'relative_depth' in defects.columns:
+            relative_depth = defects['relative_depth'].astype(float)
+        else:
+            relative_depth = defects['depth'].astype(float) / wall_thickness
+        years = ((result['allowable_relative_depth'] - relative_depth) / (corrosion_rate / wall_thickness)).clip(0)
+        years[~result['acceptable']] = 0.0
+        if years.notna().any():
+            earliest = years.idxmin()
+            summary['earliest_failure'] = {'id': _json_value(ids[earliest]), 'years': float(years[earliest])}
+    return summary
+
+
+def run_fleet_task(key: str, store: JobStore) -> dict:
+    """
+    Runs a task whose inputs are in the store, returning its stored summary if it already ran
+    """
+    summary = store.get_task_result(key)
+    if summary is None:
+        inputs = store.get_task_inputs(key)
+        if inputs is None:
+            raise KeyError(f"Task {key} does not exist")
+        summary = summarise_chunk(inputs)
+        store.set_task_result(key, summary)
+    return summary
+
+
+def merge_summaries(pipeline_ids: list, summaries: list[dict]) -> dict:
+    """
+    Merges chunk summaries into a summary per pipeline and for the fleet
+    Args:
+        pipeline_ids: Pipelines in the order of the manifest
+        summaries: Summaries of every chunk
+
+    Returns:
+        result: {'count', 'failing', 'minimum_pressure_resistance', 'pipelines': [pipeline summary]}
+    """
+    pipelines = {pipeline_id: None for pipeline_id in pipeline_ids}
+    for summary in summaries:
+        merged = pipelines[summary['pipeline']]
+        if merged is None:
+            pipelines[summary['pipeline']] = dict(summary)
+            continue
+        merged['count'] += summary['count']
+        merged['failing'] += summary['failing']
+        merged['minimum_pressure_resistance'] = _minimum(merged['minimum_pressure_resistance'],
+                                                         summary['minimum_pressure_resistance'])
+        if _governing_rank(summary['governing_defect']) > _governing_rank(merged['governing_defect']):
+            merged['governing_defect'] = summary['governing_defect']
+        earliest = summary['earliest_failure']
+        if earliest and (merged['earliest_failure'] is None or earliest['years'] < merged['earliest_failure']['years']):
+            merged['earliest_failure'] = earliest
+
+    pipelines = list(pipelines.values())
+    return {
+        'count': sum(pipeline['count'] for pipeline in pipelines),
+        'failing': sum(pipeline['failing'] for pipeline in pipelines),
+        'minimum_pressure_resistance': _minimum(*(pipeline['minimum_pressure_resistance'] for pipeline in pipelines)),
+        'pipelines': pipelines
+    }
+
+
+class LocalTaskExecutor:
+    """
+    Runs fleet tasks in a pool of threads of the process running the job
+    """
+    def __init__(self, store: JobStore, max_workers: int = 4):
+        self.store = store
+        self.max_workers = max_workers
+        self._pool = None
+
+    def submit(self, key: str) -> Callable[[], dict]:
+        """
+        Returns:
+            wait: Waits for the task and returns its summary, raising its error if it failed
+        """
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._pool.submit(run_fleet_task, key, self.store).result
+
+
+class CeleryTaskExecutor:
+    """
+    Runs fleet tasks on the workers of a Celery app. Only the task key is sent through the broker.
+    The job waits for its tasks, so the workers must be able to run fleet tasks while fleet jobs are running, e.g. by
+    running more than one worker process.
+    """
+    def __init__(self, celery_app, store: JobStore):
+        def run_fleet_task_task(key: str) -> dict:
+            return run_fleet_task(key, store)
+
+        self.store = store
+        self.task = celery_app.task(name='corrosion_analyser.run_fleet_task')(run_fleet_task_task)
+
+    def submit(self, key: str) -> Callable[[], dict]:
+        result = self.task.delay(key)
+        # The job is itself a task when run by Celery, waiting on another task is intended here
+        return lambda: result.get(disable_sync_subtasks=False)
+
+
+class FleetOrchestrator:
+    """
+    Fans the tasks of a fleet job out to an executor with bounded concurrency and merges their summaries.
+    The executor is assigned by the app, a local thread pool is used until then.
+    """
+    def __init__(self, store: JobStore, executor=None, max_concurrency: int = 4):
+        self.store = store
+        self.executor = executor or LocalTaskExecutor(store)
+        self.max_concurrency = max_concurrency
+
+    def run(self, manifest: dict, report: Callable[..., None]) -> dict:
+        """
+        Args:
+            manifest: Fleet manifest, see create_fleet_tasks
+            report: Called with the percentage complete and a description of the stage
+
+        Returns:
+            result: Merged summaries, see merge_summaries
+        """
+        tasks = create_fleet_tasks(manifest)
+        summaries = {}
+        pending = deque()
+        for task in tasks:
+            # Tasks that already ran, e.g. for an earlier submission of the same pipelines, are not run again
+            summary = self.store.get_task_result(task['key'])
+            if summary is not None:
+                summaries[task['key']] = summary
+            else:
+                self.store.set_task_inputs(task['key'], task['inputs'])
+                pending.append((task, 0))
+        logger.info(f"Fleet job | {len(manifest['pipelines'])} pipelines | {len(tasks)} tasks | "
+                    f"{len(summaries)} already assessed")
+
+        in_flight = deque()
+        while pending or in_flight:
+            while pending and len(in_flight) < self.max_concurrency:
+                task, attempt = pending.popleft()
+                in_flight.append((task, attempt, self.executor.submit(task['key'])))
+            task, attempt, wait = in_flight.popleft()
+            try:
+                summaries[task['key']] = wait()
+            except Exception as e:
+                if attempt >= TASK_RETRIES:
+                    raise
+                logger.warning(f"Fleet task {task['key']} failed, retrying: {e}")
+                pending.appendleft((task, attempt + 1))
+                continue
+            report(int(95 * len(summaries) / len(tasks)), f'Assessed {len(summaries)} of {len(tasks)} tasks')
+
+        return merge_summaries([pipeline['id'] for pipeline in manifest['pipelines']],
+                               [summaries[task['key']] for task in tasks])
+
+
+# Process-wide orchestrator used by fleet jobs
+fleet_orchestrator = FleetOrchestrator(job_store)
+
+
+def run_fleet_job(inputs: dict, report: Callable[..., None]) -> str:
+    """
+    Assesses the pipelines of a fleet manifest
+    Args:
+        inputs: Fleet manifest, see create_fleet_tasks
+        report: Called with the percentage complete and a description of the stage
+
+    Returns:
+        result: Serialised fleet summary
+    """
+    return json.dumps(fleet_orchestrator.run(inputs, report))
@@ -0,0 +1,116 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from loguru import logger
+
+from src.utils.jobs.assessment_job import run_assessment_job
+from src.utils.jobs.fleet_job import run_fleet_job
+from src.utils.jobs.job_store import COMPLETE, FAILED, RUNNING, JobStore, job_store
+from src.utils.monitoring.stage_metrics import stage_metrics
+
+# Functions running each kind of job, called with the job's inputs and a progress callback and returning the
+# serialised result
+JOB_HANDLERS = {
+    'assessment': run_assessment_job,
+    'fleet': run_fleet_job
+}
+
+
+def run_job(job_id: str, store: JobStore):
+    """
+    Runs a queued job, recording its progress, partial results and result or error in the store
+    Args:
+        job_id: Job id
+        store: Store holding the job
+    """
+    record = store.get(job_id)
+    if record is None:
+        logger.error(f"Job {job_id} does not exist")
+        return
+    start_time = time.time()
+    store.update(job_id, status=RUNNING, stage='Starting', started=start_time)
+
+    def report(progress: int, stage: str, partial: str = None):
+        if partial is not None:
+            store.add_partial(job_id, partial)
+        store.update(job_id, progress=progress, stage=stage)
+
+    try:
+        result = JOB_HANDLERS[record['kind']](store.get_inputs(job_id), report)
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        store.update(job_id, status=FAILED, stage='Failed', error=str(e), finished=time.time())
+        return
+    finally:
+        # Jobs run in worker processes, add the stages they timed to the shared metrics
+        stage_metrics.flush()
+
+    store.set_result(job_id, result)
+    store.update(job_id, status=COMPLETE, progress=100, stage='Complete', finished=time.time())
+    logger.info(f"Job {job_id} completed | {record['kind']} | Processing time: {time.time() - start_time:.2f}s")
+
+
+class LocalJobExecutor:
+    """
+    Runs jobs in a pool of local processes, for deployments without Celery.
+    The store is sent to the workers with the job id, so its backend must be picklable, e.g. diskcache.Cache.
+    """
+    def __init__(self, max_workers: int = 2):
+        self.max_workers = max_workers
+        self._pool = None
+
+    def submit(self, job_id: str, store: JobStore):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._pool.submit(run_job, job_id, store)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class CeleryJobExecutor:
+    """
+    Runs jobs as tasks of a Celery app. Only the job id is sent through the broker, the workers read the inputs from
+    and write the results to their own store, configured as the server's.
+    """
+    def __init__(self, celery_app, store: JobStore):
+        def run_job_task(job_id: str):
+            run_job(job_id, store)
+
+        self.task = celery_app.task(name='corrosion_analyser.run_job')(run_job_task)
+
+    def submit(self, job_id: str, store: JobStore):
+        self.task.delay(job_id)
+
+
+class JobQueue:
+    """
+    Accepts jobs into a store and dispatches them to an executor.
+    The executor is assigned by the app, a local process pool is used until then.
+    """
+    def __init__(self, store: JobStore, executor=None):
+        self.store = store
+        self.executor = executor or LocalJobExecutor()
+
+    def submit(self, kind: str, inputs: dict) -> dict:
+        """
+        Submits a job
+        Args:
+            kind: Type of job, one of JOB_HANDLERS
+            inputs: JSON serialisable inputs of the job
+
+        Returns:
+            record: The job's record
+        """
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job type: {kind}")
+        record = self.store.create(kind, inputs)
+        self.executor.submit(record['id'], self.store)
+        logger.info(f"Job {record['id']} submitted | {kind}")
+        return record
+
+
+# Process-wide queue used by the job API
+job_queue = JobQueue(job_store)
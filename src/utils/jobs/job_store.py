@@ -0,0 +1,126 @@
+import inspect
+import json
+import time
+import uuid
+
+# Job statuses, jobs end either complete or failed
+QUEUED, RUNNING, COMPLETE, FAILED = 'queued', 'running', 'complete', 'failed'
+FINAL_STATUSES = (COMPLETE, FAILED)
+
+
+class JobStore:
+    """
+    Persistent store of asynchronous jobs holding their status, inputs, partial results and result.
+    The backend can be any client exposing get/set/delete, e.g. diskcache.Cache or redis.Redis, shared by the server
+    accepting the jobs and the workers running them. Values are stored as JSON or UTF-8 encoded bytes and expire after
+    the timeout. A job's record is only written by the server when it is created and by its worker afterwards.
+    """
+    def __init__(self, backend=None, timeout: int = 86400):
+        self.backend = backend
+        self.timeout = timeout
+
+    def _set(self, key: str, value: bytes):
+        # diskcache names the expiry of a value 'expire', redis 'ex'
+        if 'expire' in inspect.signature(self.backend.set).parameters:
+            self.backend.set(key, value, expire=self.timeout)
+        else:
+            self.backend.set(key, value, ex=self.timeout)
+
+    def _get_json(self, key: str):
+        data = self.backend.get(key)
+        return json.loads(data) if data is not None else None
+
+    def create(self, kind: str, inputs: dict) -> dict:
+        """
+        Creates a queued job
+        Args:
+            kind: Type of job, selecting the function running it
+            inputs: JSON serialisable inputs of the job
+
+        Returns:
+            record: {'id', 'kind', 'status', 'progress', 'stage', 'partials', 'error', 'submitted', 'started',
+                     'finished'}
+        """
+        record = {
+            'id': uuid.uuid4().hex,
+            'kind': kind,
+            'status': QUEUED,
+            'progress': 0,
+            'stage': 'Queued',
+            'partials': 0,
+            'error': None,
+            'submitted': time.time(),
+            'started': None,
+            'finished': None
+        }
+        self._set(f"job:{record['id']}:inputs", json.dumps(inputs).encode())
+        self._set(f"job:{record['id']}", json.dumps(record).encode())
+        return record
+
+    def get(self, job_id: str) -> dict | None:
+        return self._get_json(f'job:{job_id}')
+
+    def update(self, job_id: str, **fields) -> dict:
+        record = self.get(job_id)
+        if record is None:
+            raise KeyError(f"Job {job_id} does not exist")
+        record |= fields
+        self._set(f'job:{job_id}', json.dumps(record).encode())
+        return record
+
+    def get_inputs(self, job_id: str) -> dict | None:
+        return self._get_json(f'job:{job_id}:inputs')
+
+    def add_partial(self, job_id: str, partial: str) -> int:
+        """
+        Stores a partial result of a running job
+        Args:
+            job_id: Job id
+            partial: Serialised JSON of the partial result
+
+        Returns:
+            index: Index of the partial result
+        """
+        index = self.get(job_id)['partials']
+        self._set(f'job:{job_id}:partial:{index}', partial.encode())
+        self.update(job_id, partials=index + 1)
+        return index
+
+    def get_partial(self, job_id: str, index: int) -> str | None:
+        data = self.backend.get(f'job:{job_id}:partial:{index}')
+        return data.decode() if data is not None else None
+
+    def set_result(self, job_id: str, result: str):
+        self._set(f'job:{job_id}:result', result.encode())
+
+    def get_result(self, job_id: str) -> str | None:
+        data = self.backend.get(f'job:{job_id}:result')
+        return data.decode() if data is not None else None
+
+    def set_task_inputs(self, key: str, inputs: dict):
+        """
+        Stores the inputs of a task of a job, keyed by their hash so that identical tasks share their inputs
+        """
+        self._set(f'task:{key}:inputs', json.dumps(inputs).encode())
+
+    def get_task_inputs(self, key: str) -> dict | None:
+        return self._get_json(f'task:{key}:inputs')
+
+    def set_task_result(self, key: str, result: dict):
+        self._set(f'task:{key}:result', json.dumps(result).encode())
+
+    def get_task_result(self, key: str) -> dict | None:
+        return self._get_json(f'task:{key}:result')
+
+    def delete(self, job_id: str):
+        record = self.get(job_id)
+        if record is None:
+            return
+        keys = [f'job:{job_id}', f'job:{job_id}:inputs', f'job:{job_id}:result',
+                *(f'job:{job_id}:partial:{index}' for index in range(record['partials']))]
+        for key in keys:
+            self.backend.delete(key)
+
+
+# Process-wide store used by the job API and its workers
+job_store = JobStore()
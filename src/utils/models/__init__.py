@@ -1,6 +1,7 @@
 from .defect import Defect
 from .environment import Environment
 from .material import MaterialProperties
-from .pipe import Pipe, PipeDimensions, Loading
+from .pipe import Pipe, PipeDimensions, Loading, QuickCheckResult
 from .parameter import Parameter
+from .assessment import assess, PipeSpec, DefectSpec, EnvironmentSpec, LoadingSpec, AssessedDefect, AssessmentResult
 # from .factors import Factors
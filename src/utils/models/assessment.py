@@ -0,0 +1,507 @@
+"""
+Side effect free assessment of a pipe and its defects.
+
+assess takes immutable specifications of a pipe and its measured defects and returns an immutable AssessmentResult.
+Every intermediate model is created within the call and nothing passed in is modified, so specifications can be shared
+and assessed concurrently from threads or worker processes. The only state shared between calls is the process-wide
+limit curve cache, which is thread safe. Pipe exposes the same calculations behind its incremental, mutable interface.
+"""
+import copy
+from dataclasses import dataclass, asdict, fields
+from typing import Sequence
+
+import numpy as np
+from loguru import logger
+
+from src.utils.analysis.limit_curve_library import get_limit_curve_library
+from src.utils.caching.limit_curve_cache import limit_curve_cache
+from src.utils.calculations.defect_calculations import (calculate_max_defect_depth_longitudinal_with_stress,
+                                                        calculate_maximum_defect_length, verify_interaction)
+from src.utils.calculations.pressure_calculations import (calculate_pressure_resistance_longitudinal_defect,
+                                                          calculate_pressure_resistance_longitudinal_defect_w_compressive_load)
+from src.utils.calculations.sampling_calculations import sample_curve_adaptively
+from src.utils.monitoring.calculation_log import current_trace, debug_enabled
+from src.utils.monitoring.stage_metrics import stage_metrics
+from .defect import Defect
+from .environment import Environment
+from .factors import Factors
+from .material import MaterialProperties
+
+
+@dataclass(frozen=True)
+class EnvironmentSpec:
+    seawater_density: float         # kg/m³
+    containment_density: float      # kg/m³
+    elevation_reference: float      # m
+    elevation: float                # m
+
+
+@dataclass(frozen=True)
+class LoadingSpec:
+    axial_load: float = None        # MPa
+    bending_load: float = None      # MPa
+    combined_stress: float = None   # MPa, compressive stresses are negative
+
+    @property
+    def loading_stress(self) -> float | None:
+        if (self.axial_load or self.bending_load) and not self.combined_stress:
+            return (self.axial_load or 0) + (self.bending_load or 0)
+        return self.combined_stress or None
+
+
+@dataclass(frozen=True)
+class PipeSpec:
+    """
+    Pipe, material, design and inspection inputs with the environment and loading, dimensions in mm
+    """
+    outside_diameter: float
+    wall_thickness: float
+    design_pressure: float                      # bar
+    design_temperature: float                   # °C
+    incidental_to_design_pressure_ratio: float
+    safety_class: str
+    measurement_method: str                     # 'relative' or 'absolute'
+    accuracy: float
+    confidence_level: float
+    environment: EnvironmentSpec
+    loading: LoadingSpec = None
+    smts: float = None                          # MPa
+    smys: float = None                          # MPa
+    alpha_u: float = 0.96
+
+    @classmethod
+    def from_configs(cls, configs: dict) -> 'PipeSpec':
+        """
+        Args:
+            configs: {'pipe', 'environment', 'loading'} model configs, as used by Pipe, Environment and add_loading
+        """
+        loading = configs.get('loading')
+        return cls(**configs['pipe'], environment=EnvironmentSpec(**configs['environment']),
+                   loading=LoadingSpec(**loading) if loading else None)
+
+
+@dataclass(frozen=True)
+class DefectSpec:
+    """
+    Measured defect, dimensions in mm
+    """
+    length: float
+    depth: float = None
+    relative_depth: float = None
+    width: float = None
+    measurement_timestamp: float = None         # Unix timestamp of the inspection
+    position: float = 0                         # Position of the defect along the pipeline
+
+    def __post_init__(self):
+        if not self.length:
+            raise ValueError('Defect length must be provided')
+        if not (self.depth or self.relative_depth):
+            raise ValueError('Either depth or relative depth must be provided')
+
+
+@dataclass(frozen=True)
+class AssessedDefect:
+    length: float
+    width: float
+    depth: float
+    relative_depth: float
+    relative_depth_with_uncertainty: float      # (d/t)*
+    length_correction_factor: float             # Q
+    pressure_resistance: float                  # MPa
+    factors: Factors
+    measurement_timestamp: float = None
+    position: float = 0
+
+
+@dataclass(frozen=True)
+class AssessmentResult:
+    """
+    Outcome of an assessment, pressures in MPa.
+    defects holds the measured defects in order, followed by the combined defect if they interact.
+    limits holds a read-only (2, n) array of [defect_length, defect_relative_depth] per limit curve, empty if the limit
+    curves were not calculated.
+    """
+    factors: Factors
+    external_pressure: float
+    incidental_pressure: float
+    effective_pressure: float
+    pressure_resistance: float
+    defects: tuple[AssessedDefect, ...]
+    limits: tuple[np.ndarray, ...] = ()
+    remaining_life: float = None                # days
+
+    @property
+    def acceptable(self) -> bool:
+        return bool(self.effective_pressure < self.pressure_resistance)
+
+
+def create_factors(spec: PipeSpec) -> Factors:
+    return Factors(
+        safety_class=spec.safety_class,
+        inspection_method=spec.measurement_method,
+        measurement_accuracy=spec.accuracy,
+        confidence_level=spec.confidence_level,
+        wall_thickness=spec.wall_thickness
+    )
+
+
+def prepare_environment(environment: Environment, design_limits) -> Environment:
+    """
+    Returns a copy of the environment with its external and incidental pressures calculated
+    Args:
+        environment: Environment as provided
+        design_limits: Any object with design_pressure and incidental_to_design_pressure_ratio
+    """
+    environment = copy.copy(environment)
+    environment.calculate_external_pressure()
+    environment.calculate_incidental_pressure(design_limits=design_limits)
+    return environment
+
+
+@stage_metrics.timed('prepare_defects')
+def prepare_defects(defects: Sequence[Defect], factors: Factors, outside_diameter: float,
+                    wall_thickness: float) -> list[Defect]:
+    """
+    Completes the dimensions, (d/t)* and length correction factor of copies of the measured defects and adds the
+    combined defect if the defects are interacting. The measured defects are not modified.
+    Args:
+        defects: Measured defects, those without factors of their own use the given factors
+        factors: Factors of the pipe
+        outside_diameter: Nominal outside diameter (mm)
+        wall_thickness: Nominal wall thickness (mm)
+    """
+    prepared = []
+    for measured in defects:
+        defect = copy.copy(measured)
+        if not defect.factors:
+            defect.factors = factors
+        defect.complete_dimensions()
+        defect.calculate_d_t_adjusted()
+        defect.generate_length_correction_factor(d_nominal=outside_diameter, t=wall_thickness)
+        prepared.append(defect)
+
+    # Interacting Defects
+    if any(defect.position for defect in prepared):
+        logger.info('Defect separation detected, checking for interaction')
+        if verify_interaction(defects=prepared, pipe_diameter=outside_diameter, pipe_thickness=wall_thickness):
+            logger.info('Defects are interacting, adding combined defect')
+            combined_defect = Defect(defects=prepared.copy())
+            combined_defect.complete_dimensions()
+            combined_defect.calculate_d_t_adjusted()
+            combined_defect.generate_length_correction_factor(d_nominal=outside_diameter, t=wall_thickness)
+            prepared.append(combined_defect)
+    return prepared
+
+
+@stage_metrics.timed('pressure_resistance')
+def calculate_defect_pressure_resistance(defect, outside_diameter: float, wall_thickness: float, f_u: float,
+                                         loading_stress: float = None, usage_factor: float = None) -> float:
+    """
+    Calculates the pressure resistance of a prepared defect, with superimposed longitudinal stress if given
+    Args:
+        defect: Prepared defect
+        outside_diameter: Nominal outside diameter (mm)
+        wall_thickness: Nominal wall thickness (mm)
+        f_u: Tensile strength of the material (MPa)
+        loading_stress: Longitudinal stress (MPa)
+        usage_factor: Usage factor for the longitudinal stress, xi
+
+    Returns:
+        p_corr: Pressure resistance (MPa)
+    """
+    if not loading_stress:
+        p_corr = calculate_pressure_resistance_longitudinal_defect(
+            gamma_m=defect.factors.gamma_m,
+            gamma_d=defect.factors.gamma_d,
+            t_nominal=wall_thickness,
+            defect_length=defect.length,
+            d_nominal=outside_diameter,
+            relative_defect_depth_with_uncertainty=defect.relative_depth_with_uncertainty,
+            f_u=f_u,
+            q=defect.length_correction_factor
+        )
+    else:
+        logger.debug('Loading detected')
+        p_corr = calculate_pressure_resistance_longitudinal_defect_w_compressive_load(
+            gamma_m=defect.factors.gamma_m,
+            gamma_d=defect.factors.gamma_d,
+            t_nominal=wall_thickness,
+            d_nominal=outside_diameter,
+            defect_length=defect.length,
+            defect_relative_depth_measured=defect.relative_depth,
+            relative_defect_depth_with_uncertainty=defect.relative_depth_with_uncertainty,
+            defect_width=defect.width,
+            f_u=f_u,
+            sigma_l=loading_stress,
+            phi=usage_factor,
+            q=defect.length_correction_factor
+        )
+    trace = current_trace()
+    if trace is not None:
+        trace.record('pressure_resistance', defect.length, defect.relative_depth_with_uncertainty,
+                     defect.length_correction_factor, p_corr)
+    logger.debug('Pressure Resistance: {}', p_corr)
+    return p_corr
+
+
+@stage_metrics.timed('limit_curve')
+def calculate_limit_curve(factors: Factors, outside_diameter: float, wall_thickness: float, f_u: float,
+                          incidental_pressure: float, external_pressure: float, tolerance: float) -> np.ndarray:
+    """
+    Calculate the maximum defect length at each relative depth with internal pressure loading only.
+    Curves are interpolated from the precomputed limit curve library when its error is within the tolerance,
+    otherwise relative depths are sampled adaptively, refining where the curve bends.
+    Returns:
+        limits: Read-only array of [defect_length, defect_relative_depth] sorted by defect length
+    """
+    # Checked once per curve rather than at each of its points
+    debug = debug_enabled()
+    trace = current_trace()
+
+    def limit(relative_depth):
+        if not relative_depth:  # Depth must be greater than 0
+            return None
+        length = calculate_maximum_defect_length(
+            d=outside_diameter,
+            t=wall_thickness,
+            gamma_d=factors.gamma_d,
+            gamma_m=factors.gamma_m,
+            f_u=f_u,
+            p_li=incidental_pressure,
+            p_le=external_pressure,
+            d_t_meas=relative_depth,
+            epsilon_d=factors.epsilon_d,
+            st_dev=factors.standard_deviation
+        )
+        if trace is not None:
+            trace.record('maximum_defect_length', relative_depth, length)
+        if debug:
+            logger.debug('Maximum length for relative depth {}: {}', relative_depth, length)
+        return (length, relative_depth) if length else None
+
+    def compute():
+        # Traced curves are always calculated exactly so that every point is recorded
+        if trace is None:
+            limits = get_limit_curve_library().sample(
+                d=outside_diameter, t=wall_thickness, f_u=f_u, gamma_m=factors.gamma_m, gamma_d=factors.gamma_d,
+                epsilon_d=factors.epsilon_d, st_dev=factors.standard_deviation, p_li=incidental_pressure,
+                p_le=external_pressure, tolerance=tolerance)
+            if limits is not None and limits.size:
+                return limits
+        limits = sample_curve_adaptively(limit, start=0, stop=1, tolerance=tolerance)
+        limits = np.append(limits, [[0.0], [limits[1, -1]]], axis=1)
+        return limits[:, np.argsort(limits[0], kind='stable')]  # Sort by defect length
+
+    inputs = {
+        'd': outside_diameter,
+        't': wall_thickness,
+        'f_u': f_u,
+        'gamma_d': factors.gamma_d,
+        'gamma_m': factors.gamma_m,
+        'epsilon_d': factors.epsilon_d,
+        'st_dev': factors.standard_deviation,
+        'p_li': incidental_pressure,
+        'p_le': external_pressure,
+        'tolerance': tolerance
+    }
+    return limit_curve_cache.get_or_compute(inputs, compute)
+
+
+@stage_metrics.timed('limit_curve')
+def calculate_limit_curve_with_loading(factors: Factors, outside_diameter: float, wall_thickness: float, f_u: float,
+                                       defect_width: float, loading_stress: float, effective_pressure: float,
+                                       tolerance: float) -> np.ndarray:
+    """
+    Calculate the maximum relative defect depth at each defect length with superimposed longitudinal stress.
+    Defect lengths are sampled adaptively, refining where the curve bends.
+    Returns:
+        limits: Read-only array of [defect_length, defect_relative_depth] sorted by defect length
+    """
+    # Checked once per curve rather than at each of its points
+    debug = debug_enabled()
+    trace = current_trace()
+
+    def limit(defect_length):
+        defect_relative_depth = calculate_max_defect_depth_longitudinal_with_stress(
+            gamma_m=factors.gamma_m,
+            gamma_d=factors.gamma_d,
+            pipe_thickness=wall_thickness,
+            defect_length=defect_length,
+            defect_width=defect_width,
+            pipe_diameter=outside_diameter,
+            f_u=f_u,
+            p_corr_comp=effective_pressure,
+            xi=factors.xi,
+            sigma_l=loading_stress,
+            epsilon_d=factors.epsilon_d,
+            st_dev=factors.standard_deviation
+        )
+        if trace is not None:
+            trace.record('maximum_defect_depth', defect_length, defect_relative_depth)
+        if debug:
+            logger.debug('Max depth for defect length {} = {}', defect_length, defect_relative_depth)
+        return defect_length, max(float(defect_relative_depth), 0.0)
+
+    inputs = {
+        'd': outside_diameter,
+        't': wall_thickness,
+        'f_u': f_u,
+        'gamma_d': factors.gamma_d,
+        'gamma_m': factors.gamma_m,
+        'epsilon_d': factors.epsilon_d,
+        'st_dev': factors.standard_deviation,
+        'xi': factors.xi,
+        'defect_width': defect_width,
+        'sigma_l': loading_stress,
+        'p_corr_comp': effective_pressure,
+        'tolerance': tolerance
+    }
+    return limit_curve_cache.get_or_compute(
+        inputs, lambda: sample_curve_adaptively(limit, start=0, stop=1000, tolerance=tolerance))
+
+
+def calculate_corrosion_rate(defects: Sequence) -> tuple[float, float]:
+    """
+    Calculate the corrosion rate from two measurements of a defect
+    Args:
+        defects: Prepared defects, the first two being the earlier and later measurement
+    Returns:
+        corrosion_rate_depth: Depth corrosion rate per day
+        corrosion_rate_length: Length corrosion rate per day
+    """
+    if len(defects) < 2:
+        raise ValueError("Multiple defects required to calculate corrosion rate")
+
+    d_0, l_0, ts_0 = defects[0].relative_depth, defects[0].length, defects[0].measurement_timestamp
+    d_1, l_1, ts_1 = defects[1].relative_depth, defects[1].length, defects[1].measurement_timestamp
+
+    d_ts = ts_1 - ts_0
+
+    if d_ts == 0:
+        raise ValueError("Timestamps must be different to calculate corrosion rate")
+
+    r_corr_depth = 86400 * (d_1 - d_0) / d_ts
+    r_corr_length = 86400 * (l_1 - l_0) / d_ts
+
+    return r_corr_depth, r_corr_length
+
+
+@stage_metrics.timed('remaining_life')
+def estimate_remaining_life(defects: Sequence, pressure_resistance: float, effective_pressure: float,
+                            limits: np.ndarray) -> float:
+    """
+    Estimate the remaining life of the pipe based on the current defect and loading based on 2.9.2
+
+    d_t: defect depth after time T
+    l_t: defect length after time T
+    T: time
+    r_corr: corrosion rate
+    r_corr_length: corrosion rate for length
+    d_0: initial defect depth
+    l_0: initial defect length
+    Args:
+        defects: Prepared defects, the first two being the earlier and later measurement
+        pressure_resistance: Lowest pressure resistance of the defects (MPa)
+        effective_pressure: Effective pressure (MPa)
+        limits: Limit curve of the first defect as [defect_length, defect_relative_depth]
+    Returns:
+        remaining_life: Remaining life in days, 0 if the pipe has already failed
+    """
+    if pressure_resistance < effective_pressure:
+        logger.info('Pipe has already failed, skipping remaining life calculation')
+        return 0
+
+    d_0 = defects[1].relative_depth
+    l_0 = defects[1].length
+
+    r_corr, r_corr_length = calculate_corrosion_rate(defects)
+
+    # Find the point where the defect depth and length reach the maximum allowable defect depth/length
+    d_t = d_0
+    l_t = l_0
+    failure = False
+    # Limits are sampled adaptively, so interpolate between them rather than matching sampled lengths
+    within_limits = (limits[0] > l_t) & (limits[1] > d_t)
+    limit_lengths = limits[0][within_limits]
+    limit_depths = limits[1][within_limits]
+    if not len(limit_lengths) or r_corr <= 0:
+        raise ValueError("Defect must be growing within the calculated limits to estimate remaining life")
+
+    while not failure:
+        d_t += r_corr
+        l_t += r_corr_length
+
+        if l_t > limit_lengths[-1] or d_t >= np.interp(l_t, limit_lengths, limit_depths):
+            failure = True
+
+    remaining_life = (d_t - d_0) / r_corr
+
+    return remaining_life
+
+
+def _freeze_defect(defect: Defect, pressure_resistance: float) -> AssessedDefect:
+    return AssessedDefect(**{item.name: getattr(defect, item.name) for item in fields(AssessedDefect)
+                             if item.name != 'pressure_resistance'},
+                          pressure_resistance=pressure_resistance)
+
+
+def assess(spec: PipeSpec, defects: Sequence[DefectSpec], limit_curves: bool = True,
+           tolerance: float = 0.0005) -> AssessmentResult:
+    """
+    Assesses the defects of a pipe, including their limit curves and remaining life
+    Args:
+        spec: Pipe specification
+        defects: Measured defects. Two measurements of the same defect with timestamps give its remaining life,
+                 defects with positions are checked for interaction.
+        limit_curves: Calculate the limit curves and remaining life
+        tolerance: Maximum error in relative depth when interpolating linearly between the calculated limits
+
+    Returns:
+        result: Immutable assessment result
+    """
+    if not defects:
+        raise ValueError('At least one defect is required')
+    factors = create_factors(spec)
+    material_properties = MaterialProperties(alpha_u=spec.alpha_u, temperature=spec.design_temperature,
+                                             smts=spec.smts, smys=spec.smys)
+    environment = prepare_environment(Environment(**asdict(spec.environment)), design_limits=spec)
+    effective_pressure = environment.incidental_pressure - environment.external_pressure
+    loading_stress = spec.loading.loading_stress if spec.loading else None
+
+    prepared = prepare_defects([Defect(**asdict(defect)) for defect in defects], factors,
+                               outside_diameter=spec.outside_diameter, wall_thickness=spec.wall_thickness)
+    pressure_resistances = [
+        calculate_defect_pressure_resistance(defect, spec.outside_diameter, spec.wall_thickness, material_properties.f_u,
+                                             loading_stress=loading_stress, usage_factor=factors.xi)
+        for defect in prepared
+    ]
+    pressure_resistance = min(pressure_resistances)
+
+    limits = ()
+    remaining_life = None
+    if limit_curves:
+        # The second measurement of a defect shares the limit curve of the first
+        limit_defects = [defect for index, defect in enumerate(prepared) if index != 1]
+        if not loading_stress:
+            limits = tuple(calculate_limit_curve(defect.factors, spec.outside_diameter, spec.wall_thickness,
+                                                 material_properties.f_u, environment.incidental_pressure,
+                                                 environment.external_pressure, tolerance)
+                           for defect in limit_defects)
+        else:
+            limits = tuple(calculate_limit_curve_with_loading(factors, spec.outside_diameter, spec.wall_thickness,
+                                                              material_properties.f_u, prepared[0].width,
+                                                              loading_stress, effective_pressure, tolerance)
+                           for _ in limit_defects)
+        if len(prepared) > 1 and all(defect.measurement_timestamp for defect in prepared):
+            remaining_life = estimate_remaining_life(prepared, pressure_resistance, effective_pressure, limits[0])
+
+    return AssessmentResult(
+        factors=factors,
+        external_pressure=environment.external_pressure,
+        incidental_pressure=environment.incidental_pressure,
+        effective_pressure=effective_pressure,
+        pressure_resistance=pressure_resistance,
+        defects=tuple(_freeze_defect(defect, p_corr) for defect, p_corr in zip(prepared, pressure_resistances)),
+        limits=limits,
+        remaining_life=remaining_life
+    )
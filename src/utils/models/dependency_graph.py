@@ -0,0 +1,73 @@
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+@dataclass
+class Node:
+    func: Callable[[], Any]
+    depends_on: tuple = field(default_factory=tuple)
+
+
+class DependencyGraph:
+    """
+    Lazily evaluated dependency graph.
+    Nodes are computed on first request and cached until one of their dependencies is invalidated. Dependencies may
+    be other nodes or plain input names which are never computed and only serve as invalidation targets.
+    """
+    def __init__(self):
+        self._nodes: dict[str, Node] = {}
+        self._dependents: defaultdict[str, set] = defaultdict(set)
+        self._values: dict[str, Any] = {}
+        self.evaluations = Counter()    # Number of times each node has been computed
+
+    def add_node(self, name: str, func: Callable[[], Any], depends_on: list[str] = ()):
+        """
+        Registers a node
+        Args:
+            name: Node name
+            func: Function computing the node value, called without arguments
+            depends_on: Names of the nodes or inputs the node value depends on
+        """
+        self._nodes[name] = Node(func=func, depends_on=tuple(depends_on))
+        for dependency in depends_on:
+            self._dependents[dependency].add(name)
+
+    def get(self, name: str) -> Any:
+        """
+        Returns the value of a node, computing it and any invalidated dependencies if required
+        """
+        if name not in self._values:
+            node = self._nodes[name]
+            for dependency in node.depends_on:
+                if dependency in self._nodes:
+                    self.get(dependency)
+            self._values[name] = node.func()
+            self.evaluations[name] += 1
+        return self._values[name]
+
+    def is_evaluated(self, name: str) -> bool:
+        """
+        Whether the node currently holds a valid value
+        """
+        return name in self._values
+
+    def invalidate(self, *names: str) -> set:
+        """
+        Invalidates the given nodes or inputs along with every node depending on them
+        Returns:
+            invalidated: Names of the nodes whose cached values were discarded
+        """
+        invalidated = set()
+        pending = list(names)
+        visited = set()
+        while pending:
+            name = pending.pop()
+            if name in visited:
+                continue
+            visited.add(name)
+            if name in self._values:
+                del self._values[name]
+                invalidated.add(name)
+            pending.extend(self._dependents[name])
+        return invalidated
@@ -2,10 +2,11 @@ from dataclasses import dataclass, field
 
 from loguru import logger
 
+from src.utils.monitoring.stage_metrics import stage_metrics
 from src.utils.calculations.statistical_calculations import calculate_std_dev, calculate_partial_safety_factors, calculate_usage_factors
 
 
-@dataclass
+@dataclass(frozen=True)
 class Factors:
     safety_class: str
     inspection_method: str
@@ -19,23 +20,25 @@ class Factors:
     epsilon_d: float = field(init=False)            # Factor for defining a fractile value for corrosion depth
     xi: float = field(init=False)                   # Usage factor for longitudinal stress
 
+    @stage_metrics.timed('factors')
     def __post_init__(self):
+        # Factors are immutable once created so that they can be shared between defects, threads and results
         if not self.standard_deviation:
             logger.debug("Calculating standard deviation")
-            self.standard_deviation = calculate_std_dev(
+            object.__setattr__(self, 'standard_deviation', calculate_std_dev(
                 conf=self.confidence_level,
                 acc=self.measurement_accuracy,
                 measurement_method=self.inspection_method,
                 t=self.wall_thickness
-            )
+            ))
         # self.__delattr__('wall_thickness')
 
         logger.debug("Calculating partial safety factors")
         safety_factors = calculate_partial_safety_factors(self.safety_class, self.inspection_method,
                                                           self.standard_deviation)
-        self.gamma_m = safety_factors['gamma_m']
-        self.gamma_d = safety_factors['gamma_d']
-        self.epsilon_d = safety_factors['epsilon_d']
+        object.__setattr__(self, 'gamma_m', safety_factors['gamma_m'])
+        object.__setattr__(self, 'gamma_d', safety_factors['gamma_d'])
+        object.__setattr__(self, 'epsilon_d', safety_factors['epsilon_d'])
 
         logger.debug("Calculating usage factors based off safety class")
-        self.xi = calculate_usage_factors(self.safety_class)
+        object.__setattr__(self, 'xi', calculate_usage_factors(self.safety_class))
@@ -1,22 +1,18 @@
-import math
-from dataclasses import dataclass, field
+import copy
+from dataclasses import dataclass
 
-import numpy as np
 import pandas as pd
 from loguru import logger
 
-from src.utils.calculations.defect_calculations import (calculate_max_defect_depth_longitudinal,
-                                                        calculate_max_defect_depth_longitudinal_with_stress,
-                                                        calculate_maximum_defect_length, calculate_combined_length,
-                                                        calculate_combined_depth, verify_interaction)
-from src.utils.calculations.pressure_calculations import (calculate_pressure_resistance_longitudinal_defect,
-                                                          calculate_pressure_resistance_longitudinal_defect_w_compressive_load)
-from src.utils.calculations.statistical_calculations import (calculate_std_dev, calculate_partial_safety_factors,
-                                                             calculate_usage_factors)
+from src.utils.monitoring.stage_metrics import stage_metrics
+from .assessment import (prepare_defects, prepare_environment, calculate_defect_pressure_resistance,
+                         calculate_limit_curve, calculate_limit_curve_with_loading, calculate_corrosion_rate,
+                         estimate_remaining_life)
 from .material import MaterialProperties
 from .defect import Defect
 from .environment import Environment
 from .factors import Factors
+from .dependency_graph import DependencyGraph
 
 
 @dataclass
@@ -51,42 +47,158 @@ class Loading:
             self.loading_stress = self.axial_stress + self.bending_stress
 
 
-@dataclass
+@dataclass(frozen=True)
+class QuickCheckResult:
+    """
+    Outcome of a quick check, pressures in MPa
+    """
+    acceptable: bool
+    effective_pressure: float
+    pressure_resistance: float      # Lowest pressure resistance of the defects checked
+    governing_defect: int           # Index of the defect with the lowest pressure resistance
+    defects_checked: int            # Number of defects checked before the check ended
+
+
 class Properties:
-    pressure_resistance: float = None
-    effective_pressure: float = None
-    maximum_allowable_defect_depth: list[pd.DataFrame] = field(default_factory=list)
-    remaining_life: float = None
+    """
+    Computed properties of a pipe.
+    Each property is a node of the pipe's dependency graph. A property stays unset until it is first requested through
+    the corresponding Pipe.calculate_* method, after which it is recomputed on access whenever its inputs change.
+    """
+    _defaults = {
+        'pressure_resistance': None,
+        'effective_pressure': None,
+        'maximum_allowable_defect_depth': list,
+        'remaining_life': None
+    }
+
+    def __init__(self, graph: DependencyGraph):
+        self._graph = graph
+
+    def __getattr__(self, name):
+        if name not in self._defaults:
+            raise AttributeError(name)
+        if self._graph.evaluations[name]:
+            return self._graph.get(name)
+        default = self._defaults[name]
+        return default() if callable(default) else default
+
+    def __repr__(self):
+        return f"Properties({', '.join(f'{name}={getattr(self, name)!r}' for name in self._defaults)})"
 
 
 class Pipe:
+    """
+    Mutable, incrementally recomputed view of the assessment of a pipe, kept for the pages and plots built on it.
+    The calculations are those of models.assessment, which assess uses without keeping any state.
+    """
     def __init__(
             self,
             config: dict
     ):
         self.config = config
-        self.defect = None
-        self.defects = []
-        self.environment = None
-        self.loading = None
-        self.properties = Properties()
+        self._measured_defects = []         # Copies of the defects as added to the pipe
+        self._environment = None
+        self._loading_config = None
+        self._tolerance = 0.0005
 
         logger.debug("Initialising pipe")
-        logger.debug(f"Pipe dimensions: D={self.config['outside_diameter']} | t={self.config['wall_thickness']}")
-        self.dimensions = PipeDimensions(self.config['outside_diameter'], self.config['wall_thickness'])
+        self.graph = DependencyGraph()
+        self.graph.add_node('dimensions', self._create_dimensions, ['outside_diameter', 'wall_thickness'])
+        self.graph.add_node('material_properties', self._create_material_properties,
+                            ['alpha_u', 'design_temperature', 'smts', 'smys'])
+        self.graph.add_node('design_limits', self._create_design_limits,
+                            ['design_pressure', 'design_temperature', 'incidental_to_design_pressure_ratio'])
+        self.graph.add_node('factors', self._create_factors,
+                            ['safety_class', 'measurement_method', 'accuracy', 'confidence_level', 'dimensions'])
+        self.graph.add_node('defects', self._prepare_defects, ['measured_defects', 'factors', 'dimensions'])
+        self.graph.add_node('loading', self._create_loading, ['loading_config', 'factors'])
+        self.graph.add_node('environment', self._prepare_environment, ['environment_config', 'design_limits'])
+        self.graph.add_node('pressure_resistance', self._calculate_pressure_resistance,
+                            ['defects', 'loading', 'material_properties', 'dimensions'])
+        self.graph.add_node('effective_pressure', self._calculate_effective_pressure, ['environment'])
+        self.graph.add_node('maximum_allowable_defect_depth', self._calculate_maximum_allowable_defect_depth,
+                            ['defects', 'factors', 'loading', 'material_properties', 'dimensions', 'environment',
+                             'effective_pressure', 'tolerance'])
+        self.graph.add_node('remaining_life', self._estimate_remaining_life,
+                            ['defects', 'pressure_resistance', 'effective_pressure', 'maximum_allowable_defect_depth'])
+        self.properties = Properties(self.graph)
+
+        # Validate the configuration on creation
+        self.graph.get('factors')
+        self.graph.get('material_properties')
+        self.graph.get('design_limits')
+
+    def __repr__(self):
+        return f"Pipe(D={self.dimensions.outside_diameter}, t={self.dimensions.wall_thickness})"
+
+    @property
+    def dimensions(self) -> PipeDimensions:
+        return self.graph.get('dimensions')
+
+    @property
+    def material_properties(self) -> MaterialProperties:
+        return self.graph.get('material_properties')
+
+    @property
+    def design_limits(self) -> DesignLimits:
+        return self.graph.get('design_limits')
+
+    @property
+    def factors(self) -> Factors:
+        return self.graph.get('factors')
+
+    @property
+    def defects(self) -> list[Defect]:
+        return self.graph.get('defects')
+
+    @property
+    def defect(self) -> Defect:
+        return self.defects[0] if self._measured_defects else None
+
+    @property
+    def loading(self) -> Loading:
+        return self.graph.get('loading')
+
+    @property
+    def environment(self) -> Environment:
+        return self.graph.get('environment')
+
+    def update_config(self, **changes):
+        """
+        Updates configuration values of the pipe.
+        Only the properties depending on the changed values are invalidated and recomputed on their next access,
+        e.g. changing design_pressure leaves the defect Q and (d/t)* untouched.
+        Args:
+            **changes: Configuration keys and their new values
+        Returns:
+            invalidated: Names of the invalidated properties
+        """
+        changed = [key for key, value in changes.items() if self.config.get(key) != value]
+        self.config = self.config | changes
+        return self.graph.invalidate(*changed)
+
+    def _create_dimensions(self) -> PipeDimensions:
+        logger.debug("Pipe dimensions: D={} | t={}", self.config['outside_diameter'], self.config['wall_thickness'])
+        return PipeDimensions(self.config['outside_diameter'], self.config['wall_thickness'])
+
+    def _create_material_properties(self) -> MaterialProperties:
         alpha_u = self.config.get('alpha_u', 0.96)
-        logger.debug(
-            f"Material properties: alpha_u={alpha_u} | temperature={self.config['design_temperature']} | smts={self.config.get('smts')} | smys={self.config.get('smys')}")
-        self.material_properties = MaterialProperties(
+        logger.debug("Material properties: alpha_u={} | temperature={} | smts={} | smys={}", alpha_u,
+                     self.config['design_temperature'], self.config.get('smts'), self.config.get('smys'))
+        return MaterialProperties(
             alpha_u=alpha_u,
             temperature=self.config['design_temperature'],
             smts=self.config.get('smts'),
             smys=self.config.get('smys')
         )
-        self.design_limits = DesignLimits(self.config['design_pressure'], self.config['design_temperature'],
-                                          self.config['incidental_to_design_pressure_ratio'])
 
-        self.factors = Factors(
+    def _create_design_limits(self) -> DesignLimits:
+        return DesignLimits(self.config['design_pressure'], self.config['design_temperature'],
+                            self.config['incidental_to_design_pressure_ratio'])
+
+    def _create_factors(self) -> Factors:
+        return Factors(
             safety_class=self.config['safety_class'],
             inspection_method=self.config['measurement_method'],
             measurement_accuracy=self.config['accuracy'],
@@ -94,220 +206,185 @@ class Pipe:
             wall_thickness=self.dimensions.wall_thickness
         )
 
-    def __repr__(self):
-        return f"Pipe(D={self.dimensions.outside_diameter}, t={self.dimensions.wall_thickness})"
-
+    @stage_metrics.timed('add_defect')
     def add_defect(self, defect: Defect):
-        logger.info("Adding defect to pipe")
-        if not defect.factors:
-            defect.factors = self.factors
-        defect.complete_dimensions()
-        defect.calculate_d_t_adjusted()
-        defect.generate_length_correction_factor(d_nominal=self.dimensions.outside_diameter,
-                                                 t=self.dimensions.wall_thickness)
-
-        if not self.defects:
-            self.defect = defect
-        self.defects.append(defect)
+        logger.debug("Adding defect to pipe")
+        # Keep a copy so that the caller's defect is never modified by the assessment
+        self._measured_defects.append(copy.copy(defect))
+        self.graph.invalidate('measured_defects')
+
+    def _prepare_defects(self) -> list[Defect]:
+        """
+        Completes the dimensions, (d/t)* and length correction factor of each measured defect and adds the combined
+        defect if the defects are interacting
+        """
+        return prepare_defects(self._measured_defects, self.factors,
+                               outside_diameter=self.dimensions.outside_diameter,
+                               wall_thickness=self.dimensions.wall_thickness)
 
     def add_loading(self, axial_load: float = None, bending_load: float = None, combined_stress: float = None):
         if (axial_load or bending_load) and not combined_stress:
             if axial_load:
-                logger.info(f"Adding axial loading to pipe: {axial_load}")
+                logger.info("Adding axial loading to pipe: {}", axial_load)
             if bending_load:
-                logger.info(f"Adding bending loading to pipe: {bending_load}")
-            self.loading = Loading(
+                logger.info("Adding bending loading to pipe: {}", bending_load)
+        elif combined_stress:
+            logger.info("Adding loading to pipe: {}", combined_stress)
+        self._loading_config = {'axial_load': axial_load, 'bending_load': bending_load,
+                                'combined_stress': combined_stress}
+        self.graph.invalidate('loading_config')
+
+    def _create_loading(self) -> Loading | None:
+        if not self._loading_config:
+            return None
+        axial_load = self._loading_config['axial_load']
+        bending_load = self._loading_config['bending_load']
+        combined_stress = self._loading_config['combined_stress']
+        if (axial_load or bending_load) and not combined_stress:
+            return Loading(
                 usage_factor=self.factors.xi,
                 axial_stress=axial_load,
                 bending_stress=bending_load
             )
         elif combined_stress:
-            logger.info(f"Adding loading to pipe: {combined_stress}")
-            self.loading = Loading(usage_factor=self.factors.xi, loading_stress=combined_stress)
+            return Loading(usage_factor=self.factors.xi, loading_stress=combined_stress)
+        return None
 
     def set_environment(self, environment):
-        logger.info(f"Setting environment")
-        self.environment = environment
-        self.environment.calculate_external_pressure()
-        self.environment.calculate_incidental_pressure(design_limits=self.design_limits)
+        logger.debug("Setting environment")
+        self._environment = environment
+        self.graph.invalidate('environment_config')
+
+    def _prepare_environment(self) -> Environment | None:
+        if not self._environment:
+            return None
+        return prepare_environment(self._environment, design_limits=self.design_limits)
 
     def calculate_pressure_resistance(self):
-        logger.info('Calculating pressure resistance')
+        self.graph.get('pressure_resistance')
 
-        # Interacting Defects
-        if any(defect.position for defect in self.defects):
-            logger.info('Defect separation detected, checking for interaction')
-            if verify_interaction(
-                    defects=self.defects,
-                    pipe_diameter=self.dimensions.outside_diameter,
-                    pipe_thickness=self.dimensions.wall_thickness
-            ):
-                logger.info('Defects are interacting, adding combined defect')
-                combined_defect = Defect(defects=self.defects)
-                self.add_defect(combined_defect)
+    def _calculate_pressure_resistance(self) -> float:
+        logger.info('Calculating pressure resistance')
 
         for defect in self.defects:
-            if not self.loading:
-                p_corr = calculate_pressure_resistance_longitudinal_defect(
-                    gamma_m=defect.factors.gamma_m,
-                    gamma_d=defect.factors.gamma_d,
-                    t_nominal=self.dimensions.wall_thickness,
-                    defect_length=defect.length,
-                    d_nominal=self.dimensions.outside_diameter,
-                    relative_defect_depth_with_uncertainty=defect.relative_depth_with_uncertainty,
-                    f_u=self.material_properties.f_u,
-                    q=defect.length_correction_factor
-                )
-                logger.info(f'Pressure Resistance: {p_corr}')
-                defect.pressure_resistance = p_corr
-            else:
-                logger.info('Loading detected')
-                p_corr_comp = calculate_pressure_resistance_longitudinal_defect_w_compressive_load(
-                    gamma_m=defect.factors.gamma_m,
-                    gamma_d=defect.factors.gamma_d,
-                    t_nominal=self.dimensions.wall_thickness,
-                    d_nominal=self.dimensions.outside_diameter,
-                    defect_length=defect.length,
-                    defect_relative_depth_measured=defect.relative_depth,
-                    relative_defect_depth_with_uncertainty=defect.relative_depth_with_uncertainty,
-                    defect_width=defect.width,
-                    f_u=self.material_properties.f_u,
-                    sigma_l=self.loading.loading_stress,
-                    phi=self.loading.usage_factor,
-                    q=defect.length_correction_factor
-                )
-                logger.info(f'Pressure Resistance: {p_corr_comp}')
-                defect.pressure_resistance = p_corr_comp
+            self._calculate_defect_pressure_resistance(defect)
+
+        return min(defect.pressure_resistance for defect in self.defects)
+
+    def _calculate_defect_pressure_resistance(self, defect: Defect) -> float:
+        p_corr = calculate_defect_pressure_resistance(
+            defect,
+            outside_diameter=self.dimensions.outside_diameter,
+            wall_thickness=self.dimensions.wall_thickness,
+            f_u=self.material_properties.f_u,
+            loading_stress=self.loading.loading_stress if self.loading else None,
+            usage_factor=self.loading.usage_factor if self.loading else None
+        )
+        defect.pressure_resistance = p_corr
+        return p_corr
 
-        self.properties.pressure_resistance = min(defect.pressure_resistance for defect in self.defects)
+    def quick_check(self) -> QuickCheckResult:
+        """
+        Checks that the effective pressure is below the pressure resistance of each defect, ending at the first defect
+        that fails. Only Q, (d/t)*, the pressure resistance and the effective pressure are calculated, the limit curves
+        and remaining life are not.
+        Returns:
+            result: Acceptance with the effective pressure and the lowest pressure resistance of the defects checked
+        """
+        effective_pressure = self.graph.get('effective_pressure')
+        pressure_resistance = governing_defect = None
+        index = 0
+        for index, defect in enumerate(self.defects):
+            p_corr = self._calculate_defect_pressure_resistance(defect)
+            if pressure_resistance is None or p_corr < pressure_resistance:
+                pressure_resistance, governing_defect = p_corr, index
+            if p_corr <= effective_pressure:
+                break
+        return QuickCheckResult(
+            acceptable=bool(effective_pressure < pressure_resistance),
+            effective_pressure=effective_pressure,
+            pressure_resistance=pressure_resistance,
+            governing_defect=governing_defect,
+            defects_checked=index + 1
+        )
 
     def calculate_effective_pressure(self):
+        self.graph.get('effective_pressure')
+
+    def _calculate_effective_pressure(self) -> float:
         logger.info("Calculating effective pressure")
-        self.properties.effective_pressure = self.environment.incidental_pressure - self.environment.external_pressure
+        return self.environment.incidental_pressure - self.environment.external_pressure
 
-    def calculate_maximum_allowable_defect_depth(self, resolution=0.001):
+    def calculate_maximum_allowable_defect_depth(self, tolerance=0.0005):
+        """
+        Calculate the maximum acceptable relative defect depth for a given defect length
+        Args:
+            tolerance: Maximum error in relative depth when interpolating linearly between the calculated limits
+        """
+        if tolerance != self._tolerance:
+            self._tolerance = tolerance
+            self.graph.invalidate('tolerance')
+        self.graph.get('maximum_allowable_defect_depth')
+
+    def _calculate_maximum_allowable_defect_depth(self) -> list[pd.DataFrame]:
         """
         Calculate the maximum acceptable relative defect depth for a given defect length
         Returns:
             limits: pd.DataFrame representation of the maximum acceptable relative defect depth at each length
         """
-        logger.info(f"Calculating limits for defect depth and length")
+        logger.info("Calculating limits for defect depth and length")
+        tolerance = self._tolerance
+        maximum_allowable_defect_depth = []
 
         defects = self.defects.copy()
-
         # Ignore the second defect
         if len(self.defects) > 1:
             del defects[1]
 
-        for index, defect in enumerate(defects):
-            rows = []
+        for defect in defects:
             if not self.loading:  # With no loading
-                for relative_depth in np.arange(0, 1, resolution):
-                    if not relative_depth:  # Depth must be greater than 0
-                        continue
-                    length = calculate_maximum_defect_length(
-                        d=self.dimensions.outside_diameter,
-                        t=self.dimensions.wall_thickness,
-                        gamma_d=defect.factors.gamma_d,
-                        gamma_m=defect.factors.gamma_m,
-                        f_u=self.material_properties.f_u,
-                        p_li=self.environment.incidental_pressure,
-                        p_le=self.environment.external_pressure,
-                        d_t_meas=relative_depth,
-                        epsilon_d=defect.factors.epsilon_d,
-                        st_dev=defect.factors.standard_deviation
-                    )
-                    logger.debug(f'Maximum length for relative depth {relative_depth}: {length}')
-                    if all([relative_depth, length]):
-                        rows.append(pd.DataFrame({'defect_length': length, 'defect_relative_depth': relative_depth}, index=[0]))
-                minimum_values = {'defect_length': 0.0, 'defect_relative_depth': rows[-1]['defect_relative_depth']}
-                rows.append(pd.DataFrame(minimum_values, index=[0]))
+                curve = calculate_limit_curve(
+                    defect.factors,
+                    outside_diameter=self.dimensions.outside_diameter,
+                    wall_thickness=self.dimensions.wall_thickness,
+                    f_u=self.material_properties.f_u,
+                    incidental_pressure=self.environment.incidental_pressure,
+                    external_pressure=self.environment.external_pressure,
+                    tolerance=tolerance
+                )
             else:  # Calculate with loading
-                target_pressure = self.properties.effective_pressure
-                depth_zeroed = False
-
-                for defect_length in np.arange(0, 1000, resolution * 500):
-                    if not depth_zeroed:
-                        defect_relative_depth = calculate_max_defect_depth_longitudinal_with_stress(
-                            gamma_m=self.factors.gamma_m,
-                            gamma_d=self.factors.gamma_d,
-                            pipe_thickness=self.dimensions.wall_thickness,
-                            defect_length=defect_length,
-                            defect_width=self.defect.width,
-                            pipe_diameter=self.dimensions.outside_diameter,
-                            f_u=self.material_properties.f_u,
-                            p_corr_comp=target_pressure,
-                            xi=self.factors.xi,
-                            sigma_l=self.loading.loading_stress,
-                            epsilon_d=self.factors.epsilon_d,
-                            st_dev=self.factors.standard_deviation
-                        )
-
-                        if defect_relative_depth <= 0:
-                            # If defect depth reaches 0, skip calculations for the rest of the lengths
-                            depth_zeroed = True
-                            defect_relative_depth = 0
-                    else:
-                        defect_relative_depth = 0
-                    logger.debug(f"Max depth for defect length {defect_length} = {defect_relative_depth}")
-                    rows.append(pd.DataFrame({'defect_length': defect_length, 'defect_relative_depth': defect_relative_depth}, index=[0]))
-
-            limits = pd.concat(rows).reset_index(drop=True)
-            limits = limits.sort_values('defect_length', ignore_index=True)  # Sort by defect length
-
-            self.properties.maximum_allowable_defect_depth.append(limits)
+                curve = calculate_limit_curve_with_loading(
+                    self.factors,
+                    outside_diameter=self.dimensions.outside_diameter,
+                    wall_thickness=self.dimensions.wall_thickness,
+                    f_u=self.material_properties.f_u,
+                    defect_width=self.defect.width,
+                    loading_stress=self.loading.loading_stress,
+                    effective_pressure=self.graph.get('effective_pressure'),
+                    tolerance=tolerance
+                )
+
+            limits = pd.DataFrame({'defect_length': curve[0], 'defect_relative_depth': curve[1]})
+            maximum_allowable_defect_depth.append(limits)
+
+        return maximum_allowable_defect_depth
 
     def estimate_remaining_life(self):
+        self.graph.get('remaining_life')
+
+    def _estimate_remaining_life(self) -> float:
         """
         Estimate the remaining life of the pipe based on the current defect and loading based on 2.9.2
-
-        d_t: defect depth after time T
-        l_t: defect length after time T
-        T: time
-        r_corr: corrosion rate
-        r_corr_length: corrosion rate for length
-        d_0: initial defect depth
-        l_0: initial defect length
         Returns:
-
+            remaining_life: Remaining life in days, 0 if the pipe has already failed
         """
-        if self.properties.pressure_resistance < self.properties.effective_pressure:
-            logger.info('Pipe has already failed, skipping remaining life calculation')
-            self.properties.remaining_life = 0
-            return False
-
-        d_0 = self.defects[1].relative_depth
-        l_0 = self.defects[1].length
-        w_0 = self.defects[1].width
-
-        r_corr, r_corr_length = self.calculate_corrosion_rate()
-
-        # Find the point where the defect depth and length reach the maximum allowable defect depth/length
-        d_t = d_0
-        l_t = l_0
-        w_t = w_0
-        failure = False
-        maximum_allowable_defect_depth = self.properties.maximum_allowable_defect_depth[0]
-        filtered_allowable_depth = maximum_allowable_defect_depth[
-            (maximum_allowable_defect_depth['defect_length'] > l_t) &
-            (maximum_allowable_defect_depth['defect_relative_depth'] > d_t)
-        ]
-
-        while not failure:
-            d_t += r_corr
-            l_t += r_corr_length
-
-            for row in filtered_allowable_depth.itertuples():
-                if math.isclose(l_t, row.defect_length, abs_tol=0.5):
-                    if d_t >= row.defect_relative_depth:
-                        failure = True
-                        break
-                    else:
-                        break
-
-        remaining_life = (d_t - d_0) / r_corr
-
-        self.properties.remaining_life = remaining_life
+        limits = self.graph.get('maximum_allowable_defect_depth')[0]
+        return estimate_remaining_life(
+            self.defects,
+            pressure_resistance=self.graph.get('pressure_resistance'),
+            effective_pressure=self.graph.get('effective_pressure'),
+            limits=limits[['defect_length', 'defect_relative_depth']].to_numpy().T
+        )
 
     def calculate_corrosion_rate(self) -> tuple[float, float]:
         """
@@ -316,31 +393,4 @@ class Pipe:
             corrosion_rate_depth: Depth corrosion rate per day
             corrosion_rate_length: Length corrosion rate per day
         """
-        if len(self.defects) < 2:
-            raise ValueError("Multiple defects required to calculate corrosion rate")
-
-        # Get defect measurements for first defect
-        d_0 = self.defects[0].relative_depth
-        l_0 = self.defects[0].length
-        w_0 = self.defects[0].width
-        ts_0 = self.defects[0].measurement_timestamp
-
-        # Get defect measurements for second defect
-        d_1 = self.defects[1].relative_depth
-        l_1 = self.defects[1].length
-        w_1 = self.defects[1].width
-        ts_1 = self.defects[1].measurement_timestamp
-
-        d_ts = ts_1 - ts_0
-
-        if d_ts == 0:
-            raise ValueError("Timestamps must be different to calculate corrosion rate")
-
-        r_corr_depth = 86400 * (d_1 - d_0) / d_ts
-        r_corr_length = 86400 * (l_1 - l_0) / d_ts
-        if all([w_0, w_1]):
-            r_corr_width = 86400 * (w_1 - w_0) / d_ts
-
-        return r_corr_depth, r_corr_length
-
-
+        return calculate_corrosion_rate(self.defects)
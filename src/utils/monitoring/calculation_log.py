@@ -0,0 +1,142 @@
+"""
+Logging and tracing for the hot loops of the calculations.
+
+Limit curves evaluate the DNV equations hundreds of times, so their per-point messages are only built when a sink
+accepts DEBUG messages, checked once per curve, and are formatted lazily by loguru. For inspecting the intermediate
+values without the cost of the log sink, a trace records them as doubles into one flat array per event while enabled
+for the current thread or task:
+
+    with calculation_trace() as trace:
+        pipe.calculate_maximum_allowable_defect_depth()
+    trace.to_frame('maximum_defect_length')
+"""
+import contextvars
+import sys
+import time
+from array import array
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+DEBUG = 10
+# Fields recorded by each event of a trace
+TRACE_EVENTS = {
+    'maximum_defect_length': ('relative_depth', 'length'),
+    'maximum_defect_depth': ('defect_length', 'relative_depth'),
+    'pressure_resistance': ('length', 'relative_depth_with_uncertainty', 'length_correction_factor', 'p_corr')
+}
+
+_active_trace = contextvars.ContextVar('calculation_trace', default=None)
+
+
+def debug_enabled() -> bool:
+    """
+    Whether any sink accepts DEBUG messages. loguru has no public level check, so its minimum level is read directly.
+    """
+    try:
+        return logger._core.min_level <= DEBUG
+    except AttributeError:
+        return True
+
+
+class CalculationTrace:
+    """
+    Intermediate values of calculations, held as one flat array of doubles per event
+    """
+    def __init__(self, maxsize: int = 1_000_000):
+        """
+        Args:
+            maxsize: Maximum number of records per event, later records are counted as dropped
+        """
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._buffers = {event: array('d') for event in TRACE_EVENTS}
+
+    def record(self, event: str, *values: float):
+        """
+        Records the values of an event, in the order of its fields in TRACE_EVENTS. None is recorded as NaN.
+        """
+        buffer = self._buffers[event]
+        if len(buffer) >= self.maxsize * len(values):
+            self.dropped += 1
+            return
+        if None in values:
+            values = [np.nan if value is None else value for value in values]
+        buffer.extend(values)
+
+    def __len__(self):
+        return sum(len(buffer) // len(TRACE_EVENTS[event]) for event, buffer in self._buffers.items())
+
+    def to_array(self, event: str) -> np.ndarray:
+        """
+        Returns:
+            records: (records, fields) copy of the values recorded for an event
+        """
+        return np.array(self._buffers[event], dtype=np.float64).reshape(-1, len(TRACE_EVENTS[event]))
+
+    def to_frame(self, event: str) -> pd.DataFrame:
+        return pd.DataFrame(self.to_array(event), columns=list(TRACE_EVENTS[event]))
+
+
+def current_trace() -> CalculationTrace | None:
+    """
+    Returns the trace enabled for the current thread or task, checked once before a loop rather than per point
+    """
+    return _active_trace.get()
+
+
+@contextmanager
+def calculation_trace(trace: CalculationTrace = None):
+    """
+    Records the intermediate values of the calculations run in the enclosed block into a trace
+    """
+    trace = trace or CalculationTrace()
+    token = _active_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _active_trace.reset(token)
+
+
+if __name__ == '__main__':
+    # Reports the cost of logging in the calculation loops: python -m src.utils.monitoring.calculation_log
+    from src.utils.caching.limit_curve_cache import limit_curve_cache
+    from src.utils.models.assessment import DefectSpec, PipeSpec, assess
+    # The calculations read the trace of the imported module rather than of __main__
+    from src.utils.monitoring import calculation_log
+
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    spec = PipeSpec.from_configs({
+        'pipe': {'outside_diameter': 812.8, 'wall_thickness': 19.1, 'smts': 530.9, 'design_pressure': 150,
+                 'design_temperature': 75, 'incidental_to_design_pressure_ratio': 1.1, 'accuracy': 0.1,
+                 'confidence_level': 0.8, 'safety_class': 'medium', 'measurement_method': 'relative'},
+        'environment': {'seawater_density': 1025, 'containment_density': 200, 'elevation_reference': 30,
+                        'elevation': -100}
+    })
+    defects = [DefectSpec(length=200, relative_depth=0.25)]
+    # Compute the limit curve on every assessment
+    limit_curve_cache.maxsize = 0
+
+    def run_assessments() -> float:
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            assess(spec, defects)
+        return (time.perf_counter() - start_time) / repeats
+
+    # Messages are discarded by the sinks so that only building them is measured
+    logger.remove()
+    sink = logger.add(lambda message: None, level='INFO')
+    run_assessments()
+    results = {'INFO sink': run_assessments()}
+    with calculation_log.calculation_trace() as benchmark_trace:
+        results['INFO sink, trace'] = run_assessments()
+    logger.remove(sink)
+    sink = logger.add(lambda message: None, level='DEBUG')
+    results['DEBUG sink'] = run_assessments()
+    logger.remove(sink)
+    logger.add(sys.stderr, level='INFO')
+    for name, elapsed in results.items():
+        logger.info(f"{name} | {elapsed * 1e3:.3f}ms per assessment | {elapsed / results['INFO sink']:.2f}x")
+    logger.info(f"{len(benchmark_trace) // repeats} records traced per assessment")
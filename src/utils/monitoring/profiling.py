@@ -0,0 +1,222 @@
+"""
+Opt-in profiling of the analysis callbacks and the example endpoint.
+
+Profiling is enabled for every call by the app, or for a single request through the profile=1 query parameter of the
+page, when the app allows profiling on request, or by an admin passing the profiling token in the X-Profile-Token
+header. Only admins holding the token can download profiles. Each profiled call runs under cProfile while a
+thread samples the stack of the calling thread, giving both the exact call counts and times as a .pstats file and the
+sampled stacks in the collapsed format read by flamegraph.pl and speedscope. The last profiles are kept with their
+inputs in a ring buffer, shared through the backend as the callbacks run in background processes.
+"""
+import cProfile
+import hmac
+import json
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from urllib.parse import parse_qs
+
+import flask
+from loguru import logger
+
+PROFILE_PARAMETER = 'profile'
+PROFILE_REQUESTED = '1'
+PROFILE_HEADER = 'X-Profile-Token'
+
+
+class StackSampler:
+    """
+    Samples the stack of a thread from a background thread, counting each distinct stack
+    """
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """
+        Returns:
+            stacks: One line per distinct stack, the frames from the root separated by semicolons followed by the
+                    number of samples
+        """
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """
+    Ring buffer of the last maxsize profiles.
+    The backend can be any client exposing get/set/incr, e.g. diskcache.Cache or redis.Redis, shared by the processes
+    recording profiles and the server downloading them. Profiles are held in memory without a backend.
+    """
+    def __init__(self, backend=None, maxsize: int = 20):
+        self.backend = backend
+        self.maxsize = maxsize
+        self._profiles: OrderedDict[int, dict] = OrderedDict()
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def add(self, record: dict, pstats: bytes, collapsed: str) -> int:
+        """
+        Stores a profile, replacing the oldest once the buffer is full
+        Args:
+            record: JSON serialisable description of the profiled call
+            pstats: Profile statistics in the format written by cProfile.Profile.dump_stats
+            collapsed: Sampled stacks in the collapsed format
+
+        Returns:
+            profile_id: Id of the profile, increasing with each profile
+        """
+        if self.backend is None:
+            with self._lock:
+                self._count += 1
+                profile_id = self._count
+                self._profiles[profile_id] = {'record': record | {'id': profile_id}, 'pstats': pstats,
+                                              'collapsed': collapsed}
+                while len(self._profiles) > self.maxsize:
+                    self._profiles.popitem(last=False)
+            return profile_id
+
+        profile_id = int(self.backend.incr('profiles:count'))
+        slot = profile_id % self.maxsize
+        self.backend.set(f'profiles:{slot}:pstats', pstats)
+        self.backend.set(f'profiles:{slot}:collapsed', collapsed.encode())
+        # Written last, the record marks the slot as holding this profile
+        self.backend.set(f'profiles:{slot}:record', json.dumps(record | {'id': profile_id}, default=str).encode())
+        return profile_id
+
+    def _get(self, profile_id: int, part: str) -> bytes | dict | None:
+        if self.backend is None:
+            with self._lock:
+                profile = self._profiles.get(profile_id)
+            return profile[part] if profile is not None else None
+
+        slot = profile_id % self.maxsize
+        record = self.backend.get(f'profiles:{slot}:record')
+        if record is None or json.loads(record)['id'] != profile_id:
+            return None  # Never recorded or replaced by a later profile
+        return json.loads(record) if part == 'record' else self.backend.get(f'profiles:{slot}:{part}')
+
+    def get_record(self, profile_id: int) -> dict | None:
+        return self._get(profile_id, 'record')
+
+    def get_pstats(self, profile_id: int) -> bytes | None:
+        return self._get(profile_id, 'pstats')
+
+    def get_collapsed(self, profile_id: int) -> str | None:
+        collapsed = self._get(profile_id, 'collapsed')
+        return collapsed.decode() if isinstance(collapsed, bytes) else collapsed
+
+    def list(self) -> list[dict]:
+        """
+        Returns:
+            records: Records of the profiles in the buffer, newest first
+        """
+        if self.backend is None:
+            with self._lock:
+                return [profile['record'] for profile in reversed(self._profiles.values())]
+        count = int(self.backend.get('profiles:count') or 0)
+        records = [self.get_record(profile_id) for profile_id in range(count, max(count - self.maxsize, 0), -1)]
+        return [record for record in records if record is not None]
+
+
+class CallbackProfiler:
+    """
+    Profiles calls when enabled for every call, when requested through the page if requests are enabled, or when
+    requested by an admin holding the token. Without a token, profiles cannot be downloaded.
+    """
+    def __init__(self, store: ProfileStore, enabled: bool = False, requests_enabled: bool = False, token: str = None,
+                 sampling_interval: float = 0.001):
+        self.store = store
+        self.enabled = enabled
+        self.requests_enabled = requests_enabled
+        self.token = token
+        self.sampling_interval = sampling_interval
+
+    def _is_token(self, candidates) -> bool:
+        if not self.token:
+            return False
+        return any(hmac.compare_digest(candidate.encode(), self.token.encode()) for candidate in candidates)
+
+    def is_admin(self) -> bool:
+        """
+        Checks for the token in the header of the current request. Profiles hold other users' inputs, so the token is
+        never accepted from a query string, which would leave it in URLs, proxy logs and browser history.
+        """
+        return flask.has_request_context() and self._is_token([flask.request.headers.get(PROFILE_HEADER, '')])
+
+    def requested(self, search: str = None) -> bool:
+        """
+        Whether a call should be profiled: when enabled for every call, requested through the query string of the page
+        when requests are enabled, or requested by an admin through the header of the current request
+        Args:
+            search: Query string of the page, e.g. '?profile=1'
+        """
+        requested = PROFILE_REQUESTED in parse_qs((search or '').lstrip('?')).get(PROFILE_PARAMETER, [])
+        return self.enabled or (self.requests_enabled and requested) or self.is_admin()
+
+    @contextmanager
+    def profile(self, name: str, inputs, enabled: bool = True):
+        """
+        Profiles the enclosed block, including blocks ending with an error, and stores the profile
+        Args:
+            name: Name of the profiled callback or endpoint
+            inputs: JSON serialisable inputs of the call, stored with the profile to reproduce it
+            enabled: Runs the block without profiling if False
+        """
+        if not enabled:
+            yield
+            return
+
+        profiler = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident(), interval=self.sampling_interval)
+        error = None
+        started = time.time()
+        sampler.start()
+        profiler.enable()
+        try:
+            yield
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            profiler.disable()
+            sampler.stop()
+            duration = time.time() - started
+            profiler.create_stats()
+            try:
+                profile_id = self.store.add(
+                    {'name': name, 'inputs': inputs, 'started': started, 'duration': duration, 'error': error},
+                    pstats=marshal.dumps(profiler.stats),
+                    collapsed=sampler.collapsed()
+                )
+                logger.info(f"Profiled {name} | Profile {profile_id} | Processing time: {duration:.2f}s")
+            except Exception as e:
+                logger.warning(f"Profile of {name} could not be stored: {e}")
+
+
+# Process-wide profiler, enabled and given a token and backend by the app
+callback_profiler = CallbackProfiler(ProfileStore())
@@ -0,0 +1,158 @@
+"""
+Per-stage timing of assessments, rendered in the Prometheus text format.
+
+Each process records the duration of every stage into histograms held in memory, costing a clock read and a few
+integer increments per stage, so nothing is sent anywhere while the metrics are not scraped. Assessments run in the
+server as well as in background callback, job and worker processes, so each process adds the counts it recorded to a
+shared backend when flush is called, e.g. at the end of a callback or job, and the server renders the totals of the
+backend when /metrics is scraped. Without a backend the histograms of the current process are rendered.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable
+
+from loguru import logger
+
+METRIC_NAME = 'corrosion_analyser_stage_duration_seconds'
+# Upper bounds of the histogram buckets (s), from factors calculated in microseconds to analyses taking seconds
+BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+           0.5, 1.0, 2.5, 5.0, 10.0)
+# Stages timed by the assessment, rendered before they are first recorded and read from the backend when scraped
+STAGES = ('factors', 'add_defect', 'prepare_defects', 'pressure_resistance', 'limit_curve', 'remaining_life',
+          'figure_defect_depth', 'figure_pipe_cross_section', 'figure_defect_cross_section', 'figure_serialisation')
+
+
+class StageMetrics:
+    """
+    Histograms of the duration of each stage.
+    The backend can be any client exposing get and incr, e.g. diskcache.Cache or redis.Redis. Each histogram is stored
+    as one counter per bucket and the sum of the durations in nanoseconds, so that processes can add to it atomically.
+    """
+    def __init__(self, backend=None, buckets: tuple = BUCKETS, stages: tuple = STAGES, enabled: bool = True):
+        self.backend = backend
+        self.buckets = tuple(buckets)
+        self.stages = tuple(stages)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # Stage -> [count of each bucket, count above the last bucket, sum of the durations (ns)]
+        self._histograms: dict[str, list[int]] = {}
+
+    def observe(self, stage: str, duration: float):
+        """
+        Records a duration (s) of a stage
+        """
+        index = bisect.bisect_left(self.buckets, duration)
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = [0] * (len(self.buckets) + 2)
+            histogram[index] += 1
+            histogram[-1] += int(duration * 1e9)
+
+    @contextmanager
+    def time(self, stage: str):
+        """
+        Records the duration of the enclosed block, including blocks ending with an error
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def timed(self, stage: str) -> Callable[[Callable], Callable]:
+        """
+        Decorator recording the duration of each call of a function
+        """
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(stage, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    def _key(self, stage: str, index: int) -> str:
+        return f"stage-metrics:{stage}:{'sum' if index == len(self.buckets) + 1 else index}"
+
+    def flush(self):
+        """
+        Adds the counts recorded since the last flush to the backend
+        """
+        if self.backend is None:
+            return
+        with self._lock:
+            histograms, self._histograms = self._histograms, {}
+        try:
+            for stage, histogram in histograms.items():
+                for index, value in enumerate(histogram):
+                    if value:
+                        self.backend.incr(self._key(stage, index), value)
+        except Exception as e:
+            logger.warning(f"Stage metrics backend unavailable: {e}")
+
+    def snapshot(self) -> dict[str, list[int]]:
+        """
+        Returns:
+            histograms: Stage -> [count of each bucket, count above the last bucket, sum of the durations (ns)], the
+                        totals of the backend if there is one, else of the current process
+        """
+        if self.backend is None:
+            with self._lock:
+                histograms = {stage: list(histogram) for stage, histogram in self._histograms.items()}
+            return {stage: [0] * (len(self.buckets) + 2) for stage in self.stages} | histograms
+
+        self.flush()
+        with self._lock:
+            stages = list(dict.fromkeys(self.stages + tuple(self._histograms)))
+        keys = [self._key(stage, index) for stage in stages for index in range(len(self.buckets) + 2)]
+        try:
+            # redis reads every counter in one round trip, diskcache reads them from the local file
+            values = self.backend.mget(keys) if hasattr(self.backend, 'mget') else [self.backend.get(key) for key in keys]
+        except Exception as e:
+            logger.warning(f"Stage metrics backend unavailable: {e}")
+            values = [None] * len(keys)
+        values = [int(value) if value is not None else 0 for value in values]
+        width = len(self.buckets) + 2
+        return {stage: values[index * width:(index + 1) * width] for index, stage in enumerate(stages)}
+
+    def render(self) -> str:
+        """
+        Renders the histograms in the Prometheus text exposition format
+        """
+        lines = [f'# HELP {METRIC_NAME} Duration of each stage of the assessments',
+                 f'# TYPE {METRIC_NAME} histogram']
+        for stage, histogram in sorted(self.snapshot().items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (None,), histogram[:-1]):
+                cumulative += count
+                le = '+Inf' if bound is None else repr(bound)
+                lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {histogram[-1] / 1e9!r}')
+            lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """
+        Discards the counts recorded by the current process
+        """
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+
+# Process-wide metrics, the backend is configured by the app
+stage_metrics = StageMetrics()
+# Forked callback and job processes add only their own counts to the backend, not those inherited from the server
+os.register_at_fork(after_in_child=stage_metrics.reset)
@@ -3,11 +3,61 @@ from os import path
 
 import pytest
 
-from src.utils.models import Parameter
+from src.utils.analysis.assessment import build_pipe
+from src.utils.models import Parameter, Pipe
 
 FIXTURE_PATH = path.join(path.dirname(__file__), 'fixtures')
 
 
+def create_example_a_1_configs() -> dict:
+    """
+    Returns:
+        configs: New {'pipe', 'environment', 'defects'} model configs of Example A.1-1
+    """
+    with open(path.join(FIXTURE_PATH, 'example_a_1.json'), 'r') as file:
+        example_a_1 = json.load(file)
+    return {
+        'pipe': {
+            'outside_diameter': example_a_1['outside_diameter']['value'],
+            'wall_thickness': example_a_1['wall_thickness']['value'],
+            'smts': example_a_1['smts']['value'],
+            'design_pressure': example_a_1['design_pressure']['value'],
+            'design_temperature': example_a_1['design_temperature']['value'],
+            'incidental_to_design_pressure_ratio': example_a_1['gamma_inc']['value'],
+            'accuracy': example_a_1['acc_rel']['value'],
+            'confidence_level': example_a_1['conf']['value'],
+            'safety_class': example_a_1['safety_class'],
+            'measurement_method': 'relative'
+        },
+        'environment': {
+            'seawater_density': example_a_1['seawater_density']['value'],
+            'containment_density': example_a_1['containment_density']['value'],
+            'elevation_reference': example_a_1['elevation_reference']['value'],
+            'elevation': example_a_1['defect_elevation']['value']
+        },
+        'defects': [{'length': example_a_1['defect_length']['value'],
+                     'relative_depth': example_a_1['defect_relative_depth']['value']}]
+    }
+
+
+def create_example_a_1_pipe(**config) -> Pipe:
+    """
+    Args:
+        config: Pipe config values replacing those of the example
+
+    Returns:
+        pipe: Pipe of Example A.1-1 with its defect and environment set, nothing calculated
+    """
+    configs = create_example_a_1_configs()
+    configs['pipe'] |= config
+    return build_pipe(configs)
+
+
+@pytest.fixture
+def example_a_1_configs():
+    return create_example_a_1_configs()
+
+
 @pytest.fixture
 def example_a_1():
     with open(path.join(FIXTURE_PATH, 'example_a_1.json'), 'r') as file:
@@ -0,0 +1,168 @@
+import multiprocessing
+import threading
+import time
+
+import diskcache
+import pytest
+from flask_caching.backends import FileSystemCache, SimpleCache
+
+from src.utils.caching.analysis_cache import AnalysisCache
+from src.utils.caching.single_flight import DiskcacheLockClient, SingleFlight
+
+
+def table_data(design_pressure):
+    return {
+        'Design Pressure': {'Value': design_pressure, 'Unit': 'bar'},
+        'Safety Class': {'Value': 'medium', 'Unit': ''}
+    }
+
+
+def test_analysis_is_memoised():
+    cache = AnalysisCache(backend=SimpleCache(), timeout=60)
+    calls = []
+
+    def analyse():
+        calls.append(1)
+        return {'analysis': 'acceptable'}
+
+    assert cache.get_or_compute(table_data(150), analyse) == {'analysis': 'acceptable'}
+    assert cache.get_or_compute(table_data(150.0), analyse) == {'analysis': 'acceptable'}
+    assert cache.get_or_compute(table_data(160), analyse) == {'analysis': 'acceptable'}
+    assert len(calls) == 2
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'hit_rate': 1 / 3, 'coalesced': 0, 'in_flight': 0}
+
+
+def test_failed_analysis_is_not_stored():
+    cache = AnalysisCache(backend=SimpleCache())
+
+    def fail():
+        raise ValueError('Defect Width is required for stress calculations.')
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            cache.get_or_compute(table_data(150), fail)
+    assert cache.stats()['misses'] == 2
+
+
+def test_analysis_without_backend_is_computed():
+    cache = AnalysisCache()
+    assert cache.get_or_compute(table_data(150), lambda: {'analysis': 'acceptable'}) == {'analysis': 'acceptable'}
+    assert cache.stats()['hits'] == cache.stats()['misses'] == 0
+
+
+def run_concurrently(func, count):
+    barrier = threading.Barrier(count)
+    results = []
+
+    def worker(index):
+        barrier.wait()
+        results.append(func(index))
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_analyses_are_coalesced():
+    cache = AnalysisCache(backend=SimpleCache())
+    calls = []
+
+    def analyse():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'analysis': 'acceptable'}
+
+    results = run_concurrently(lambda index: cache.get_or_compute(table_data(150), analyse), 8)
+    assert results == [{'analysis': 'acceptable'}] * 8
+    assert len(calls) == 1
+    assert cache.stats()['misses'] == cache.stats()['coalesced'] + 1
+    assert cache.stats()['in_flight'] == 0
+
+
+def test_single_flight_shares_errors():
+    single_flight = SingleFlight()
+
+    def fail():
+        time.sleep(0.2)
+        raise ValueError('Invalid input')
+
+    def call(index):
+        try:
+            return single_flight.do('key', fail)
+        except ValueError as e:
+            return str(e)
+
+    assert run_concurrently(call, 4) == ['Invalid input'] * 4
+    assert single_flight.stats() == {'in_flight': 0, 'leaders': 1, 'coalesced': 3}
+
+
+class LockClient:
+    """
+    Stand-in for redis.Redis.lock shared by several processes
+    """
+    def __init__(self):
+        self.locks = {}
+
+    def lock(self, name, timeout=None, blocking_timeout=None):
+        return self.locks.setdefault(name, threading.Lock())
+
+
+def test_distributed_lock_rechecks_shared_cache():
+    backend = SimpleCache()
+    lock_client = LockClient()
+    # Two processes sharing a backend and lock client but not their in-process single-flight state
+    caches = [AnalysisCache(backend=backend, single_flight=SingleFlight(lock_client=lock_client)) for _ in range(2)]
+    calls = []
+
+    def analyse():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'analysis': 'acceptable'}
+
+    results = run_concurrently(lambda index: caches[index].get_or_compute(table_data(150), analyse), 2)
+    assert results == [{'analysis': 'acceptable'}] * 2
+    assert len(calls) == 1
+    assert sum(cache.stats()['coalesced'] for cache in caches) == 1
+
+
+def analyse_in_process(directory: str, results):
+    # A background callback process, sharing only the analysis cache and the local diskcache with the others
+    with diskcache.Cache(f'{directory}/diskcache') as cache:
+        analysis_cache = AnalysisCache(backend=FileSystemCache(f'{directory}/analyses'),
+                                       single_flight=SingleFlight(lock_client=DiskcacheLockClient(cache)))
+
+        def analyse():
+            cache.incr('computations')
+            time.sleep(0.5)
+            return {'analysis': 'acceptable'}
+
+        results.put(analysis_cache.get_or_compute(table_data(150), analyse))
+
+
+def test_diskcache_lock_coalesces_processes(tmp_path):
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    processes = [context.Process(target=analyse_in_process, args=(str(tmp_path), results)) for _ in range(2)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=30)
+    assert [results.get(timeout=1) for _ in processes] == [{'analysis': 'acceptable'}] * 2
+    with diskcache.Cache(str(tmp_path / 'diskcache')) as cache:
+        assert cache.get('computations') == 1
+
+
+def test_diskcache_lock_times_out(tmp_path):
+    with diskcache.Cache(str(tmp_path)) as cache:
+        client = DiskcacheLockClient(cache)
+        held = client.lock('key:lock', timeout=1)
+        assert held.acquire()
+        assert not client.lock('key:lock', blocking_timeout=0.05).acquire()
+        # The lock expires if its holder never releases it
+        assert client.lock('key:lock', blocking_timeout=2).acquire()
+        held.release()
+        assert not client.lock('key:lock', blocking_timeout=0.05).acquire()
+
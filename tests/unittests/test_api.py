@@ -0,0 +1,141 @@
+import gzip
+import io
+import json
+
+import flask
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.api import api
+from src.utils.analysis.assessment import assess_pipe
+from tests.conftest import create_example_a_1_configs
+
+EXAMPLE_A_1 = create_example_a_1_configs()
+PIPE, ENVIRONMENT = EXAMPLE_A_1['pipe'], EXAMPLE_A_1['environment']
+
+
+@pytest.fixture
+def client():
+    app = flask.Flask(__name__)
+    app.register_blueprint(api)
+    return app.test_client()
+
+
+def test_assess_matches_single_defect_assessment(client):
+    defects = [{'id': 'A', 'length': 200, 'relative_depth': 0.25},
+               {'id': 'B', 'length': 400, 'relative_depth': 0.6, 'elevation': -50}]
+    response = client.post('/api/v1/assess', json={'pipe': PIPE, 'environment': ENVIRONMENT, 'defects': defects})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['count'] == 2
+    assert [result['id'] for result in body['results']] == ['A', 'B']
+
+    for defect, result in zip(defects, body['results']):
+        environment = ENVIRONMENT | {'elevation': defect.get('elevation', ENVIRONMENT['elevation'])}
+        pipe = assess_pipe({'pipe': PIPE, 'environment': environment,
+                            'defects': [{'length': defect['length'], 'relative_depth': defect['relative_depth']}]})
+        assert result['pressure_resistance'] == pytest.approx(pipe.properties.pressure_resistance)
+        assert result['effective_pressure'] == pytest.approx(pipe.properties.effective_pressure)
+        assert result['acceptable'] == (pipe.properties.effective_pressure < pipe.properties.pressure_resistance)
+    assert body['unacceptable'] == 1
+
+
+@pytest.mark.parametrize('loading', [{'axial_load': -150, 'bending_load': -50}, {'combined_stress': -200}])
+def test_loaded_assessment_matches_pipe(client, loading):
+    defects = [{'length': 200, 'relative_depth': 0.25, 'width': 100}]
+    response = client.post('/api/v1/assess', json={'pipe': PIPE, 'environment': ENVIRONMENT, 'loading': loading,
+                                                   'defects': defects})
+    assert response.status_code == 200
+    result = response.get_json()['results'][0]
+
+    pipe = assess_pipe({'pipe': PIPE, 'environment': ENVIRONMENT, 'loading': loading, 'defects': defects})
+    assert result['pressure_resistance'] == pytest.approx(pipe.properties.pressure_resistance)
+    assert not result['acceptable'] and pipe.properties.pressure_resistance < pipe.properties.effective_pressure
+
+
+def test_large_requests_are_compressed(client):
+    count = 10_000
+    rng = np.random.default_rng(0)
+    defects = {'length': rng.uniform(10, 1000, count).tolist(), 'relative_depth': rng.uniform(0.01, 0.6, count).tolist()}
+    response = client.post('/api/v1/assess?orient=split', json={'pipe': PIPE, 'environment': ENVIRONMENT,
+                                                                'defects': defects},
+                           headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['Content-Encoding'] == 'gzip'
+    body = json.loads(gzip.decompress(response.data))
+    assert body['count'] == count
+    assert len(body['results']['data']) == count
+    assert body['results']['columns'][:2] == ['length', 'relative_depth']
+
+
+def test_quick_assessment(client):
+    defects = [{'id': 'A', 'length': 200, 'relative_depth': 0.25}]
+    full = client.post('/api/v1/assess', json={'pipe': PIPE, 'environment': ENVIRONMENT, 'defects': defects})
+    quick = client.post('/api/v1/assess?mode=quick', json={'pipe': PIPE, 'environment': ENVIRONMENT,
+                                                           'defects': defects})
+    assert quick.status_code == 200
+    full_result, quick_result = full.get_json()['results'][0], quick.get_json()['results'][0]
+    assert 'allowable_relative_depth' not in quick_result
+    assert quick_result['pressure_resistance'] == pytest.approx(full_result['pressure_resistance'])
+    assert quick_result['acceptable'] == full_result['acceptable']
+
+    response = client.post('/api/v1/assess?mode=fast', json={'pipe': PIPE, 'environment': ENVIRONMENT,
+                                                             'defects': defects})
+    assert response.status_code == 400
+
+
+def test_audited_assessment(client):
+    body = {'pipe': PIPE, 'environment': ENVIRONMENT, 'defects': [{'id': 'A', 'length': 200, 'relative_depth': 0.25}]}
+    result = client.post('/api/v1/assess?audit=true', json=body).get_json()['results'][0]
+    assert result['gamma_m'] == pytest.approx(0.85) and result['h1'] is None
+    assert result['length_correction_factor'] == pytest.approx(1.3412, rel=1e-4)
+    assert 'gamma_m' not in client.post('/api/v1/assess', json=body).get_json()['results'][0]
+    assert client.post('/api/v1/assess?audit=yes', json=body).status_code == 400
+    assert client.post('/api/v1/assess?format=csv', json=body).status_code == 400
+
+    response = client.post('/api/v1/assess?format=parquet', json=body)
+    assert response.status_code == 200 and response.mimetype == 'application/vnd.apache.parquet'
+    written = pd.read_parquet(io.BytesIO(response.data))
+    assert written['gamma_m'].dtype == np.float32 and written['gamma_m'][0] == pytest.approx(0.85)
+
+
+@pytest.mark.parametrize('body, message', [
+    ({'pipe': PIPE, 'environment': ENVIRONMENT}, 'Missing request fields: defects'),
+    ({'pipe': PIPE, 'environment': ENVIRONMENT, 'defects': []}, 'At least one defect is required'),
+    ({'pipe': PIPE, 'environment': ENVIRONMENT, 'defects': [{'length': 200}]}, 'Missing defect inputs: relative_depth'),
+    ({'pipe': PIPE | {'smts': None}, 'environment': ENVIRONMENT, 'defects': [{'length': 200, 'relative_depth': 0.25}]},
+     'Missing inputs: smts'),
+    ({'pipe': PIPE | {'design_temperature': 20}, 'environment': ENVIRONMENT,
+      'defects': [{'length': 200, 'relative_depth': 0.25}]}, 'Temperature must be between 50 and 200 C'),
+    ({'pipe': PIPE, 'environment': ENVIRONMENT, 'loading': {'axial_stress': -150},
+      'defects': [{'length': 200, 'relative_depth': 0.25}]}, None)
+])
+def test_invalid_requests_are_rejected(client, body, message):
+    response = client.post('/api/v1/assess', json=body)
+    assert response.status_code == 400
+    if message:
+        assert response.get_json() == {'error': message}
+
+
+@pytest.mark.parametrize('relative_depth', [-0.5, 1.0, 1.2, 2.0])
+def test_defects_outside_the_wall_are_rejected(client, relative_depth):
+    response = client.post('/api/v1/assess', json={'pipe': PIPE, 'environment': ENVIRONMENT,
+                                                   'defects': [{'length': 200, 'relative_depth': relative_depth}]})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Defect depths must be at least 0 and less than the wall thickness'}
+
+
+@pytest.mark.parametrize('relative_depth', [0.9, 0.98])
+def test_deep_defects_are_unacceptable(client, relative_depth):
+    response = client.post('/api/v1/assess', json={'pipe': PIPE, 'environment': ENVIRONMENT,
+                                                   'defects': [{'length': 200, 'relative_depth': relative_depth}]})
+    result = response.get_json()['results'][0]
+    assert result['pressure_resistance'] is None and result['erf'] is None
+    assert not result['acceptable']
+
+
+def test_unused_inputs_are_optional(client):
+    response = client.post('/api/v1/assess', json={'pipe': PIPE | {'smys': None}, 'environment': ENVIRONMENT,
+                                                   'defects': [{'length': 200, 'relative_depth': 0.25}]})
+    assert response.status_code == 200
@@ -0,0 +1,109 @@
+import dataclasses
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import models
+from src.utils.analysis.assessment import assess_governing_feature, assess_pipe
+from src.utils.analysis.sweep import assess_defect_population
+from tests.conftest import create_example_a_1_configs
+
+EXAMPLE_A_1 = create_example_a_1_configs()
+PIPE, ENVIRONMENT = EXAMPLE_A_1['pipe'], EXAMPLE_A_1['environment']
+
+SCENARIOS = {
+    'single': {'defects': [{'length': 200, 'relative_depth': 0.25}]},
+    'remaining_life': {'defects': [{'length': 200, 'relative_depth': 0.25, 'measurement_timestamp': 1577836800},
+                                   {'length': 220, 'relative_depth': 0.3, 'measurement_timestamp': 1672531200}]},
+    'interacting': {'defects': [{'length': 200, 'relative_depth': 0.25},
+                                {'length': 150, 'relative_depth': 0.3, 'position': 100}]},
+    'loaded': {'defects': [{'length': 200, 'relative_depth': 0.25, 'width': 100}],
+               'loading': {'combined_stress': -200}}
+}
+
+
+def create_configs(scenario: dict) -> dict:
+    return {'pipe': PIPE, 'environment': ENVIRONMENT} | scenario
+
+
+def assess_configs(configs: dict) -> models.AssessmentResult:
+    return models.assess(models.PipeSpec.from_configs(configs),
+                         [models.DefectSpec(**defect) for defect in configs['defects']])
+
+
+@pytest.mark.parametrize('scenario', SCENARIOS)
+def test_assess_matches_pipe(scenario):
+    configs = create_configs(SCENARIOS[scenario])
+    pipe = assess_pipe(configs)
+    result = assess_configs(configs)
+
+    assert result.pressure_resistance == pytest.approx(pipe.properties.pressure_resistance)
+    assert result.effective_pressure == pytest.approx(pipe.properties.effective_pressure)
+    assert result.remaining_life == pipe.properties.remaining_life
+    assert len(result.defects) == len(pipe.defects)
+    for assessed, defect in zip(result.defects, pipe.defects):
+        assert assessed.relative_depth_with_uncertainty == pytest.approx(defect.relative_depth_with_uncertainty)
+        assert assessed.length_correction_factor == pytest.approx(defect.length_correction_factor)
+        assert assessed.pressure_resistance == pytest.approx(defect.pressure_resistance)
+    assert len(result.limits) == len(pipe.properties.maximum_allowable_defect_depth)
+    for curve, limits in zip(result.limits, pipe.properties.maximum_allowable_defect_depth):
+        np.testing.assert_array_equal(curve, limits[['defect_length', 'defect_relative_depth']].to_numpy().T)
+
+
+def test_results_are_immutable():
+    result = assess_configs(create_configs(SCENARIOS['single']))
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        result.pressure_resistance = 0
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        result.defects[0].factors.gamma_d = 0
+    with pytest.raises(ValueError):
+        result.limits[0][0, 0] = 0
+    assert pickle.loads(pickle.dumps(result)).pressure_resistance == result.pressure_resistance
+
+
+def test_pipe_leaves_inputs_unmodified():
+    defect = models.Defect(length=200, relative_depth=0.25)
+    environment = models.Environment(**ENVIRONMENT)
+    pipe = models.Pipe(config=dict(PIPE))
+    pipe.add_defect(defect)
+    pipe.set_environment(environment)
+    pipe.calculate_pressure_resistance()
+    pipe.calculate_effective_pressure()
+
+    assert defect.factors is None and defect.depth is None and defect.relative_depth_with_uncertainty is None
+    assert not hasattr(environment, 'incidental_pressure')
+    assert pipe.defect is not defect and pipe.defect.depth == pytest.approx(0.25 * 19.1)
+
+
+def test_concurrent_assessments_match_serial():
+    configs = [create_configs({'defects': [{'length': length, 'relative_depth': depth}]})
+               for length in (100, 200, 400, 800) for depth in (0.1, 0.3, 0.5)]
+    serial = [assess_configs(config) for config in configs]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        concurrent = list(executor.map(assess_configs, configs * 4))
+    for index, result in enumerate(concurrent):
+        expected = serial[index % len(serial)]
+        assert result.pressure_resistance == expected.pressure_resistance
+        np.testing.assert_array_equal(result.limits[0], expected.limits[0])
+
+
+@pytest.mark.parametrize('loading', [None, {'combined_stress': -200}])
+def test_governing_feature_is_assessed_as_a_pipe(loading):
+    scenario = PIPE | ENVIRONMENT | {'defect_width': 100} | (loading or {})
+    # The deepest feature is outside the equation and the elevation of the second feature is per feature
+    features = pd.DataFrame({'defect_length': [100.0, 300.0, 200.0], 'defect_depth': [0.95, 0.2, 0.25],
+                             'elevation': [-100.0, -200.0, -100.0]})
+    result = assess_defect_population(scenario, features)
+    pipe = assess_governing_feature(scenario, result)
+
+    governing = result.loc[result['erf'].idxmax()]
+    assert pipe.defects[0].length == governing['defect_length'] != 100.0
+    assert pipe.properties.pressure_resistance == pytest.approx(governing['pressure_resistance'])
+    assert pipe.properties.effective_pressure == pytest.approx(governing['effective_pressure'])
+    assert len(pipe.properties.maximum_allowable_defect_depth[0])
+
+    with pytest.raises(ValueError):
+        assess_governing_feature(scenario, result.assign(erf=np.nan))
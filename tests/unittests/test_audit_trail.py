@@ -0,0 +1,51 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils import models
+from src.utils.analysis.assessment import assess_defects, build_pipe
+from src.utils.analysis.audit_trail import audit_assessment, audit_pipe, write_audit_trail
+from src.utils.analysis.sweep import AUDIT_COLUMNS
+from tests.conftest import create_example_a_1_configs
+
+EXAMPLE_A_1 = create_example_a_1_configs()
+PIPE, ENVIRONMENT = EXAMPLE_A_1['pipe'], EXAMPLE_A_1['environment']
+DEFECTS = pd.DataFrame({'length': [200.0, 400.0, 50.0], 'relative_depth': [0.25, 0.5, 0.1],
+                        'width': [100.0, 200.0, 30.0]})
+
+
+@pytest.mark.parametrize('loading', [None, {'combined_stress': -200}])
+def test_batch_audit_matches_single_defect_audit(loading):
+    configs = {'pipe': PIPE, 'environment': ENVIRONMENT, 'loading': loading}
+    result = assess_defects(configs, DEFECTS, audit=True)
+    assert all(result[name].dtype == np.float32 for name in AUDIT_COLUMNS if name != 'pressure_resistance')
+
+    spec = models.PipeSpec.from_configs(configs)
+    for index, defect in DEFECTS.iterrows():
+        assessment = models.assess(spec, [models.DefectSpec(**defect.to_dict())])
+        audit = audit_assessment(spec, assessment)
+        assert list(audit.columns) == list(AUDIT_COLUMNS) and (audit.dtypes == np.float32).all()
+        np.testing.assert_allclose(audit.iloc[0].to_numpy(dtype=float),
+                                   result.loc[index, list(AUDIT_COLUMNS)].to_numpy(dtype=float), rtol=1e-5)
+    assert result['h1'].isna().all() == (loading is None)
+
+
+def test_pipe_audit_includes_combined_defect(example_a_1_configs):
+    pipe = build_pipe(example_a_1_configs | {'defects': [{'length': 100, 'relative_depth': 0.3, 'position': 0},
+                                                         {'length': 100, 'relative_depth': 0.3, 'position': 120}]})
+    audit = audit_pipe(pipe)
+    assert len(audit) == len(pipe.defects)
+    np.testing.assert_allclose(audit['pressure_resistance'], [defect.pressure_resistance for defect in pipe.defects],
+                               rtol=1e-6)
+
+
+def test_write_audit_trail(tmp_path):
+    result = assess_defects({'pipe': PIPE, 'environment': ENVIRONMENT}, DEFECTS, quick=True, audit=True)
+    with pytest.raises(ValueError, match='Missing audit columns'):
+        write_audit_trail(result.drop(columns=['h1']), io.BytesIO())
+    write_audit_trail(result, tmp_path / 'audit.parquet')
+    written = pd.read_parquet(tmp_path / 'audit.parquet')
+    assert all(written[name].dtype == np.float32 for name in AUDIT_COLUMNS)
+    pd.testing.assert_frame_equal(written, result.astype({name: np.float32 for name in AUDIT_COLUMNS}))
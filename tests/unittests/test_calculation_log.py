@@ -0,0 +1,72 @@
+import sys
+
+import numpy as np
+import pytest
+from loguru import logger
+
+from src.utils import models
+from src.utils.caching.limit_curve_cache import limit_curve_cache
+from src.utils.monitoring.calculation_log import CalculationTrace, calculation_trace, current_trace, debug_enabled
+from tests.conftest import create_example_a_1_configs
+
+EXAMPLE_A_1 = create_example_a_1_configs()
+PIPE, ENVIRONMENT = EXAMPLE_A_1['pipe'], EXAMPLE_A_1['environment']
+
+
+def assess(defects: list[dict], loading: dict = None) -> models.AssessmentResult:
+    configs = {'pipe': PIPE, 'environment': ENVIRONMENT, 'loading': loading}
+    return models.assess(models.PipeSpec.from_configs(configs), [models.DefectSpec(**defect) for defect in defects])
+
+
+@pytest.fixture
+def uncached_curves(monkeypatch):
+    monkeypatch.setattr(limit_curve_cache, 'maxsize', 0)
+    monkeypatch.setattr(limit_curve_cache, 'backend', None)
+    limit_curve_cache.invalidate()
+
+
+def test_trace_records_limit_curve_points(uncached_curves):
+    with calculation_trace() as trace:
+        result = assess([{'length': 200, 'relative_depth': 0.25}])
+    assert current_trace() is None
+
+    points = trace.to_frame('maximum_defect_length')
+    valid = points.dropna()
+    assert len(points) > len(valid) > 10
+    # Every point of the curve was traced, the curve adds the point at zero length
+    traced = set(zip(valid['length'], valid['relative_depth']))
+    assert all((length, depth) in traced for length, depth in result.limits[0].T if length)
+
+    pressure_resistance = trace.to_array('pressure_resistance')
+    defect = result.defects[0]
+    np.testing.assert_array_equal(pressure_resistance, [[defect.length, defect.relative_depth_with_uncertainty,
+                                                         defect.length_correction_factor,
+                                                         defect.pressure_resistance]])
+
+
+def test_trace_records_loaded_limit_curve(uncached_curves):
+    with calculation_trace() as trace:
+        result = assess([{'length': 200, 'relative_depth': 0.25, 'width': 100}], loading={'combined_stress': -200})
+    points = trace.to_array('maximum_defect_depth')
+    assert len(points) >= result.limits[0].shape[1]
+    assert len(trace.to_array('maximum_defect_length')) == 0
+
+
+def test_trace_is_bounded():
+    trace = CalculationTrace(maxsize=2)
+    for index in range(4):
+        trace.record('maximum_defect_length', index / 10, None if index == 1 else index * 100.0)
+    np.testing.assert_array_equal(trace.to_array('maximum_defect_length'), [[0.0, 0.0], [0.1, np.nan]])
+    assert trace.dropped == 2 and len(trace) == 2
+
+
+def test_debug_enabled_follows_sinks():
+    logger.remove()
+    try:
+        logger.add(sys.stderr, level='INFO')
+        assert not debug_enabled()
+        logger.add(lambda message: None, level='DEBUG')
+        assert debug_enabled()
+    finally:
+        logger.remove()
+        logger.add(sys.stderr)
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.graphing.defect_plots import generate_defect_depth_plot, generate_defect_population_trace
+from tests.conftest import create_example_a_1_pipe
+
+
+@pytest.fixture
+def pipe():
+    pipe = create_example_a_1_pipe()
+    pipe.calculate_pressure_resistance()
+    pipe.calculate_effective_pressure()
+    pipe.calculate_maximum_allowable_defect_depth()
+    return pipe
+
+
+def test_defect_population_is_a_single_trace(pipe):
+    count = 100_000
+    rng = np.random.default_rng(0)
+    population = pd.DataFrame({
+        'defect_length': rng.uniform(0, 1000, count),
+        'defect_relative_depth': rng.uniform(0, 0.8, count),
+        'pressure_resistance': rng.uniform(10, 20, count),
+        'kp': np.arange(count) / 1000
+    })
+
+    fig = generate_defect_depth_plot(pipe, population=population)
+    assert [trace.name for trace in fig.data] == ['Calculated Limits', 'Defect Population', 'Measured Defect']
+
+    trace = fig.data[1]
+    assert trace.type == 'scattergl'
+    assert len(trace.x) == count
+    np.testing.assert_array_equal(
+        trace.marker.color, population['pressure_resistance'] < pipe.properties.effective_pressure)
+    assert trace.customdata.shape == (count, 2)
+    assert 'kp=%{customdata[1]}' in trace.hovertemplate
+
+
+def test_limit_curves_are_downsampled_for_display(pipe):
+    limits = pipe.properties.maximum_allowable_defect_depth[0]
+    fig = generate_defect_depth_plot(pipe, max_curve_points=24)
+    assert len(fig.data[0].x) == 24
+    # The full curve is kept for calculations
+    assert len(pipe.properties.maximum_allowable_defect_depth[0]) == len(limits) > 24
+    np.testing.assert_allclose(
+        np.interp(limits['defect_length'], fig.data[0].x, fig.data[0].y), limits['defect_relative_depth'], atol=0.005)
+
+
+def test_defect_population_colours():
+    population = pd.DataFrame({'defect_length': [100.0, 200.0, 300.0], 'defect_relative_depth': [0.2, 0.3, 0.9],
+                               'pressure_resistance': [20.0, 10.0, np.nan]})
+    # Defects outside the equation have no pressure resistance and are unacceptable
+    np.testing.assert_array_equal(generate_defect_population_trace(population, 15.0).marker.color, [0, 1, 1])
+    # Assessed defects are coloured by their own acceptance
+    population['acceptable'] = [False, True, False]
+    np.testing.assert_array_equal(generate_defect_population_trace(population, 15.0).marker.color, [1, 0, 1])
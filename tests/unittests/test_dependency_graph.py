@@ -0,0 +1,62 @@
+import pytest
+
+from src.utils.models.dependency_graph import DependencyGraph
+from tests.conftest import create_example_a_1_pipe
+
+
+@pytest.fixture
+def example_pipe():
+    pipe = create_example_a_1_pipe()
+    pipe.calculate_pressure_resistance()
+    pipe.calculate_effective_pressure()
+    pipe.calculate_maximum_allowable_defect_depth()
+    return pipe
+
+
+def test_graph_caches_until_invalidated():
+    values = {'a': 1}
+    graph = DependencyGraph()
+    graph.add_node('b', lambda: values['a'] * 2, ['a'])
+    graph.add_node('c', lambda: graph.get('b') + 1, ['b'])
+
+    assert graph.get('c') == 3
+    assert graph.get('c') == 3
+    assert graph.evaluations == {'b': 1, 'c': 1}
+
+    values['a'] = 2
+    assert graph.invalidate('a') == {'b', 'c'}
+    assert graph.get('c') == 5
+    assert graph.evaluations == {'b': 2, 'c': 2}
+
+
+def test_design_pressure_change_leaves_defect_untouched(example_pipe):
+    effective_pressure = example_pipe.properties.effective_pressure
+    evaluations = example_pipe.graph.evaluations.copy()
+
+    invalidated = example_pipe.update_config(design_pressure=160)
+
+    assert 'effective_pressure' in invalidated
+    assert 'maximum_allowable_defect_depth' in invalidated
+    assert not invalidated & {'defects', 'factors', 'pressure_resistance'}
+
+    assert example_pipe.properties.effective_pressure > effective_pressure
+    assert len(example_pipe.properties.maximum_allowable_defect_depth) == 1
+    for node in ('defects', 'factors', 'pressure_resistance'):
+        assert example_pipe.graph.evaluations[node] == evaluations[node]
+    for node in ('effective_pressure', 'maximum_allowable_defect_depth'):
+        assert example_pipe.graph.evaluations[node] == evaluations[node] + 1
+
+
+def test_accuracy_change_updates_defect(example_pipe):
+    relative_depth_with_uncertainty = example_pipe.defect.relative_depth_with_uncertainty
+    pressure_resistance = example_pipe.properties.pressure_resistance
+
+    example_pipe.update_config(accuracy=0.05)
+
+    assert example_pipe.defect.relative_depth_with_uncertainty < relative_depth_with_uncertainty
+    assert example_pipe.properties.pressure_resistance > pressure_resistance
+
+
+def test_unrequested_properties_remain_unset(example_pipe):
+    assert example_pipe.properties.remaining_life is None
+    assert example_pipe.graph.evaluations['remaining_life'] == 0
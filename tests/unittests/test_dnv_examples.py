@@ -0,0 +1,18 @@
+import json
+
+from src.utils.analysis.dnv_examples import EXAMPLES, ExampleStore, render_examples
+
+
+def test_examples_round_trip(tmp_path):
+    store = ExampleStore(render_examples())
+    store.save(str(tmp_path / 'dnv_examples.json'))
+    loaded = ExampleStore.load(str(tmp_path / 'dnv_examples.json'))
+
+    for example_id in EXAMPLES:
+        body, etag = loaded.get(example_id)
+        assert (body, etag) == store.get(example_id)
+        example = json.loads(body)
+        assert len(example['figures']) == 3
+        assert 'Corrosion is' in example['evaluation']
+    assert len({store.get(example_id)[1] for example_id in EXAMPLES}) == len(EXAMPLES)
+    assert 'a-1-4' not in store
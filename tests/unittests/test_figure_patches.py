@@ -0,0 +1,43 @@
+import plotly.graph_objects as go
+from dash import Patch, no_update
+
+from src.utils.graphing.figure_patches import fingerprint_figure, patch_figure
+
+
+def generate_figure(marker_x=200, limit_scale=1.0, radius=400):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=[0, 500, 1000], y=[limit_scale * 0.8, limit_scale * 0.4, limit_scale * 0.3]))
+    fig.add_trace(go.Scatter(x=[marker_x], y=[0.25], mode='markers'))
+    fig.add_shape(type='circle', x0=-radius, y0=-radius, x1=radius, y1=radius)
+    return fig.to_plotly_json()
+
+
+def operations(patch):
+    return [(operation['operation'], operation['location']) for operation in patch.to_plotly_json()['operations']]
+
+
+def test_first_figure_is_sent_in_full():
+    figure = generate_figure()
+    assert patch_figure(figure) is figure
+
+
+def test_unchanged_figure_is_not_sent():
+    assert patch_figure(generate_figure(), fingerprint_figure(generate_figure())) is no_update
+
+
+def test_only_changed_elements_are_patched():
+    previous = fingerprint_figure(generate_figure())
+
+    patch = patch_figure(generate_figure(marker_x=250), previous)
+    assert isinstance(patch, Patch)
+    assert operations(patch) == [('Assign', ['data', 1])]
+
+    patch = patch_figure(generate_figure(radius=500), previous)
+    assert operations(patch) == [('Assign', ['layout', 'shapes', 0])]
+
+
+def test_changed_structure_is_sent_in_full():
+    figure = generate_figure()
+    previous = fingerprint_figure(figure)
+    figure['data'].append(figure['data'][1])
+    assert patch_figure(figure, previous) is figure
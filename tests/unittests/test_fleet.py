@@ -0,0 +1,169 @@
+import threading
+import time
+
+import diskcache
+import flask
+import pandas as pd
+import pytest
+from celery import Celery
+
+from src.api import api
+from src.utils.analysis.assessment import assess_defects, assess_pipe
+from src.utils.jobs import fleet_job
+from src.utils.jobs.fleet_job import CeleryTaskExecutor, FleetOrchestrator, LocalTaskExecutor, fleet_orchestrator
+from src.utils.jobs.job_runner import CeleryJobExecutor, job_queue
+from src.utils.jobs.job_store import JobStore
+from tests.unittests.test_api import ENVIRONMENT, PIPE
+
+PIPELINES = [
+    {'id': 'north', 'pipe': PIPE, 'environment': ENVIRONMENT, 'corrosion_rate': 0.2,
+     'defects': [{'id': f'N{index}', 'length': 100 + 50 * index, 'relative_depth': 0.1 + 0.06 * index}
+                 for index in range(9)]},
+    {'id': 'south', 'pipe': PIPE | {'design_pressure': 120}, 'environment': ENVIRONMENT,
+     'defects': {'length': [200, 300, 400], 'relative_depth': [0.2, 0.3, 0.25]}}
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    with diskcache.Cache(str(tmp_path)) as cache:
+        yield JobStore(backend=cache)
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    # Celery app with an in-memory broker running its tasks eagerly in the calling process
+    celery_app = Celery('tests', broker='memory://', backend='cache+memory://')
+    celery_app.conf.task_always_eager = True
+    monkeypatch.setattr(job_queue, 'store', store)
+    monkeypatch.setattr(job_queue, 'executor', CeleryJobExecutor(celery_app, store))
+    monkeypatch.setattr(fleet_orchestrator, 'store', store)
+    monkeypatch.setattr(fleet_orchestrator, 'executor', CeleryTaskExecutor(celery_app, store))
+    monkeypatch.setattr(fleet_job, 'FLEET_CHUNK_SIZE', 4)
+
+    app = flask.Flask(__name__)
+    app.register_blueprint(api)
+    return app.test_client()
+
+
+def run_fleet(client, pipelines=PIPELINES) -> dict:
+    job = client.post('/api/v1/fleet', json={'pipelines': pipelines}).get_json()
+    status = client.get(job['links']['status']).get_json()
+    assert status['status'] == 'complete', status['error']
+    return client.get(job['links']['result']).get_json()
+
+
+def test_fleet_summaries_match_assessment(client):
+    result = run_fleet(client)
+    assert [pipeline['pipeline'] for pipeline in result['pipelines']] == ['north', 'south']
+
+    for pipeline, summary in zip(PIPELINES, result['pipelines']):
+        defects = pd.DataFrame(pipeline['defects'])
+        expected = assess_defects({'pipe': pipeline['pipe'], 'environment': ENVIRONMENT}, defects)
+        assert summary['count'] == len(defects)
+        assert summary['failing'] == int((~expected['acceptable']).sum())
+        assert summary['minimum_pressure_resistance'] == pytest.approx(expected['pressure_resistance'].min())
+        governing = expected['erf'].idxmax()
+        assert summary['governing_defect']['id'] == (defects['id'][governing] if 'id' in defects else governing)
+        assert summary['governing_defect']['erf'] == pytest.approx(expected['erf'].max())
+
+    north, south = result['pipelines']
+    assert south['earliest_failure'] is None
+    expected = assess_defects({'pipe': PIPE, 'environment': ENVIRONMENT}, pd.DataFrame(PIPELINES[0]['defects']))
+    years = ((expected['allowable_relative_depth'] - expected['relative_depth']) / (0.2 / PIPE['wall_thickness']))
+    years = years.clip(0).where(expected['acceptable'], 0)
+    assert north['earliest_failure']['years'] == pytest.approx(years.min())
+    assert result['count'] == 12
+    assert result['failing'] == north['failing'] + south['failing']
+
+
+def test_loaded_pipeline_matches_pipe(client):
+    loading = {'axial_load': -150, 'bending_load': -50}
+    defects = [{'id': f'E{index}', 'length': 200, 'relative_depth': 0.15 + 0.05 * index, 'width': 100}
+               for index in range(3)]
+    result = run_fleet(client, [{'id': 'east', 'pipe': PIPE, 'environment': ENVIRONMENT, 'loading': loading,
+                                 'defects': defects}])
+    pipes = [assess_pipe({'pipe': PIPE, 'environment': ENVIRONMENT, 'loading': loading, 'defects': [defect]})
+             for defect in ({key: value for key, value in defect.items() if key != 'id'} for defect in defects)]
+    summary = result['pipelines'][0]
+    assert summary['minimum_pressure_resistance'] == pytest.approx(min(pipe.properties.pressure_resistance
+                                                                       for pipe in pipes))
+    assert summary['failing'] == sum(pipe.properties.pressure_resistance <= pipe.properties.effective_pressure
+                                     for pipe in pipes) > 0
+    assert summary['governing_defect']['id'] == 'E2'
+
+
+@pytest.mark.parametrize('chunk_size', [4, 1])
+def test_defects_outside_the_equation_govern(client, monkeypatch, chunk_size):
+    monkeypatch.setattr(fleet_job, 'FLEET_CHUNK_SIZE', chunk_size)
+    defects = [{'id': 'shallow', 'length': 100, 'relative_depth': 0.1},
+               {'id': 'deep', 'length': 200, 'relative_depth': 0.9},
+               {'id': 'long', 'length': 2000, 'relative_depth': 0.6}]
+    result = run_fleet(client, [{'id': 'west', 'pipe': PIPE, 'environment': ENVIRONMENT, 'corrosion_rate': 0.2,
+                                 'defects': defects}])
+    summary = result['pipelines'][0]
+    assert summary['failing'] == 2
+    assert summary['governing_defect'] == {'id': 'deep', 'erf': None, 'pressure_resistance': None,
+                                           'acceptable': False}
+    expected = assess_defects({'pipe': PIPE, 'environment': ENVIRONMENT}, pd.DataFrame(defects))
+    assert summary['minimum_pressure_resistance'] == pytest.approx(expected['pressure_resistance'].min())
+    assert summary['earliest_failure']['years'] == 0.0
+
+
+def test_tasks_are_retried_and_not_repeated(client, monkeypatch):
+    calls = []
+    summarise_chunk = fleet_job.summarise_chunk
+
+    def flaky_summarise_chunk(inputs):
+        calls.append(inputs['offset'])
+        if len(calls) == 1:
+            raise ConnectionError('Worker lost')
+        return summarise_chunk(inputs)
+
+    monkeypatch.setattr(fleet_job, 'summarise_chunk', flaky_summarise_chunk)
+    first = run_fleet(client)
+    # Four tasks, the first of which failed once
+    assert len(calls) == 5
+
+    # Resubmitting the same pipelines reuses the stored task summaries
+    assert run_fleet(client) == first
+    assert len(calls) == 5
+
+
+def test_concurrency_is_bounded(store, monkeypatch):
+    running, peak = [], []
+    lock = threading.Lock()
+    summarise_chunk = fleet_job.summarise_chunk
+
+    def slow_summarise_chunk(inputs):
+        with lock:
+            running.append(inputs['offset'])
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.remove(inputs['offset'])
+        return summarise_chunk(inputs)
+
+    monkeypatch.setattr(fleet_job, 'summarise_chunk', slow_summarise_chunk)
+    monkeypatch.setattr(fleet_job, 'FLEET_CHUNK_SIZE', 1)
+    orchestrator = FleetOrchestrator(store, LocalTaskExecutor(store, max_workers=8), max_concurrency=2)
+    manifest = {'pipelines': [{'id': 'north', 'configs': {'pipe': PIPE, 'environment': ENVIRONMENT},
+                               'defects': PIPELINES[0]['defects']}]}
+    result = orchestrator.run(manifest, lambda progress, stage: None)
+    assert result['count'] == 9
+    assert max(peak) == 2
+
+
+@pytest.mark.parametrize('pipelines, message', [
+    ([], 'At least one pipeline is required'),
+    ([{'pipe': PIPE, 'environment': ENVIRONMENT, 'defects': [{'length': 200, 'relative_depth': 0.2}]}],
+     'Every pipeline requires an id'),
+    ([PIPELINES[1], PIPELINES[1]], 'Pipeline ids must be unique'),
+    ([PIPELINES[1] | {'defects': []}], 'Pipeline south: At least one defect is required'),
+    ([PIPELINES[0], PIPELINES[1] | {'pipe': PIPE | {'design_temperature': 20}}],
+     'Pipeline south: Temperature must be between 50 and 200 C')
+])
+def test_invalid_manifests_are_rejected(client, pipelines, message):
+    response = client.post('/api/v1/fleet', json={'pipelines': pipelines})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': message}
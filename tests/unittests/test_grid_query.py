@@ -0,0 +1,71 @@
+import base64
+
+import numpy as np
+import pandas as pd
+import pytest
+from flask_caching.backends import SimpleCache
+
+from src.utils.analysis.grid_query import filter_rows, query_rows, sort_rows
+from src.utils.analysis.tally import parse_tally
+from src.utils.caching.batch_results import BatchResultStore
+
+
+@pytest.fixture
+def result():
+    return pd.DataFrame({
+        'kp': [0.5, 0.1, 0.3, 0.2, 0.4],
+        'erf': [0.9, 1.2, 0.5, 1.2, np.nan],
+        'acceptable': [True, False, True, False, True]
+    })
+
+
+def test_filter_rows(result):
+    assert filter_rows(result).tolist() == [0, 1, 2, 3, 4]
+    assert filter_rows(result, {'erf': {'filterType': 'number', 'type': 'greaterThan', 'filter': 1}}).tolist() == [1, 3]
+    assert filter_rows(result, {'erf': {'filterType': 'number', 'type': 'blank'}}).tolist() == [4]
+    assert filter_rows(result, {'acceptable': {'filterType': 'text', 'type': 'equals', 'filter': 'False'}}).tolist() \
+        == [1, 3]
+    combined = {'filterType': 'number', 'operator': 'OR',
+                'conditions': [{'type': 'lessThan', 'filter': 0.6}, {'type': 'inRange', 'filter': 1, 'filterTo': 2}]}
+    assert filter_rows(result, {'erf': combined}).tolist() == [1, 2, 3]
+    with pytest.raises(ValueError):
+        filter_rows(result, {'depth': {'filterType': 'number', 'type': 'equals', 'filter': 1}})
+
+
+def test_sort_rows(result):
+    indices = np.arange(len(result))
+    assert sort_rows(result, indices, [{'colId': 'kp', 'sort': 'asc'}]).tolist() == [1, 3, 2, 4, 0]
+    # Missing values sort last and ties follow the next sort
+    assert sort_rows(result, indices, [{'colId': 'erf', 'sort': 'desc'}, {'colId': 'kp', 'sort': 'desc'}]).tolist() \
+        == [3, 1, 0, 2, 4]
+
+
+def test_query_rows_returns_requested_block(result):
+    request = {'startRow': 1, 'endRow': 3, 'sortModel': [{'colId': 'kp', 'sort': 'asc'}]}
+    response, view = query_rows(result, request)
+    assert response['rowCount'] == 5
+    assert [row['kp'] for row in response['rowData']] == [0.2, 0.3]
+
+    response, _ = query_rows(result, request | {'startRow': 4, 'endRow': 6}, view)
+    assert [row['kp'] for row in response['rowData']] == [0.5]
+
+
+def test_batch_results_are_shared_through_backend(result):
+    backend = SimpleCache()
+    BatchResultStore(backend=backend).set('batch', result)
+
+    store = BatchResultStore(backend=backend)
+    assert 'batch' in store and 'other' not in store
+    response = store.query('batch', {'startRow': 0, 'endRow': 2, 'filterModel': {
+        'acceptable': {'filterType': 'text', 'type': 'equals', 'filter': 'true'}}})
+    assert response['rowCount'] == 3
+    with pytest.raises(KeyError):
+        store.query('other', {'startRow': 0, 'endRow': 2})
+
+
+def test_parse_tally():
+    csv = 'KP,Defect_Length,Defect_Depth,Elevation,Comment\n1.5,200,0.25,-100,pit\n'
+    features = parse_tally('data:text/csv;base64,' + base64.b64encode(csv.encode()).decode())
+    assert features.columns.tolist() == ['kp', 'defect_length', 'defect_depth', 'elevation']
+    with pytest.raises(ValueError):
+        parse_tally('data:text/csv;base64,' + base64.b64encode(b'kp,defect_length\n1,2\n').decode())
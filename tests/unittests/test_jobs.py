@@ -0,0 +1,124 @@
+import json
+import time
+
+import diskcache
+import flask
+import pytest
+from celery import Celery
+
+from src.api import api
+from src.api import jobs
+from src.api.jobs import StreamLimit
+from src.utils.jobs import assessment_job
+from src.utils.jobs.job_runner import CeleryJobExecutor, JobQueue, LocalJobExecutor, job_queue
+from src.utils.jobs.job_store import JobStore
+from tests.unittests.test_api import ENVIRONMENT, PIPE
+
+DEFECTS = [{'id': index, 'length': 100 + 10 * index, 'relative_depth': 0.1 + 0.05 * index} for index in range(10)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    with diskcache.Cache(str(tmp_path)) as cache:
+        yield JobStore(backend=cache)
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    # Celery app running its tasks eagerly in the calling process
+    celery_app = Celery('tests', broker='memory://', backend='cache+memory://')
+    celery_app.conf.task_always_eager = True
+    monkeypatch.setattr(job_queue, 'store', store)
+    monkeypatch.setattr(job_queue, 'executor', CeleryJobExecutor(celery_app, store))
+    monkeypatch.setattr(assessment_job, 'CHUNK_SIZE', 4)
+    # Test clients only close streamed responses when asked to, so every test starts without open streams
+    monkeypatch.setattr(jobs, 'event_streams', StreamLimit())
+
+    app = flask.Flask(__name__)
+    app.register_blueprint(api)
+    return app.test_client()
+
+
+def parse_events(stream: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in stream.strip().split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        events.append((fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def test_job_result_matches_synchronous_assessment(client):
+    body = {'pipe': PIPE, 'environment': ENVIRONMENT, 'defects': DEFECTS}
+    response = client.post('/api/v1/jobs', json=body)
+    assert response.status_code == 202
+    job = response.get_json()
+    assert response.headers['Location'] == job['links']['status'] == f"/api/v1/jobs/{job['id']}"
+
+    status = client.get(job['links']['status']).get_json()
+    assert status['status'] == 'complete'
+    assert status['progress'] == 100
+    assert status['partials'] == 3
+
+    result = client.get(job['links']['result']).get_json()
+    assert result == client.post('/api/v1/assess', json=body).get_json()
+
+
+def test_job_events_stream_partial_results(client):
+    job = client.post('/api/v1/jobs', json={'pipe': PIPE, 'environment': ENVIRONMENT, 'defects': DEFECTS}).get_json()
+    events = parse_events(client.get(job['links']['events']).get_data(as_text=True))
+    assert [event for event, _ in events] == ['partial', 'partial', 'partial', 'complete']
+    assert [data['start'] for _, data in events[:3]] == [0, 4, 8]
+    assert [row['id'] for _, data in events[:3] for row in data['results']] == list(range(10))
+
+    # A reconnecting client resumes after the last partial result received
+    resumed = client.get(job['links']['events'], headers={'Last-Event-ID': '1'}).get_data(as_text=True)
+    assert [event for event, _ in parse_events(resumed)] == ['partial', 'complete']
+
+
+def test_event_streams_are_limited(client, monkeypatch):
+    monkeypatch.setattr(jobs.event_streams, 'maximum', 1)
+    job = client.post('/api/v1/jobs', json={'pipe': PIPE, 'environment': ENVIRONMENT, 'defects': DEFECTS}).get_json()
+    stream = client.get(job['links']['events'])
+    refused = client.get(job['links']['events'])
+    assert refused.status_code == 503 and refused.headers['Retry-After']
+    stream.get_data()
+    stream.close()
+    assert client.get(job['links']['events']).status_code == 200
+
+
+@pytest.mark.parametrize('body, message', [
+    ({'pipe': PIPE | {'design_temperature': 20}}, 'Temperature must be between 50 and 200 C'),
+    ({'loading': {'axial_stress': -150}}, None)
+])
+def test_invalid_jobs_are_rejected(client, body, message):
+    response = client.post('/api/v1/jobs', json={'pipe': PIPE, 'environment': ENVIRONMENT, 'defects': DEFECTS} | body)
+    assert response.status_code == 400
+    if message:
+        assert response.get_json() == {'error': message}
+
+
+def test_failed_job(client):
+    # Superimposed stress requires a defect width, which is only checked when the job runs
+    job = client.post('/api/v1/jobs', json={'pipe': PIPE, 'environment': ENVIRONMENT, 'loading': {'combined_stress': -200},
+                                            'defects': DEFECTS}).get_json()
+    status = client.get(job['links']['status']).get_json()
+    assert status['status'] == 'failed'
+    assert status['error'] == 'Defect Width is required for stress calculations.'
+    assert client.get(job['links']['result']).status_code == 409
+
+    assert client.delete(job['links']['status']).status_code == 204
+    assert client.get(job['links']['status']).status_code == 404
+
+
+def test_local_executor_runs_jobs_in_worker_processes(store):
+    queue = JobQueue(store, executor=LocalJobExecutor(max_workers=1))
+    try:
+        record = queue.submit('assessment', {'configs': {'pipe': PIPE, 'environment': ENVIRONMENT},
+                                             'defects': DEFECTS})
+        deadline = time.time() + 60
+        while store.get(record['id'])['status'] not in ('complete', 'failed') and time.time() < deadline:
+            time.sleep(0.1)
+    finally:
+        queue.executor.shutdown()
+    assert store.get(record['id'])['status'] == 'complete'
+    assert json.loads(store.get_result(record['id']))['count'] == len(DEFECTS)
@@ -0,0 +1,84 @@
+import diskcache
+import numpy as np
+import pytest
+
+from src.utils.caching.limit_curve_cache import LimitCurveCache, generate_cache_key, limit_curve_cache
+from tests.conftest import create_example_a_1_pipe
+
+
+@pytest.fixture
+def curve():
+    return np.array([[0.0, 100.0, 200.0], [0.8, 0.5, 0.3]])
+
+
+def create_example_pipe():
+    pipe = create_example_a_1_pipe()
+    pipe.calculate_pressure_resistance()
+    pipe.calculate_effective_pressure()
+    pipe.calculate_maximum_allowable_defect_depth()
+    return pipe
+
+
+def test_cache_key_is_canonical():
+    assert generate_cache_key({'d': 150, 't': 19.1}) == generate_cache_key({'t': 19.1, 'd': 150.0})
+    assert generate_cache_key({'d': 150}) != generate_cache_key({'d': 151})
+
+
+def test_lru_eviction_and_stats(curve):
+    cache = LimitCurveCache(maxsize=2)
+    for index in range(3):
+        cache.get_or_compute({'index': index}, lambda: curve)
+    assert len(cache) == 2
+    cache.get_or_compute({'index': 2}, lambda: pytest.fail('Curve should be cached'))
+
+    stats = cache.stats()
+    assert stats['misses'] == 3
+    assert stats['hits'] == 1
+    assert stats['hit_rate'] == pytest.approx(0.25)
+
+
+def test_backend_tier(curve, tmp_path):
+    backend = diskcache.Cache(str(tmp_path))
+    cache = LimitCurveCache(backend=backend)
+    cache.get_or_compute({'index': 0}, lambda: curve)
+
+    # A second process sharing the backend finds the curve without computing it
+    other_cache = LimitCurveCache(backend=backend)
+    cached = other_cache.get_or_compute({'index': 0}, lambda: pytest.fail('Curve should be cached'))
+    np.testing.assert_array_equal(cached, curve)
+    assert other_cache.stats()['backend_hits'] == 1
+    assert not cached.flags.writeable
+
+    other_cache.invalidate()
+    assert len(other_cache) == 0
+    assert cache.get_or_compute({'index': 0}, lambda: curve * 2)[1, 0] == pytest.approx(0.8)
+    assert LimitCurveCache(backend=backend).get(generate_cache_key({'index': 0})) is None
+
+
+class UnavailableBackend:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError('Backend unavailable')
+        return fail
+
+
+def test_unavailable_backend_degrades(curve):
+    cache = LimitCurveCache(backend=UnavailableBackend())
+    cache.get_or_compute({'index': 0}, lambda: curve)
+    cache.get_or_compute({'index': 0}, lambda: pytest.fail('Curve should be cached in memory'))
+    cache.invalidate({'index': 0})
+    assert len(cache) == 0
+    cache.get_or_compute({'index': 1}, lambda: curve)
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_pipe_reuses_cached_limits():
+    limit_curve_cache.invalidate()
+    limit_curve_cache.reset_stats()
+
+    first = create_example_pipe()
+    second = create_example_pipe()
+
+    assert limit_curve_cache.stats()['hits'] == 1
+    assert first.properties.maximum_allowable_defect_depth[0].equals(second.properties.maximum_allowable_defect_depth[0])
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from src.utils.analysis.limit_curve_library import LimitCurveLibrary, calculate_depth_factor
+from src.utils.calculations.defect_calculations import calculate_maximum_defect_length
+
+
+@pytest.fixture(scope='module')
+def library():
+    return LimitCurveLibrary.build()
+
+
+@pytest.mark.parametrize('gamma_m,gamma_d,epsilon_d,st_dev,p_li,p_le', [
+    (0.85, 1.28, 1.0, 0.078, 16.75, 1.00),  # Example A.1-1
+    (0.85, 1.28, 1.0, 0.078, 16.75, 2.01),  # Example A.1-2
+    (0.80, 1.15, 0.5, 0.040, 20.00, 0.50),
+    (0.90, 1.00, 0.0, 0.000, 12.00, 0.00),
+])
+def test_library_matches_exact_limits(library, gamma_m, gamma_d, epsilon_d, st_dev, p_li, p_le):
+    d, t, f_u = 812.8, 19.1, 495.3
+    for relative_depth in np.arange(0.01, 1, 0.01):
+        length = calculate_maximum_defect_length(d=d, t=t, gamma_d=gamma_d, gamma_m=gamma_m, f_u=f_u, p_li=p_li,
+                                                 p_le=p_le, d_t_meas=relative_depth, epsilon_d=epsilon_d,
+                                                 st_dev=st_dev)
+        if not length or length / np.sqrt(d * t) > library.normalised_lengths[-1]:
+            continue
+        _, interpolated_depth = library.lookup(d=d, t=t, f_u=f_u, gamma_m=gamma_m, gamma_d=gamma_d,
+                                               epsilon_d=epsilon_d, st_dev=st_dev, p_li=p_li, p_le=p_le,
+                                               defect_lengths=[length])
+        assert abs(interpolated_depth[0] - relative_depth) <= library.max_error / gamma_d + 1e-9
+
+
+def test_library_round_trip(library, tmp_path):
+    library.save(str(tmp_path))
+    loaded = LimitCurveLibrary.load(str(tmp_path))
+    assert isinstance(loaded.table, np.memmap)
+    assert loaded.max_error == library.max_error
+    np.testing.assert_array_equal(loaded.interpolate(0.5, [0, 1, 10]), library.interpolate(0.5, [0, 1, 10]))
+
+
+def test_depth_factor_limits():
+    # Zero length defects may reach the full depth, infinitely long defects are limited by the pressure ratio
+    assert calculate_depth_factor(0.7, 0) == pytest.approx(1.0)
+    assert calculate_depth_factor(0.7, 1e6) == pytest.approx(0.3, abs=1e-4)
+    assert np.isnan(calculate_depth_factor(1.2, 1))
+
+
+@pytest.mark.parametrize('tolerance', [0.0005, 0.002])
+def test_sampled_curve_within_tolerance(library, tolerance):
+    d, t, f_u, gamma_m, gamma_d, epsilon_d, st_dev, p_li, p_le = 812.8, 19.1, 495.3, 0.85, 1.28, 1.0, 0.078, 16.75, 1.00
+    limits = library.sample(d=d, t=t, f_u=f_u, gamma_m=gamma_m, gamma_d=gamma_d, epsilon_d=epsilon_d, st_dev=st_dev,
+                            p_li=p_li, p_le=p_le, tolerance=tolerance)
+    assert (np.diff(limits[0]) > 0).all()
+    for relative_depth in np.arange(0.15, 0.7, 0.01):
+        length = calculate_maximum_defect_length(d=d, t=t, gamma_d=gamma_d, gamma_m=gamma_m, f_u=f_u, p_li=p_li,
+                                                 p_le=p_le, d_t_meas=relative_depth, epsilon_d=epsilon_d,
+                                                 st_dev=st_dev)
+        if length:
+            assert abs(np.interp(length, limits[0], limits[1]) - relative_depth) <= tolerance
+
+    # The interpolation error alone must fit within the tolerance
+    assert library.sample(d=d, t=t, f_u=f_u, gamma_m=gamma_m, gamma_d=gamma_d, epsilon_d=epsilon_d, st_dev=st_dev,
+                          p_li=p_li, p_le=p_le, tolerance=library.max_error / gamma_d) is None
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from src.utils.analysis.lod_pyramid import LodPyramid, PyramidStore
+
+
+@pytest.fixture
+def features():
+    rng = np.random.default_rng(1)
+    count = 100_000
+    return {
+        'kp': rng.uniform(0, 100, count),
+        'depth': rng.uniform(0, 0.8, count),
+        'erf': rng.uniform(0, 1.2, count)
+    }
+
+
+@pytest.fixture
+def pyramid(features):
+    return LodPyramid(features['kp'], {'depth': features['depth'], 'erf': features['erf']}, severity='erf')
+
+
+def test_window_is_bounded(pyramid):
+    for kp_start, kp_end in [(None, None), (0, 50), (10, 11)]:
+        window = pyramid.window(kp_start, kp_end, max_points=500)
+        assert window['level'] > 0
+        assert len(window['kp_min']) <= 500
+        assert len(window['severity_kp']) == len(window['kp_min'])
+
+
+def test_small_window_returns_raw_features(pyramid, features):
+    window = pyramid.window(50, 50.2, max_points=500)
+    in_window = (features['kp'] >= 50) & (features['kp'] <= 50.2)
+    assert window['level'] == 0
+    assert len(window['kp']) == in_window.sum()
+    np.testing.assert_allclose(np.sort(window['values']['depth']), np.sort(features['depth'][in_window]))
+
+
+def test_bins_bound_their_features(pyramid, features):
+    window = pyramid.window(max_points=100)
+    for index in range(len(window['kp_min'])):
+        in_bin = (features['kp'] >= window['kp_min'][index]) & (features['kp'] <= window['kp_max'][index])
+        assert window['max']['depth'][index] == features['depth'][in_bin].max()
+        assert window['min']['erf'][index] == features['erf'][in_bin].min()
+        # The most severe feature of each bin represents it
+        assert window['severity_values']['erf'][index] == features['erf'][in_bin].max()
+
+
+def test_nan_values_are_ignored():
+    pyramid = LodPyramid(np.arange(64.0), {'erf': np.r_[np.nan, np.arange(1.0, 64.0)]}, severity='erf',
+                         base_bin_size=4)
+    window = pyramid.window(max_points=16)
+    assert window['min']['erf'][0] == 1.0
+    assert not np.isnan(window['severity_values']['erf']).any()
+
+
+def test_invalid_pyramid():
+    with pytest.raises(ValueError):
+        LodPyramid([], {'erf': []}, severity='erf')
+    with pytest.raises(ValueError):
+        LodPyramid([0.0], {'depth': [0.1]}, severity='erf')
+
+
+def test_store_evicts_least_recently_used():
+    store = PyramidStore(maxsize=2)
+    pyramids = [LodPyramid([float(index)], {'erf': [0.5]}, severity='erf') for index in range(3)]
+    store.set('a', pyramids[0])
+    store.set('b', pyramids[1])
+    assert store.get('a') is pyramids[0]
+    store.set('c', pyramids[2])
+    assert 'a' in store and 'c' in store
+    assert 'b' not in store
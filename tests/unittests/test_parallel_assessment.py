@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from src.utils.analysis.parallel_assessment import SharedMemoryExecutor
+from src.utils.analysis.sweep import assess_defect_population
+from src.utils.analysis.synthetic_features import generate_synthetic_features
+from tests.conftest import create_example_a_1_configs
+
+EXAMPLE_A_1 = create_example_a_1_configs()
+SCENARIO = EXAMPLE_A_1['pipe'] | EXAMPLE_A_1['environment']
+
+
+@pytest.fixture(scope='module')
+def executor():
+    executor = SharedMemoryExecutor(max_workers=2, rows_per_task=1_000)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.parametrize('quick', [False, True])
+def test_parallel_assessment_matches_serial(executor, quick):
+    features = generate_synthetic_features(4_500)
+    expected = assess_defect_population(SCENARIO, features, quick=quick)
+    pd.testing.assert_frame_equal(executor.assess_defect_population(SCENARIO, features, quick=quick), expected)
+
+
+@pytest.mark.parametrize('quick', [False, True])
+def test_parallel_audit_matches_serial(executor, quick):
+    features = generate_synthetic_features(2_500)
+    expected = assess_defect_population(SCENARIO, features, quick=quick, audit=True)
+    pd.testing.assert_frame_equal(executor.assess_defect_population(SCENARIO, features, quick=quick, audit=True),
+                                  expected)
+
+
+def test_single_worker_assesses_in_tasks():
+    features = generate_synthetic_features(2_500)
+    executor = SharedMemoryExecutor(max_workers=1, rows_per_task=1_000)
+    pd.testing.assert_frame_equal(executor.assess_defect_population(SCENARIO, features),
+                                  assess_defect_population(SCENARIO, features))
+    assert executor._pool is None
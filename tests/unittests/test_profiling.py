@@ -0,0 +1,106 @@
+import pstats
+import time
+
+import diskcache
+import flask
+import pytest
+
+from src.api import api
+from src.utils.monitoring.profiling import PROFILE_HEADER, PROFILE_PARAMETER, CallbackProfiler, ProfileStore, callback_profiler
+
+TOKEN = 'secret'
+
+
+def busy(duration: float):
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        pass
+
+
+@pytest.fixture(params=['memory', 'diskcache'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        yield ProfileStore(maxsize=3)
+    else:
+        with diskcache.Cache(str(tmp_path)) as cache:
+            yield ProfileStore(backend=cache, maxsize=3)
+
+
+def test_store_keeps_last_profiles(store):
+    ids = [store.add({'name': 'callback', 'inputs': {'index': index}}, pstats=b'stats', collapsed=f'a;b {index}\n')
+           for index in range(5)]
+
+    assert [record['inputs']['index'] for record in store.list()] == [4, 3, 2]
+    assert store.get_record(ids[0]) is None and store.get_pstats(ids[1]) is None
+    assert store.get_pstats(ids[-1]) == b'stats'
+    assert store.get_collapsed(ids[-1]) == 'a;b 4\n'
+
+
+def test_profile_records_stats_and_stacks(store, tmp_path):
+    profiler = CallbackProfiler(store)
+    with profiler.profile('callback', {'value': 1}):
+        busy(0.05)
+    with pytest.raises(ValueError):
+        with profiler.profile('callback', {'value': 2}):
+            raise ValueError('Invalid input')
+    with profiler.profile('callback', {'value': 3}, enabled=False):
+        busy(0.01)
+
+    failed, profiled = store.list()
+    assert failed['error'] == 'Invalid input' and profiled['error'] is None
+    assert profiled['inputs'] == {'value': 1} and profiled['duration'] >= 0.05
+
+    path = tmp_path / 'profile.pstats'
+    path.write_bytes(store.get_pstats(profiled['id']))
+    functions = {function for _, _, function in pstats.Stats(str(path)).stats}
+    assert 'busy' in functions
+    stacks = store.get_collapsed(profiled['id']).splitlines()
+    assert stacks and all(int(line.rsplit(' ', 1)[1]) > 0 for line in stacks)
+    assert any(line.rsplit(' ', 1)[0].split(';')[-1].startswith('busy ') for line in stacks)
+
+
+def test_profiles_requested():
+    profiler = CallbackProfiler(ProfileStore())
+    assert not profiler.requested('?profile=1')  # Requests not enabled
+
+    profiler.requests_enabled = True
+    assert profiler.requested('?profile=1&other=1')
+    assert not profiler.requested('?profile=guess') and not profiler.requested('?other=1')
+
+    # The token is never accepted from the query string
+    profiler.requests_enabled = False
+    profiler.token = TOKEN
+    assert not profiler.requested(f'?profile={TOKEN}')
+    with flask.Flask(__name__).test_request_context(headers={PROFILE_HEADER: TOKEN}):
+        assert profiler.requested() and profiler.is_admin()
+    with flask.Flask(__name__).test_request_context():
+        assert not profiler.requested()
+    # Downloads only accept the header
+    with flask.Flask(__name__).test_request_context(f'/?{PROFILE_PARAMETER}={TOKEN}'):
+        assert not profiler.is_admin()
+
+    profiler.token = None
+    profiler.enabled = True
+    assert profiler.requested()
+
+
+def test_profiles_download(monkeypatch):
+    monkeypatch.setattr(callback_profiler, 'token', TOKEN)
+    monkeypatch.setattr(callback_profiler, 'store', ProfileStore())
+    with callback_profiler.profile('calculate_pipe_characteristics', {'value': 1}):
+        busy(0.02)
+    app = flask.Flask(__name__)
+    app.register_blueprint(api)
+    client = app.test_client()
+
+    assert client.get('/api/v1/profiles').status_code == 403
+    assert client.get('/api/v1/profiles/1.pstats', headers={PROFILE_HEADER: 'guess'}).status_code == 403
+    assert client.get(f'/api/v1/profiles?profile={TOKEN}').status_code == 403
+
+    headers = {PROFILE_HEADER: TOKEN}
+    records = client.get('/api/v1/profiles', headers=headers).get_json()
+    assert [record['name'] for record in records] == ['calculate_pipe_characteristics']
+    response = client.get(records[0]['links']['pstats'], headers=headers)
+    assert response.status_code == 200 and 'profile-1.pstats' in response.headers['Content-Disposition']
+    assert client.get(records[0]['links']['collapsed'], headers=headers).data.endswith(b'\n')
+    assert client.get('/api/v1/profiles/2', headers=headers).status_code == 404
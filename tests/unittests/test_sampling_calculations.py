@@ -0,0 +1,60 @@
+import numpy as np
+
+from src.utils.calculations.defect_calculations import calculate_maximum_defect_length
+from src.utils.calculations.sampling_calculations import (
+    calculate_chord_error, downsample_largest_triangle, sample_curve_adaptively
+)
+
+
+def test_calculate_chord_error():
+    assert calculate_chord_error((0, 0), (1, 1), (2, 2)) == 0
+    assert calculate_chord_error((0, 0), (1, 2), (2, 0)) == 2
+    assert calculate_chord_error((0, 0), (0, 1), (0, 4)) == 1
+
+
+def test_straight_line_is_not_refined():
+    evaluations = []
+
+    def line(x):
+        evaluations.append(x)
+        return x, 2 * x
+
+    points = sample_curve_adaptively(line, start=0, stop=1, tolerance=1e-6, initial_samples=5)
+    assert points.shape == (2, 9)
+    assert len(evaluations) == 5 + 4
+
+
+def test_limit_curve_matches_dense_sampling():
+    def limit(relative_depth):
+        length = calculate_maximum_defect_length(d=812.8, t=19.1, gamma_d=1.28, gamma_m=0.79, f_u=510.0,
+                                                 p_li=16.6, p_le=1.0, d_t_meas=relative_depth, epsilon_d=1.0,
+                                                 st_dev=0.078)
+        return (length, relative_depth) if relative_depth and length else None
+
+    evaluations = []
+
+    def counted_limit(relative_depth):
+        evaluations.append(relative_depth)
+        return limit(relative_depth)
+
+    tolerance = 0.0005
+    adaptive = sample_curve_adaptively(counted_limit, start=0, stop=1, tolerance=tolerance)
+    dense = np.array([point for point in map(limit, np.arange(0, 1, 0.001)) if point is not None]).T
+
+    assert len(evaluations) * 5 <= 1000
+    order = np.argsort(adaptive[0])
+    within = dense[0] <= adaptive[0].max()
+    interpolated = np.interp(dense[0][within], adaptive[0][order], adaptive[1][order])
+    assert np.abs(interpolated - dense[1][within]).max() <= tolerance
+
+
+def test_downsample_largest_triangle():
+    x = np.linspace(0, 10, 1001)
+    y = np.where(x < 5, 0.0, 1.0)
+    indices = downsample_largest_triangle(x, y, 20)
+    assert len(indices) == 20
+    assert indices[0] == 0 and indices[-1] == 1000
+    assert np.all(np.diff(indices) > 0)
+    # The step is kept
+    assert {500, 499} & set(indices)
+    np.testing.assert_array_equal(downsample_largest_triangle(x[:10], y[:10], 20), np.arange(10))
@@ -0,0 +1,78 @@
+import multiprocessing
+
+import diskcache
+import pytest
+
+from src.utils.analysis.assessment import assess_pipe
+from src.utils.graphing import defect_plots
+from src.utils.monitoring.stage_metrics import METRIC_NAME, StageMetrics, stage_metrics
+from tests.conftest import create_example_a_1_configs
+
+CONFIGS = create_example_a_1_configs() | {
+    'defects': [{'length': 200, 'relative_depth': 0.25, 'measurement_timestamp': 1577836800},
+                {'length': 220, 'relative_depth': 0.3, 'measurement_timestamp': 1672531200}]
+}
+
+
+def count(histograms: dict, stage: str) -> int:
+    return sum(histograms[stage][:-1])
+
+
+def test_render_is_cumulative():
+    metrics = StageMetrics(buckets=(0.001, 0.01), stages=('factors',))
+    for duration in (0.0005, 0.001, 0.005, 0.5):
+        metrics.observe('factors', duration)
+
+    lines = metrics.render().splitlines()
+    assert lines[1] == f'# TYPE {METRIC_NAME} histogram'
+    assert lines[2:] == [
+        f'{METRIC_NAME}_bucket{{stage="factors",le="0.001"}} 2',
+        f'{METRIC_NAME}_bucket{{stage="factors",le="0.01"}} 3',
+        f'{METRIC_NAME}_bucket{{stage="factors",le="+Inf"}} 4',
+        f'{METRIC_NAME}_sum{{stage="factors"}} 0.5065',
+        f'{METRIC_NAME}_count{{stage="factors"}} 4'
+    ]
+
+
+def test_assessment_stages_are_timed():
+    before = stage_metrics.snapshot()
+    pipe = assess_pipe(CONFIGS)
+    defect_plots.generate_defect_depth_plot(pipe)
+    after = stage_metrics.snapshot()
+
+    for stage in ('factors', 'add_defect', 'prepare_defects', 'limit_curve', 'remaining_life', 'figure_defect_depth'):
+        assert count(after, stage) > count(before, stage), stage
+    assert count(after, 'pressure_resistance') - count(before, 'pressure_resistance') == 2
+    assert after['limit_curve'][-1] > before['limit_curve'][-1]
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = StageMetrics()
+    metrics.enabled = False
+    timed = metrics.timed('factors')(lambda value: value * 2)
+    with metrics.time('limit_curve'):
+        assert timed(2) == 4
+    assert all(not any(histogram) for histogram in metrics.snapshot().values())
+
+
+def record_in_child(metrics: StageMetrics):
+    metrics.observe('factors', 0.002)
+    metrics.flush()
+
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='Requires fork')
+def test_processes_add_to_backend(tmp_path):
+    with diskcache.Cache(str(tmp_path)) as cache:
+        metrics = StageMetrics(backend=cache)
+        metrics.observe('factors', 0.001)
+        process = multiprocessing.get_context('fork').Process(target=record_in_child, args=(metrics,))
+        # Flushed before the fork so that the child adds only its own counts, as the process-wide metrics reset
+        metrics.flush()
+        process.start()
+        process.join()
+
+        histograms = metrics.snapshot()
+        assert count(histograms, 'factors') == 2
+        assert histograms['factors'][-1] == 3_000_000
+        assert count(histograms, 'limit_curve') == 0
+        assert f'{METRIC_NAME}_count{{stage="factors"}} 2' in metrics.render()
@@ -0,0 +1,127 @@
+import math
+
+import numpy as np
+import pytest
+
+from src.utils import models
+from src.utils.analysis.sweep import run_parameter_sweep, evaluate_scenarios, sweep_to_grid
+from src.utils.calculations import vectorised_calculations
+from src.utils.calculations.statistical_calculations import calculate_partial_safety_factors
+from tests.conftest import create_example_a_1_configs, create_example_a_1_pipe
+
+EXAMPLE_A_1 = create_example_a_1_configs()
+EXAMPLE_A_1_1 = EXAMPLE_A_1['pipe'] | EXAMPLE_A_1['environment'] | {
+    'defect_length': EXAMPLE_A_1['defects'][0]['length'],
+    'defect_depth': EXAMPLE_A_1['defects'][0]['relative_depth']
+}
+
+
+def create_example_pipe(design_pressure=150, safety_class='medium'):
+    pipe = create_example_a_1_pipe(design_pressure=design_pressure, safety_class=safety_class)
+    pipe.calculate_pressure_resistance()
+    pipe.calculate_effective_pressure()
+    return pipe
+
+
+@pytest.mark.parametrize('safety_class,inspection_accuracy', [
+    ('low', 0.02), ('low', 0.06), ('low', 0.1),
+    ('medium', 0.0), ('medium', 0.16),
+    ('high', 0.05),
+    ('very high', 0.02), ('very high', 0.08)
+])
+def test_partial_safety_factors_equivalence(safety_class, inspection_accuracy):
+    expected = calculate_partial_safety_factors(safety_class, 'relative', inspection_accuracy)
+    factors = vectorised_calculations.calculate_partial_safety_factors(safety_class, 'relative', inspection_accuracy)
+    for key, value in expected.items():
+        assert float(factors[key]) == pytest.approx(value)
+
+
+def test_evaluate_scenarios_equivalence():
+    pipe = create_example_pipe()
+    results = evaluate_scenarios(EXAMPLE_A_1_1)
+    assert float(results['pressure_resistance']) == pytest.approx(pipe.properties.pressure_resistance)
+    assert float(results['effective_pressure']) == pytest.approx(pipe.properties.effective_pressure)
+    assert bool(results['acceptable'])
+
+
+def test_evaluate_scenarios_with_loading():
+    results = evaluate_scenarios(EXAMPLE_A_1_1 | {'defect_width': 100.0, 'combined_stress': -200})
+    # Allowable depth is the depth at which the pressure resistance meets the effective pressure
+    depth = float(results['allowable_relative_depth'])
+    at_limit = evaluate_scenarios(EXAMPLE_A_1_1 | {'defect_width': 100.0, 'combined_stress': -200,
+                                                   'defect_depth': depth})
+    assert float(at_limit['pressure_resistance']) == pytest.approx(float(at_limit['effective_pressure']))
+
+
+def test_parameter_sweep_grid():
+    design_pressures = [140, 150, 160]
+    safety_classes = ['low', 'medium', 'high']
+    result = run_parameter_sweep(EXAMPLE_A_1_1, {'design_pressure': design_pressures, 'safety_class': safety_classes})
+
+    assert len(result) == 9
+    assert result.attrs['dimensions'] == ['design_pressure', 'safety_class']
+    for row in result.itertuples():
+        pipe = create_example_pipe(design_pressure=row.design_pressure, safety_class=row.safety_class)
+        assert row.pressure_resistance == pytest.approx(pipe.properties.pressure_resistance)
+        assert row.effective_pressure == pytest.approx(pipe.properties.effective_pressure)
+        assert row.acceptable == (pipe.properties.effective_pressure < pipe.properties.pressure_resistance)
+
+    grid = sweep_to_grid(result, x='design_pressure', y='safety_class', value='allowable_relative_depth')
+    assert grid.shape == (3, 3)
+
+
+def test_parameter_sweep_rejects_unknown_parameter():
+    with pytest.raises(ValueError):
+        run_parameter_sweep(EXAMPLE_A_1_1, {'measurement_method': ['relative', 'absolute']})
+
+
+def test_evaluate_scenarios_quick():
+    full = evaluate_scenarios(EXAMPLE_A_1_1)
+    quick = evaluate_scenarios(EXAMPLE_A_1_1, quick=True)
+    assert 'allowable_relative_depth' not in quick
+    for key in ('effective_pressure', 'pressure_resistance', 'acceptable'):
+        assert float(quick[key]) == pytest.approx(float(full[key]))
+
+
+def test_pipe_quick_check_matches_full_assessment():
+    pipe = create_example_pipe()
+    result = create_example_pipe().quick_check()
+    assert result.acceptable
+    assert result.pressure_resistance == pytest.approx(pipe.properties.pressure_resistance)
+    assert result.effective_pressure == pytest.approx(pipe.properties.effective_pressure)
+    assert result.defects_checked == 1
+
+
+def test_pipe_quick_check_ends_at_first_failing_defect():
+    pipe = create_example_pipe(design_pressure=150)
+    pipe.add_defect(models.Defect(length=2000, relative_depth=0.7))
+    pipe.add_defect(models.Defect(length=100, relative_depth=0.1))
+    result = pipe.quick_check()
+    assert not result.acceptable
+    assert result.governing_defect == 1
+    assert result.defects_checked == 2
+
+
+def test_evaluate_scenarios_audit():
+    pipe = create_example_pipe()
+    defect = pipe.defects[0]
+    results = evaluate_scenarios(EXAMPLE_A_1_1, audit=True)
+    assert float(results['length_correction_factor']) == pytest.approx(defect.length_correction_factor)
+    assert float(results['relative_depth_with_uncertainty']) == pytest.approx(defect.relative_depth_with_uncertainty)
+    for key in ('gamma_m', 'gamma_d', 'epsilon_d', 'standard_deviation'):
+        assert float(results[key]) == pytest.approx(getattr(defect.factors, key))
+    assert float(results['p_0']) == pytest.approx(defect.factors.gamma_m * 2 * 19.1 * pipe.material_properties.f_u
+                                                  / (812.8 - 19.1))
+    assert math.isnan(results['h1'])
+    assert 'gamma_m' not in evaluate_scenarios(EXAMPLE_A_1_1)
+
+    loaded = evaluate_scenarios(EXAMPLE_A_1_1 | {'defect_width': 100.0, 'combined_stress': -200}, audit=True)
+    assert 0 < float(loaded['h1']) < 1
+
+
+def test_depths_outside_the_equation_are_unacceptable():
+    results = evaluate_scenarios(EXAMPLE_A_1_1 | {'defect_depth': np.array([-0.5, 0.25, 0.9, 0.98, 1.2, 2.0])})
+    assert np.isnan(results['pressure_resistance'][[0, 2, 3, 4, 5]]).all()
+    assert results['acceptable'].tolist() == [False, True, False, False, False, False]
+    # The allowable depth does not depend on the depth of the defect
+    assert np.unique(results['allowable_relative_depth']).size == 1